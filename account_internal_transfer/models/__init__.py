@@ -3,3 +3,4 @@
 # directory
 ##############################################################################
 from . import account_payment
+from . import res_currency
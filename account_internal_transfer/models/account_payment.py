@@ -91,34 +91,15 @@ class AccountPayment(models.Model):
                     "We couldn't create the paired payment because the journal entry of the original payment is in draft state."
                 )
             )
+        if len(self) > 1:
+            return self._create_paired_internal_transfer_payment_batch()
         for payment in self:
-            paired_payment_type = "inbound" if payment.payment_type == "outbound" else "outbound"
-            paired_payment = payment.copy(
-                {
-                    "journal_id": payment.destination_journal_id.id,
-                    "company_id": payment.destination_journal_id.company_id.id,
-                    "destination_journal_id": payment.journal_id.id,
-                    "payment_type": paired_payment_type,
-                    "payment_method_line_id": payment.destination_journal_id._get_available_payment_method_lines(
-                        paired_payment_type
-                    )[:1].id,
-                    "move_id": None,
-                    "memo": payment.memo,
-                    "paired_internal_transfer_payment_id": payment.id,
-                    "date": payment.date,
-                }
-            )
+            paired_payment = payment.copy(payment._prepare_paired_internal_transfer_payment_vals())
             # The payment method line ID in 'paired_payment' needs to be computed manually,
             # as it does not compute automatically.
             # This ensures not to use the same payment method line ID of the original transfer payment.
             paired_payment._compute_payment_method_line_id()
-            if (
-                not payment.payment_method_line_id.payment_account_id
-                or not paired_payment.payment_method_line_id.payment_account_id
-            ):
-                raise ValidationError(
-                    _("The origin or destination payment methods do not have an outstanding account.")
-                )
+            payment._check_paired_internal_transfer_payment_methods(paired_payment)
             paired_payment.filtered(lambda p: not p.move_id)._generate_journal_entry()
             paired_payment.move_id._post(soft=False)
             payment.paired_internal_transfer_payment_id = paired_payment
@@ -127,10 +108,82 @@ class AccountPayment(models.Model):
             body = _("A second payment has been created:") + paired_payment._get_html_link()
             payment.message_post(body=body)
 
-            lines = (payment.move_id.line_ids + paired_payment.move_id.line_ids).filtered(
-                lambda l: l.account_id == payment.destination_account_id and not l.reconciled
-            )
-            lines.reconcile()
+            payment._get_paired_internal_transfer_lines(paired_payment).reconcile()
+
+    def _create_paired_internal_transfer_payment_batch(self):
+        """Same as _create_paired_internal_transfer_payment for many transfers at once:
+        one create for all the paired payments, their journal entries generated and
+        posted together, the chatter links logged in batch and all the transfer
+        account lines reconciled in a single reconciliation plan.
+        """
+        method_lines = {}
+        vals_list = []
+        for payment in self:
+            vals = payment._prepare_paired_internal_transfer_payment_vals(method_lines)
+            vals_list.append(payment.with_context(active_test=False).copy_data(vals)[0])
+        paired_payments = self.create(vals_list)
+        # See _create_paired_internal_transfer_payment
+        paired_payments._compute_payment_method_line_id()
+        for payment, paired_payment in zip(self, paired_payments):
+            payment._check_paired_internal_transfer_payment_methods(paired_payment)
+        paired_payments.filtered(lambda p: not p.move_id)._generate_journal_entry()
+        paired_payments.move_id._post(soft=False)
+        for payment, paired_payment in zip(self, paired_payments):
+            payment.paired_internal_transfer_payment_id = paired_payment
+
+        paired_payments._message_log_batch(
+            bodies={
+                paired_payment.id: _("This payment has been created from:") + payment._get_html_link()
+                for payment, paired_payment in zip(self, paired_payments)
+            }
+        )
+        self._message_log_batch(
+            bodies={
+                payment.id: _("A second payment has been created:") + paired_payment._get_html_link()
+                for payment, paired_payment in zip(self, paired_payments)
+            }
+        )
+
+        self.env["account.move.line"]._reconcile_plan(
+            [
+                payment._get_paired_internal_transfer_lines(paired_payment)
+                for payment, paired_payment in zip(self, paired_payments)
+            ]
+        )
+
+    def _prepare_paired_internal_transfer_payment_vals(self, method_lines=None):
+        """Default values to copy the paired payment from this one.
+        method_lines: optional cache {(journal, payment type): payment method line}
+        shared between the payments of a batch.
+        """
+        self.ensure_one()
+        paired_payment_type = "inbound" if self.payment_type == "outbound" else "outbound"
+        key = (self.destination_journal_id, paired_payment_type)
+        if method_lines is None:
+            method_lines = {}
+        if key not in method_lines:
+            method_lines[key] = self.destination_journal_id._get_available_payment_method_lines(paired_payment_type)[:1]
+        return {
+            "journal_id": self.destination_journal_id.id,
+            "company_id": self.destination_journal_id.company_id.id,
+            "destination_journal_id": self.journal_id.id,
+            "payment_type": paired_payment_type,
+            "payment_method_line_id": method_lines[key].id,
+            "move_id": None,
+            "memo": self.memo,
+            "paired_internal_transfer_payment_id": self.id,
+            "date": self.date,
+        }
+
+    def _check_paired_internal_transfer_payment_methods(self, paired_payment):
+        if not self.payment_method_line_id.payment_account_id or not paired_payment.payment_method_line_id.payment_account_id:
+            raise ValidationError(_("The origin or destination payment methods do not have an outstanding account."))
+
+    def _get_paired_internal_transfer_lines(self, paired_payment):
+        """Transfer account lines of both payments, to be reconciled together"""
+        return (self.move_id.line_ids + paired_payment.move_id.line_ids).filtered(
+            lambda l: l.account_id == self.destination_account_id and not l.reconciled
+        )
 
     def action_post(self):
         super().action_post()
@@ -0,0 +1,109 @@
+from collections import defaultdict
+
+from odoo import api, fields, models, tools
+
+
+class ResCurrency(models.Model):
+    _inherit = "res.currency"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        res = super().create(vals_list)
+        self.env.registry.clear_cache("stable")
+        return res
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {"name", "active"} & set(vals):
+            self.env.registry.clear_cache("stable")
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache("stable")
+        return res
+
+    # The currency lookups and conversion rates below live in the "stable" ormcache,
+    # so that rate imports only invalidate them and not the whole default cache
+    @api.model
+    @tools.ormcache("name", "self.env.context.get('active_test', True)", cache="stable")
+    def _get_currency_id_by_name(self, name):
+        return self.search([("name", "=", name)], limit=1).id
+
+    @api.model
+    def _get_currency_by_name(self, name):
+        """Currency by ISO code (e.g. 'USD'), cached until a currency is created, renamed or deleted"""
+        return self.browse(self._get_currency_id_by_name(name))
+
+    @api.model
+    @tools.ormcache("self.env.context.get('active_test', True)", cache="stable")
+    def _get_active_currency_ids(self):
+        return tuple(self.search([]).ids)
+
+    @api.model
+    def _get_active_currencies(self):
+        return self.browse(self._get_active_currency_ids())
+
+    @api.model
+    @tools.ormcache("from_currency_id", "to_currency_id", "company_id", "date", cache="stable")
+    def _get_cached_conversion_rate_value(self, from_currency_id, to_currency_id, company_id, date):
+        return self._get_conversion_rate(
+            self.browse(from_currency_id), self.browse(to_currency_id), self.env["res.company"].browse(company_id), date
+        )
+
+    @api.model
+    def _get_cached_conversion_rate(self, from_currency, to_currency, company=None, date=None):
+        """Same as _get_conversion_rate, but the rates are kept in an LRU cache per currency pair,
+        company and date. The cache is cleared whenever a res.currency.rate is created, written or deleted,
+        so the toolkit wizards can call it on every onchange.
+        """
+        company = company or self.env.company
+        date = fields.Date.to_date(date or fields.Date.context_today(self))
+        if from_currency == to_currency:
+            return 1
+        return self._get_cached_conversion_rate_value(from_currency.id, to_currency.id, company.id, date)
+
+    def _cached_convert(self, from_amount, to_currency, company=None, date=None, round=True):
+        """Same as _convert, using the cached conversion rate"""
+        self, to_currency = self or to_currency, to_currency or self
+        if not from_amount:
+            return 0.0
+        to_amount = from_amount * self._get_cached_conversion_rate(self, to_currency, company, date)
+        return to_currency.round(to_amount) if round else to_amount
+
+    @api.model
+    def _convert_bulk(self, values, to_currency, company=None, round=True):
+        """Convert many (amount, currency, date) triples to to_currency at once.
+
+        Each distinct (currency, date) rate is looked up only once. Returns the converted amounts
+        in the same order as values.
+        """
+        rates = defaultdict(dict)
+        result = []
+        for amount, currency, date in values:
+            date = fields.Date.to_date(date or fields.Date.context_today(self))
+            if date not in rates[currency]:
+                rates[currency][date] = self._get_cached_conversion_rate(currency, to_currency, company, date)
+            to_amount = amount * rates[currency][date]
+            result.append(to_currency.round(to_amount) if round else to_amount)
+        return result
+
+
+class ResCurrencyRate(models.Model):
+    _inherit = "res.currency.rate"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        res = super().create(vals_list)
+        self.env.registry.clear_cache("stable")
+        return res
+
+    def write(self, vals):
+        res = super().write(vals)
+        self.env.registry.clear_cache("stable")
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache("stable")
+        return res
@@ -11,6 +11,8 @@
     "license": "AGPL-3",
     "category": "Accounting",
     "data": [
+        "security/ir.model.access.csv",
+        "data/res_partner_default_account.xml",
         "views/res_partner.xml",
         "views/account_account.xml",
     ],
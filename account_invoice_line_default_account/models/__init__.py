@@ -2,4 +2,5 @@
 
 from . import account_account
 from . import account_move_line
-from . import res_partner
\ No newline at end of file
+from . import res_partner
+from . import res_partner_default_account
@@ -23,6 +23,16 @@ class AccountAccount(models.Model):
         help="Partners that have this account as their default income account"
     )
     
+    expense_partner_count = fields.Integer(
+        string='Expense Partners Count',
+        compute='_compute_associated_partners',
+    )
+
+    income_partner_count = fields.Integer(
+        string='Income Partners Count',
+        compute='_compute_associated_partners',
+    )
+
     expense_partner_names = fields.Char(
         string='Expense Partners',
         compute='_compute_partner_names',
@@ -36,32 +46,35 @@ class AccountAccount(models.Model):
     )
 
     def _compute_associated_partners(self):
-        """Compute partners that use this account as default expense/income"""
+        """Compute partners that use this account as default expense/income,
+        from the partner default account index of the current company"""
+        accounts = self._origin
+        partners_by_key = self.env[
+            'res.partner.default.account'
+        ]._get_account_partners(accounts, self.env.company)
+        # Read the names of all the partners of the list at once
+        partners = self.env['res.partner'].browse(
+            {pid for partner_ids in partners_by_key.values() for pid in partner_ids}
+        )
+        partners.fetch(['name'])
         for account in self:
-            # Get company IDs for this account (Odoo 18 uses company_ids instead of company_id)
-            company_ids = account.company_ids.ids if account.company_ids else [self.env.company.id]
-            
-            # Search for partners with this account as expense account
-            expense_partners = self.env['res.partner'].search([
-                ('property_account_expense', '=', account.id),
-                ('company_id', 'in', [False] + company_ids)
-            ])
-            
-            # Search for partners with this account as income account  
-            income_partners = self.env['res.partner'].search([
-                ('property_account_income', '=', account.id),
-                ('company_id', 'in', [False] + company_ids)
-            ])
-            
+            expense_partners = partners.browse(
+                partners_by_key.get((account._origin.id, 'expense'), [])
+            )
+            income_partners = partners.browse(
+                partners_by_key.get((account._origin.id, 'income'), [])
+            )
             account.expense_partner_ids = expense_partners
             account.income_partner_ids = income_partners
+            account.expense_partner_count = len(expense_partners)
+            account.income_partner_count = len(income_partners)
 
     @api.depends('expense_partner_ids', 'income_partner_ids')
     def _compute_partner_names(self):
         """Compute string representation of partner names"""
         for account in self:
-            expense_names = ', '.join(account.expense_partner_ids.mapped('name'))
-            income_names = ', '.join(account.income_partner_ids.mapped('name'))
+            expense_names = ', '.join(sorted(account.expense_partner_ids.mapped('name')))
+            income_names = ', '.join(sorted(account.income_partner_ids.mapped('name')))
             
             account.expense_partner_names = expense_names or ''
             account.income_partner_names = income_names or ''
\ No newline at end of file
@@ -3,8 +3,17 @@
 # Copyright 2022 Simone Rubino - TAKOBI
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
+from collections import defaultdict
+
 from odoo import api, models
 
+PARTNER_ACCOUNT_FIELDS = {
+    "in_invoice": ("property_account_expense", "auto_update_account_expense"),
+    "in_refund": ("property_account_expense", "auto_update_account_expense"),
+    "out_invoice": ("property_account_income", "auto_update_account_income"),
+    "out_refund": ("property_account_income", "auto_update_account_income"),
+}
+
 
 class AccountMoveLine(models.Model):
     _inherit = "account.move.line"
@@ -12,28 +21,43 @@ class AccountMoveLine(models.Model):
     def _compute_account_id(self):
         # First call super to set default accounts
         super()._compute_account_id()
-        
+
         # Then override with partner accounts if configured
-        for line in self:
-            if (
-                line.display_type == "product" 
-                and not line.product_id 
+        lines = self.filtered(
+            lambda line: (
+                line.display_type == "product"
+                and not line.product_id
                 and line.move_id.partner_id
-            ):
-                partner = line.move_id.partner_id
-                invoice_type = line.move_id.move_type
-                
-                # Override with partner account if available
-                if (
-                    invoice_type in ["in_invoice", "in_refund"]
-                    and partner.property_account_expense
-                ):
-                    line.account_id = partner.property_account_expense
-                elif (
-                    invoice_type in ["out_invoice", "out_refund"]
-                    and partner.property_account_income
-                ):
-                    line.account_id = partner.property_account_income
+            )
+        )
+        partner_accounts = lines._get_partner_default_accounts()
+        for line in lines:
+            fname = PARTNER_ACCOUNT_FIELDS.get(line.move_id.move_type, (None,))[0]
+            account = fname and partner_accounts[line._get_partner_account_key()][fname]
+            # Override with partner account if available
+            if account:
+                line.account_id = account
+
+    def _get_partner_account_key(self):
+        return (self.move_id.partner_id.id, self.move_id.company_id.id)
+
+    def _get_partner_default_accounts(self):
+        """
+        Return the default income and expense accounts of the partners of
+        the lines' moves, as a dict {(partner id, company id): {field: account}}.
+        The company dependent values are fetched with one query per company
+        instead of once per line.
+        """
+        result = {}
+        for company, lines in self.grouped(lambda l: l.move_id.company_id).items():
+            partners = lines.move_id.partner_id.with_company(company)
+            partners.fetch(["property_account_income", "property_account_expense"])
+            for partner in partners:
+                result[(partner.id, company.id)] = {
+                    "property_account_income": partner.property_account_income,
+                    "property_account_expense": partner.property_account_expense,
+                }
+        return result
 
     @api.onchange('move_id')
     def _onchange_move_id_partner_account(self):
@@ -59,7 +83,8 @@ class AccountMoveLine(models.Model):
 
     def write(self, vals):
         res = super().write(vals)
-        self._update_partner_income_expense_default_accounts()
+        if "account_id" in vals:
+            self._update_partner_income_expense_default_accounts()
         return res
 
     def _get_updateable_income_expense_lines(self):
@@ -88,35 +113,31 @@ class AccountMoveLine(models.Model):
         Update the partner default account.
         As the account is unique on partner and to avoid too
         much writes, group lines per invoice and update with the first line
-        account
+        account. Partners are only written when their account changes, with
+        one write per company, field and account.
         """
-        moves = set(self.move_id)
-        for move in moves:
-            lines = self.filtered(lambda l: l.move_id == move)
+        partner_accounts = self._get_partner_default_accounts()
+        new_accounts = {}
+        for move, lines in self.grouped("move_id").items():
+            fname, auto_update_fname = PARTNER_ACCOUNT_FIELDS.get(
+                move.move_type, (None, None)
+            )
+            if not fname or not move.partner_id[auto_update_fname]:
+                continue
             updateable_lines = lines._get_updateable_income_expense_lines()
             if not updateable_lines:
                 continue
             line_to_update = updateable_lines[0]
-            inv_type = move.move_type
-            if (
-                inv_type in ["in_invoice", "in_refund"]
-                and move.partner_id.auto_update_account_expense
-            ):
-                if (
-                    line_to_update.account_id
-                    != move.partner_id.property_account_expense
-                ):
-                    move.partner_id.write(
-                        {"property_account_expense": line_to_update.account_id.id}
-                    )
-            elif (
-                inv_type in ["out_invoice", "out_refund"]
-                and move.partner_id.auto_update_account_income
-            ):
-                if (
-                    line_to_update.account_id
-                    != move.partner_id.property_account_income
-                ):
-                    move.partner_id.write(
-                        {"property_account_income": line_to_update.account_id.id}
-                    )
\ No newline at end of file
+            # The last invoice of a partner wins, as when writing per invoice
+            new_accounts[(line_to_update._get_partner_account_key(), fname)] = (
+                line_to_update.account_id
+            )
+
+        to_write = defaultdict(list)
+        for ((partner_id, company_id), fname), account in new_accounts.items():
+            if account != partner_accounts[(partner_id, company_id)][fname]:
+                to_write[(company_id, fname, account.id)].append(partner_id)
+        for (company_id, fname, account_id), partner_ids in to_write.items():
+            self.env["res.partner"].browse(partner_ids).with_company(
+                company_id
+            ).write({fname: account_id})
@@ -3,7 +3,9 @@
 # Copyright 2022 Simone Rubino - TAKOBI
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
-from odoo import fields, models
+from odoo import api, fields, models
+
+from .res_partner_default_account import PARTNER_DEFAULT_ACCOUNT_FIELDS
 
 
 class ResPartner(models.Model):
@@ -34,4 +36,27 @@ class ResPartner(models.Model):
         help="When an account is selected on an invoice line, "
         "automatically assign it as default expense account",
         default=True,
-    )
\ No newline at end of file
+    )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        partners = super().create(vals_list)
+        fnames = set(PARTNER_DEFAULT_ACCOUNT_FIELDS.values())
+        indexed = partners.browse(
+            partner.id
+            for partner, vals in zip(partners, vals_list)
+            if fnames.intersection(vals)
+        )
+        if indexed:
+            self.env["res.partner.default.account"]._refresh_partners(
+                indexed, self.env.company
+            )
+        return partners
+
+    def write(self, vals):
+        res = super().write(vals)
+        if set(PARTNER_DEFAULT_ACCOUNT_FIELDS.values()).intersection(vals):
+            self.env["res.partner.default.account"]._refresh_partners(
+                self, self.env.company
+            )
+        return res
@@ -0,0 +1,113 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import api, fields, models
+
+# usage -> company dependent field of res.partner holding the account
+PARTNER_DEFAULT_ACCOUNT_FIELDS = {
+    "income": "property_account_income",
+    "expense": "property_account_expense",
+}
+
+
+class ResPartnerDefaultAccount(models.Model):
+    """Reverse index of the partner default accounts.
+
+    One row per partner, company and usage whose default income/expense
+    account is set, so that the partners using an account can be read with
+    a grouped query instead of searching the company dependent fields.
+    Rows are maintained when the partner fields are written and rebuilt
+    when the module is updated.
+    """
+
+    _name = "res.partner.default.account"
+    _description = "Partner Default Account Index"
+    _log_access = False
+
+    partner_id = fields.Many2one(
+        "res.partner", required=True, index=True, ondelete="cascade"
+    )
+    company_id = fields.Many2one("res.company", required=True, ondelete="cascade")
+    account_id = fields.Many2one(
+        "account.account", required=True, index=True, ondelete="cascade"
+    )
+    usage = fields.Selection(
+        [("income", "Income"), ("expense", "Expense")], required=True
+    )
+
+    _sql_constraints = [
+        (
+            "partner_company_usage_uniq",
+            "unique(partner_id, company_id, usage)",
+            "A partner has only one default account per company and usage.",
+        )
+    ]
+
+    @api.model
+    def _refresh_partners(self, partners, company):
+        """Synchronize the rows of ``partners`` in ``company`` with the
+        current value of their default accounts"""
+        partners = partners.with_company(company).with_context(active_test=False)
+        partners.fetch(list(PARTNER_DEFAULT_ACCOUNT_FIELDS.values()))
+        expected = {
+            (partner.id, usage): partner[fname].id
+            for partner in partners
+            for usage, fname in PARTNER_DEFAULT_ACCOUNT_FIELDS.items()
+            if partner[fname]
+        }
+        rows = self.sudo().search(
+            [("partner_id", "in", partners.ids), ("company_id", "=", company.id)]
+        )
+        to_unlink = self.sudo().browse()
+        for row in rows:
+            account_id = expected.pop((row.partner_id.id, row.usage), None)
+            if not account_id:
+                to_unlink |= row
+            elif row.account_id.id != account_id:
+                row.account_id = account_id
+        to_unlink.unlink()
+        self.sudo().create(
+            [
+                {
+                    "partner_id": partner_id,
+                    "company_id": company.id,
+                    "usage": usage,
+                    "account_id": account_id,
+                }
+                for (partner_id, usage), account_id in expected.items()
+            ]
+        )
+
+    @api.model
+    def _rebuild_index(self):
+        """Rebuild the whole index, company by company"""
+        self.sudo().search([]).unlink()
+        partner_model = self.env["res.partner"].with_context(active_test=False)
+        for company in self.env["res.company"].sudo().search([]):
+            domain = ["|"] + [
+                (fname, "!=", False)
+                for fname in PARTNER_DEFAULT_ACCOUNT_FIELDS.values()
+            ]
+            partners = partner_model.with_company(company).search(domain)
+            self._refresh_partners(partners, company)
+        return True
+
+    @api.model
+    def _get_account_partners(self, accounts, company):
+        """Active partners using each of ``accounts`` as default account in
+        ``company``, read with a single grouped query.
+
+        :return: dict {(account id, usage): partner ids}
+        """
+        self.flush_model()
+        return {
+            (account.id, usage): partner_ids
+            for account, usage, partner_ids in self.sudo()._read_group(
+                [
+                    ("account_id", "in", accounts.ids),
+                    ("company_id", "=", company.id),
+                    ("partner_id.active", "=", True),
+                ],
+                ["account_id", "usage"],
+                ["partner_id:array_agg"],
+            )
+        }
@@ -89,4 +89,66 @@ class TestDefaultAccount(DefaultAccountCommon):
         self.assertEqual(
             self.partner.property_account_income,
             self.partner_account,
-        )
\ No newline at end of file
+        )
+
+    def test_default_account_autosave_batch(self):
+        """
+        Writing the account on the lines of several invoices at once
+        updates the partner once, with the account of the last invoice.
+        """
+        self.partner.property_account_income = self.partner_account
+        invoices = self.invoice | self._create_invoice(self.env.user, self.partner)
+        lines = invoices.invoice_line_ids
+        self.assertEqual(len(lines), 2)
+
+        # Act: Write the same account on every line
+        lines.write({"account_id": self.other_income_account.id})
+
+        # Assert: The partner account has been updated
+        self.assertEqual(
+            self.partner.property_account_income,
+            self.other_income_account,
+        )
+
+        # Act: Write something else on the lines, the partner is not written
+        self.partner.property_account_income = self.partner_account
+        lines.write({"name": "Renamed line"})
+
+        # Assert: The partner account has not been changed back
+        self.assertEqual(
+            self.partner.property_account_income,
+            self.partner_account,
+        )
+
+    def test_account_associated_partners(self):
+        """
+        The partners using an account as default are read from the index,
+        which follows the changes of the partner default accounts.
+        """
+        # Arrange: Set the account as default income account of the partner
+        self.partner.property_account_income = self.other_income_account
+        accounts = self.other_income_account | self.partner_account
+
+        # Assert: The account lists the partner
+        self.assertEqual(self.other_income_account.income_partner_ids, self.partner)
+        self.assertEqual(self.other_income_account.income_partner_count, 1)
+        self.assertEqual(
+            self.other_income_account.income_partner_names, self.partner.name
+        )
+        self.assertFalse(self.other_income_account.expense_partner_ids)
+
+        # Act: Move the partner to another account
+        self.partner.property_account_income = self.partner_account
+        accounts.invalidate_recordset()
+
+        # Assert: The partner is listed by the new account only
+        self.assertFalse(self.other_income_account.income_partner_ids)
+        self.assertIn(self.partner, self.partner_account.income_partner_ids)
+
+        # Act: Rebuild the index, the result is the same
+        self.env["res.partner.default.account"]._rebuild_index()
+        accounts.invalidate_recordset()
+
+        # Assert
+        self.assertFalse(self.other_income_account.income_partner_ids)
+        self.assertIn(self.partner, self.partner_account.income_partner_ids)
@@ -16,8 +16,10 @@
     "data": [
         "security/account_move_template_security.xml",
         "security/ir.model.access.csv",
+        "data/ir_cron.xml",
         "wizard/account_move_template_run_view.xml",
         "view/account_move_template.xml",
+        "view/account_move_template_schedule.xml",
     ],
     "installable": True,
 }
@@ -1 +1,3 @@
 from . import account_move_template
+from . import account_move_template_schedule
+from . import account_move
@@ -0,0 +1,26 @@
+# License AGPL-3 - See http://www.gnu.org/licenses/agpl-3.0.html
+from odoo import fields, models
+
+
+class AccountMove(models.Model):
+    _inherit = "account.move"
+
+    move_template_schedule_id = fields.Many2one(
+        "account.move.template.schedule",
+        string="Recurring Template",
+        readonly=True,
+        copy=False,
+        ondelete="set null",
+    )
+    move_template_period = fields.Date(
+        string="Recurring Template Period", readonly=True, copy=False
+    )
+
+    # Also the index used to find the occurrences already generated
+    _sql_constraints = [
+        (
+            "move_template_period_uniq",
+            "unique(move_template_schedule_id, move_template_period)",
+            "This recurring journal entry has already been generated!",
+        )
+    ]
@@ -1,9 +1,14 @@
 # Copyright 2015-2019 See manifest
 # License AGPL-3 - See http://www.gnu.org/licenses/agpl-3.0.html
 
-from odoo import _, api, fields, models
+import ast
+import re
+
+from odoo import _, api, fields, models, tools
 from odoo.exceptions import UserError, ValidationError
-from odoo.tools.safe_eval import safe_eval
+from odoo.tools.safe_eval import _BUILTINS, _SAFE_OPCODES, test_expr, unsafe_eval
+
+LINE_REFERENCE = re.compile(r"L(\d+)")
 
 
 class AccountMoveTemplate(models.Model):
@@ -46,35 +51,39 @@ class AccountMoveTemplate(models.Model):
         return super().copy(default)
 
     def eval_computed_line(self, line, sequence2amount):
-        safe_eval_dict = {}
+        code = line._get_compiled_formula()[0]
+        eval_dict = {"__builtins__": dict(_BUILTINS)}
         for seq, amount in sequence2amount.items():
-            safe_eval_dict["L%d" % seq] = amount
+            eval_dict["L%d" % seq] = amount
         try:
-            val = safe_eval(line.python_code, safe_eval_dict)
+            val = unsafe_eval(code, eval_dict)
             sequence2amount[line.sequence] = val
-        except ValueError as err:
-            raise UserError(
-                _(
-                    "Impossible to compute the formula of line with sequence "
-                    "%(sequence)s (formula: %(code)s). Check that the lines used in "
-                    "the formula really exists and have a lower sequence than "
-                    "the current line.",
-                    sequence=line.sequence,
-                    code=line.python_code,
-                )
-            ) from err
-        except SyntaxError as err:
-            raise UserError(
-                _(
-                    "Impossible to compute the formula of line with sequence "
-                    "%(sequence)s (formula: %(code)s): the syntax of the formula "
-                    "is wrong.",
-                    sequence=line.sequence,
-                    code=line.python_code,
-                )
-            ) from err
+        except Exception as err:
+            raise line._formula_reference_error() from err
+
+    def _get_computed_lines_in_order(self):
+        """Return the computed lines sorted so that each line comes after the
+        lines its formula refers to (lines with the same depth keep their
+        sequence order)."""
+        self.ensure_one()
+        computed_lines = self.line_ids.filtered(lambda x: x.type == "computed")
+        available = set(
+            self.line_ids.filtered(lambda x: x.type == "input").mapped("sequence")
+        )
+        pending = {line: line._get_compiled_formula()[1] for line in computed_lines}
+        ordered_lines = self.env["account.move.template.line"]
+        while pending:
+            ready = [line for line, deps in pending.items() if deps <= available]
+            if not ready:
+                # Reference to a missing line or circular reference
+                raise min(pending, key=lambda x: x.sequence)._formula_reference_error()
+            for line in sorted(ready, key=lambda x: x.sequence):
+                ordered_lines |= line
+                available.add(line.sequence)
+                del pending[line]
+        return ordered_lines
 
-    def compute_lines(self, sequence2amount):
+    def compute_lines(self, sequence2amount, computed_lines=None):
         company_cur = self.company_id.currency_id
         input_sequence2amount = sequence2amount.copy()
         for line in self.line_ids.filtered(lambda x: x.type == "input"):
@@ -95,7 +104,9 @@ class AccountMoveTemplate(models.Model):
                     "the journal entry that will be generated by this wizard."
                 )
             )
-        for line in self.line_ids.filtered(lambda x: x.type == "computed"):
+        if computed_lines is None:
+            computed_lines = self._get_computed_lines_in_order()
+        for line in computed_lines:
             self.eval_computed_line(line, sequence2amount)
             sequence2amount[line.sequence] = company_cur.round(
                 sequence2amount[line.sequence]
@@ -220,6 +231,54 @@ class AccountMoveTemplateLine(models.Model):
         )
     ]
 
+    @api.model
+    @tools.ormcache("python_code")
+    def _compile_python_code(self, python_code):
+        """Check a formula against the sandbox rules and compile it once.
+
+        The cache is keyed on the formula text, so writing a new formula on a
+        line invalidates its entry. Returns the code object and the frozenset
+        of line sequences the formula refers to (``L<n>`` names).
+        """
+        expr = python_code.strip()
+        code = test_expr(expr, _SAFE_OPCODES, mode="eval")
+        dependencies = frozenset(
+            int(match.group(1))
+            for node in ast.walk(ast.parse(expr, mode="eval"))
+            if isinstance(node, ast.Name)
+            and (match := LINE_REFERENCE.fullmatch(node.id))
+        )
+        return code, dependencies
+
+    def _get_compiled_formula(self):
+        self.ensure_one()
+        try:
+            return self._compile_python_code(self.python_code or "")
+        except SyntaxError as err:
+            raise UserError(
+                _(
+                    "Impossible to compute the formula of line with sequence "
+                    "%(sequence)s (formula: %(code)s): the syntax of the formula "
+                    "is wrong.",
+                    sequence=self.sequence,
+                    code=self.python_code,
+                )
+            ) from err
+        except ValueError as err:
+            raise self._formula_reference_error() from err
+
+    def _formula_reference_error(self):
+        return UserError(
+            _(
+                "Impossible to compute the formula of line with sequence "
+                "%(sequence)s (formula: %(code)s). Check that the lines used in "
+                "the formula really exists and have a lower sequence than "
+                "the current line.",
+                sequence=self.sequence,
+                code=self.python_code,
+            )
+        )
+
     @api.constrains("type", "python_code")
     def _check_python_code(self):
         for line in self:
@@ -0,0 +1,273 @@
+# License AGPL-3 - See http://www.gnu.org/licenses/agpl-3.0.html
+import logging
+
+from dateutil.relativedelta import relativedelta
+
+from odoo import Command, _, api, fields, models
+from odoo.exceptions import UserError, ValidationError
+
+_logger = logging.getLogger(__name__)
+
+
+class AccountMoveTemplateSchedule(models.Model):
+    _name = "account.move.template.schedule"
+    _description = "Recurring Journal Entry Template"
+    _check_company_auto = True
+    _order = "next_date, id"
+
+    name = fields.Char(required=True)
+    template_id = fields.Many2one(
+        "account.move.template",
+        string="Template",
+        required=True,
+        index=True,
+        ondelete="cascade",
+        check_company=True,
+    )
+    company_id = fields.Many2one(
+        related="template_id.company_id", store=True, string="Company"
+    )
+    company_currency_id = fields.Many2one(
+        related="template_id.company_id.currency_id", string="Company Currency"
+    )
+    active = fields.Boolean(default=True)
+    ref = fields.Char(
+        string="Reference",
+        help="Reference of the generated journal entries. "
+        "Defaults to the reference of the template.",
+    )
+    interval_number = fields.Integer(string="Repeat Every", default=1, required=True)
+    interval_type = fields.Selection(
+        [
+            ("days", "Days"),
+            ("weeks", "Weeks"),
+            ("months", "Months"),
+            ("years", "Years"),
+        ],
+        default="months",
+        required=True,
+    )
+    date_start = fields.Date(
+        string="Start Date", required=True, default=fields.Date.context_today
+    )
+    date_end = fields.Date(string="End Date")
+    next_date = fields.Date(
+        compute="_compute_next_date",
+        store=True,
+        readonly=False,
+        help="Date of the next journal entry to generate. Missed dates before "
+        "today are caught up by the scheduled action.",
+    )
+    line_ids = fields.One2many(
+        "account.move.template.schedule.line",
+        "schedule_id",
+        string="Amounts",
+        copy=True,
+    )
+    move_ids = fields.One2many(
+        "account.move", "move_template_schedule_id", string="Journal Entries"
+    )
+    move_count = fields.Integer(compute="_compute_move_count")
+
+    @api.depends("date_start")
+    def _compute_next_date(self):
+        for schedule in self:
+            schedule.next_date = schedule.date_start
+
+    def _compute_move_count(self):
+        counts = dict(
+            self.env["account.move"]._read_group(
+                [("move_template_schedule_id", "in", self.ids)],
+                ["move_template_schedule_id"],
+                ["__count"],
+            )
+        )
+        for schedule in self:
+            schedule.move_count = counts.get(schedule, 0)
+
+    @api.constrains("interval_number")
+    def _check_interval_number(self):
+        if any(schedule.interval_number <= 0 for schedule in self):
+            raise ValidationError(_("The interval must be a positive number."))
+
+    @api.constrains("date_start", "date_end")
+    def _check_dates(self):
+        for schedule in self:
+            if schedule.date_end and schedule.date_end < schedule.date_start:
+                raise ValidationError(
+                    _("The end date must be after the start date.")
+                )
+
+    @api.onchange("template_id")
+    def _onchange_template_id(self):
+        input_lines = self.template_id.line_ids.filtered(
+            lambda x: x.type == "input"
+        )
+        self.line_ids = [Command.clear()] + [
+            Command.create({"template_line_id": line.id}) for line in input_lines
+        ]
+
+    def _get_occurrences(self, date_to):
+        """Return the occurrence dates from ``next_date`` to ``date_to``
+        (included) and the first occurrence after them, False when the
+        schedule ends before it. Occurrences are computed from the start date
+        so that month ends are not shifted by short months."""
+        self.ensure_one()
+        if not self.next_date:
+            return [], False
+        step = relativedelta(**{self.interval_type: self.interval_number})
+        dates = []
+        index = 0
+        while True:
+            date = self.date_start + step * index
+            index += 1
+            if date < self.next_date:
+                continue
+            if self.date_end and date > self.date_end:
+                return dates, False
+            if date > date_to:
+                return dates, date
+            dates.append(date)
+
+    def _get_existing_occurrences(self, dates):
+        """Occurrences already generated, as (schedule id, date) pairs, read
+        with a single lookup on the (schedule, period) index of the moves"""
+        if not dates:
+            return set()
+        return {
+            (schedule.id, period)
+            for schedule, period in self.env["account.move"]
+            .sudo()
+            .with_context(active_test=False)
+            ._read_group(
+                [
+                    ("move_template_schedule_id", "in", self.ids),
+                    ("move_template_period", "in", list(dates)),
+                ],
+                ["move_template_schedule_id", "move_template_period:day"],
+            )
+        }
+
+    def _generate_entries(self, dates):
+        """Create the journal entries of the given occurrence dates at once"""
+        self.ensure_one()
+        wizard = (
+            self.env["account.move.template.run"]
+            .with_company(self.company_id)
+            .create(
+                {
+                    "template_id": self.template_id.id,
+                    "company_id": self.company_id.id,
+                    "ref": self.ref or self.template_id.ref,
+                }
+            )
+        )
+        amounts = {f"L{line.sequence}": line.amount for line in self.line_ids}
+        return wizard.generate_moves(
+            [
+                dict(
+                    amounts,
+                    date=date,
+                    move_vals={
+                        "move_template_schedule_id": self.id,
+                        "move_template_period": date,
+                    },
+                )
+                for date in dates
+            ]
+        )
+
+    def _run_schedules(self, date_to=None):
+        """Generate every occurrence due up to ``date_to`` (today by default)
+        that does not exist yet, one batch of journal entries per schedule.
+
+        Running it again for the same dates does not duplicate entries, so it
+        can catch up on the periods missed while the scheduled action was not
+        running.
+        """
+        date_to = date_to or fields.Date.context_today(self)
+        occurrences = {
+            schedule: schedule._get_occurrences(date_to) for schedule in self
+        }
+        existing = self._get_existing_occurrences(
+            {date for dates, __ in occurrences.values() for date in dates}
+        )
+        moves = self.env["account.move"]
+        for schedule, (dates, next_date) in occurrences.items():
+            dates = [date for date in dates if (schedule.id, date) not in existing]
+            try:
+                with self.env.cr.savepoint():
+                    if dates:
+                        moves |= schedule._generate_entries(dates)
+                    schedule.next_date = next_date
+            except (UserError, ValidationError) as err:
+                _logger.warning(
+                    "Recurring journal entry %s could not be generated: %s",
+                    schedule.display_name,
+                    err,
+                )
+        return moves
+
+    @api.model
+    def _cron_generate_entries(self):
+        today = fields.Date.context_today(self)
+        schedules = self.sudo().search([("next_date", "<=", today)])
+        schedules._run_schedules(today)
+
+    def action_generate_entries(self):
+        """Called by the button on the form view"""
+        moves = self._run_schedules()
+        result = self.env["ir.actions.actions"]._for_xml_id(
+            "account.action_move_journal_line"
+        )
+        result.update(
+            {
+                "domain": [("id", "in", moves.ids)],
+                "context": self.env.context,
+            }
+        )
+        return result
+
+    def action_view_moves(self):
+        self.ensure_one()
+        result = self.env["ir.actions.actions"]._for_xml_id(
+            "account.action_move_journal_line"
+        )
+        result.update(
+            {
+                "domain": [("move_template_schedule_id", "=", self.id)],
+                "context": self.env.context,
+            }
+        )
+        return result
+
+
+class AccountMoveTemplateScheduleLine(models.Model):
+    _name = "account.move.template.schedule.line"
+    _description = "Recurring Journal Entry Template Amount"
+    _order = "sequence, id"
+
+    schedule_id = fields.Many2one(
+        "account.move.template.schedule", required=True, ondelete="cascade"
+    )
+    template_line_id = fields.Many2one(
+        "account.move.template.line",
+        string="Template Line",
+        required=True,
+        ondelete="cascade",
+        domain="[('template_id', '=', parent.template_id), ('type', '=', 'input')]",
+    )
+    sequence = fields.Integer(related="template_line_id.sequence", store=True)
+    name = fields.Char(related="template_line_id.name")
+    account_id = fields.Many2one(related="template_line_id.account_id")
+    move_line_type = fields.Selection(related="template_line_id.move_line_type")
+    company_currency_id = fields.Many2one(related="schedule_id.company_currency_id")
+    amount = fields.Monetary(currency_field="company_currency_id")
+
+    _sql_constraints = [
+        (
+            "template_line_uniq",
+            "unique(schedule_id, template_line_id)",
+            "Each template line can only be given one amount per schedule!",
+        )
+    ]
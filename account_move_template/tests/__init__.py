@@ -2,3 +2,4 @@
 # doesn't exist any more on v12
 # from . import test_account_move_template
 from . import test_account_move_template_options
+from . import test_account_move_template_schedule
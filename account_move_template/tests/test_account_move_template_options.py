@@ -1,5 +1,6 @@
 # Copyright 2020 Ecosoft (http://ecosoft.co.th)
 # License AGPL-3 - See http://www.gnu.org/licenses/agpl-3.0.html
+import base64
 from datetime import timedelta
 
 from odoo import Command, fields
@@ -166,6 +167,76 @@ class TestAccountMoveTemplateEnhanced(AccountTestInvoicingCommon):
             "credit",
         )
 
+    def test_move_template_formula_dependency_order(self):
+        """Computed lines are evaluated in dependency order, not by sequence"""
+        self.move_template.line_ids[1].python_code = "L2/2"
+        self.move_template.line_ids[2].python_code = "L0*2/3"
+        self.assertEqual(
+            self.move_template._get_computed_lines_in_order(),
+            self.move_template.line_ids[2] | self.move_template.line_ids[1],
+        )
+        expected_values = [
+            {"account_id": self.ar_account_id.id, "credit": 0.0, "debit": 300.0},
+            {"account_id": self.income_account_id.id, "credit": 100.0, "debit": 0.0},
+            {"account_id": self.income_account_id.id, "credit": 200.0, "debit": 0.0},
+        ]
+        self._run_template_and_validate(
+            self.move_template, 300, expected_values, "credit"
+        )
+
+    def test_move_template_formula_cache(self):
+        """Formulas are compiled once and recompiled when changed"""
+        line = self.move_template.line_ids[1]
+        code, dependencies = line._get_compiled_formula()
+        self.assertEqual(dependencies, frozenset({0}))
+        self.assertIs(line._get_compiled_formula()[0], code)
+        line.python_code = "L0*1/3 + L2*0"
+        self.assertEqual(line._get_compiled_formula()[1], frozenset({0, 2}))
+
+    def test_move_template_formula_circular_reference(self):
+        self.move_template.line_ids[1].python_code = "L2"
+        self.move_template.line_ids[2].python_code = "L1"
+        wiz = self.env["account.move.template.run"].create(
+            {"template_id": self.move_template.id}
+        )
+        wiz.load_lines()
+        wiz.line_ids[0].amount = 300
+        msg_error = "really exists and have a lower sequence than the current line."
+        with self.assertRaisesRegex(UserError, msg_error):
+            wiz.generate_move()
+
+    def test_move_template_batch_from_file(self):
+        """One entry per CSV row, created together"""
+        content = "L0,ref,partner_id\n300,CC1,%d\n600,CC2,\n0,CC3,\n" % (
+            self.partner1.id
+        )
+        wiz = self.env["account.move.template.run"].create(
+            {
+                "template_id": self.move_template.id,
+                "batch_file": base64.b64encode(content.encode()),
+            }
+        )
+        res = wiz.generate_moves_from_file()
+        moves = self.Move.search(res["domain"]).sorted("ref")
+        self.assertEqual(moves.mapped("ref"), ["CC1", "CC2"])
+        self.assertEqual(moves[0].line_ids.partner_id, self.partner1)
+        self.assertFalse(moves[1].line_ids.partner_id)
+        self.assertRecordValues(
+            moves[1].line_ids.sorted("credit"),
+            [
+                {"account_id": self.ar_account_id.id, "credit": 0.0, "debit": 600.0},
+                {"account_id": self.income_account_id.id, "credit": 200.0},
+                {"account_id": self.income_account_id.id, "credit": 400.0},
+            ],
+        )
+
+    def test_move_template_batch_missing_input(self):
+        wiz = self.env["account.move.template.run"].create(
+            {"template_id": self.move_template.id}
+        )
+        with self.assertRaisesRegex(UserError, "Row 2"):
+            wiz.generate_moves([{"L0": 100.0}, {"L1": 100.0}])
+
     def test_move_template_optional(self):
         """Test optional case, input amount -300, expect optional account"""
         expected_values = [
@@ -0,0 +1,86 @@
+# License AGPL-3 - See http://www.gnu.org/licenses/agpl-3.0.html
+from datetime import date
+
+from odoo import Command
+from odoo.tests import tagged
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+
+@tagged("post_install", "-at_install")
+class TestAccountMoveTemplateSchedule(AccountTestInvoicingCommon):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.company = cls.company_data["company"]
+        cls.template = cls.env["account.move.template"].create(
+            {
+                "name": "Monthly accrual",
+                "journal_id": cls.company_data["default_journal_misc"].id,
+                "company_id": cls.company.id,
+                "line_ids": [
+                    Command.create(
+                        {
+                            "sequence": 1,
+                            "name": "Expense",
+                            "account_id": cls.company_data[
+                                "default_account_expense"
+                            ].id,
+                            "move_line_type": "dr",
+                            "type": "input",
+                        }
+                    ),
+                    Command.create(
+                        {
+                            "sequence": 2,
+                            "name": "Accrual",
+                            "account_id": cls.company_data[
+                                "default_account_payable"
+                            ].id,
+                            "move_line_type": "cr",
+                            "type": "computed",
+                            "python_code": "L1",
+                        }
+                    ),
+                ],
+            }
+        )
+        cls.schedule = cls.env["account.move.template.schedule"].create(
+            {
+                "name": "Rent accrual",
+                "template_id": cls.template.id,
+                "date_start": date(2024, 1, 31),
+                "date_end": date(2024, 6, 30),
+                "line_ids": [
+                    Command.create(
+                        {
+                            "template_line_id": cls.template.line_ids[0].id,
+                            "amount": 1000.0,
+                        }
+                    )
+                ],
+            }
+        )
+
+    def test_schedule_catch_up(self):
+        moves = self.schedule._run_schedules(date(2024, 3, 31))
+        self.assertEqual(
+            moves.sorted("date").mapped("date"),
+            [date(2024, 1, 31), date(2024, 2, 29), date(2024, 3, 31)],
+        )
+        self.assertEqual(
+            moves.mapped(lambda move: sum(move.line_ids.mapped("debit"))),
+            [1000.0] * 3,
+        )
+        self.assertEqual(self.schedule.next_date, date(2024, 4, 30))
+        # Running again on already generated periods does not duplicate them
+        self.schedule.next_date = date(2024, 1, 31)
+        moves = self.schedule._run_schedules(date(2024, 4, 30))
+        self.assertEqual(moves.mapped("date"), [date(2024, 4, 30)])
+        self.assertEqual(self.schedule.move_count, 4)
+
+    def test_schedule_end(self):
+        self.schedule._run_schedules(date(2024, 12, 31))
+        self.assertEqual(self.schedule.move_count, 6)
+        self.assertFalse(self.schedule.next_date)
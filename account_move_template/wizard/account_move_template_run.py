@@ -1,5 +1,8 @@
 # Copyright 2015-2019 See manifest
 # License AGPL-3 - See http://www.gnu.org/licenses/agpl-3.0.html
+import base64
+import csv
+import io
 from ast import literal_eval
 
 from markupsafe import Markup
@@ -7,6 +10,8 @@ from markupsafe import Markup
 from odoo import Command, _, fields, models
 from odoo.exceptions import UserError, ValidationError
 
+from ..models.account_move_template import LINE_REFERENCE
+
 
 class AccountMoveTemplateRun(models.TransientModel):
     _name = "account.move.template.run"
@@ -48,6 +53,13 @@ Valid dictionary to overwrite template lines:
  'L2': {'partner_id': 2, 'amount': 200, 'name': 'some label 2'}, }
         """
     )
+    batch_file = fields.Binary(
+        string="Batch File",
+        help="CSV file with one journal entry per row: one L<n> column per "
+        "input line of the template, and optionally date, ref and partner_id "
+        "columns.",
+    )
+    batch_filename = fields.Char()
 
     def _prepare_wizard_line(self, tmpl_line):
         vals = {
@@ -177,21 +189,9 @@ Valid dictionary to overwrite template lines:
         if all([company_cur.is_zero(x) for x in sequence2amount.values()]):
             raise UserError(_("Debit and credit of all lines are null."))
         move_vals = self._prepare_move()
-        for line in self.template_id.line_ids:
-            amount = sequence2amount[line.sequence]
-            if not company_cur.is_zero(amount):
-                move_vals["line_ids"].append(
-                    Command.create(self._prepare_move_line(line, amount))
-                )
+        move_vals["line_ids"] = self._prepare_move_lines(sequence2amount)
         move = self.env["account.move"].create(move_vals)
-        msg = _(
-            "Journal entry created from template "
-            "<a href=# data-oe-model=account.move.template "
-            "data-oe-id=%(template_id)d>%(template_name)s</a>.",
-            template_id=self.template_id.id,
-            template_name=self.template_id.display_name,
-        )
-        move.message_post(body=Markup(msg))
+        move.message_post(body=self._get_move_creation_message())
         result = self.env["ir.actions.actions"]._for_xml_id(
             "account.action_move_journal_line"
         )
@@ -207,51 +207,208 @@ Valid dictionary to overwrite template lines:
         )
         return result
 
-    def _prepare_move(self):
+    # BATCH MODE
+    def generate_moves_from_file(self):
+        """Called by the button on the wizard: one journal entry per CSV row"""
+        self.ensure_one()
+        if not self.batch_file:
+            raise UserError(_("Please upload a CSV file."))
+        moves = self.generate_moves(self._read_batch_file())
+        result = self.env["ir.actions.actions"]._for_xml_id(
+            "account.action_move_journal_line"
+        )
+        result.update(
+            {
+                "name": _("Entries from template %s") % self.template_id.name,
+                "domain": [("id", "in", moves.ids)],
+                "views": False,
+                "view_id": False,
+                "view_mode": "list,form,kanban",
+                "context": self.env.context,
+            }
+        )
+        return result
+
+    def _read_batch_file(self):
+        """Parse the uploaded CSV file into rows for ``generate_moves``.
+
+        The header holds one ``L<n>`` column per input line of the template
+        and optionally ``date`` (YYYY-MM-DD), ``ref`` and ``partner_id``.
+        Empty amount cells are read as 0.
+        """
+        self.ensure_one()
+        content = base64.b64decode(self.batch_file).decode("utf-8-sig")
+        rows = []
+        for index, row in enumerate(csv.DictReader(io.StringIO(content)), start=2):
+            vals = {}
+            try:
+                for key, value in row.items():
+                    key = (key or "").strip()
+                    value = (value or "").strip()
+                    if LINE_REFERENCE.fullmatch(key):
+                        vals[key] = float(value or 0.0)
+                    elif key == "date" and value:
+                        vals[key] = fields.Date.to_date(value)
+                    elif key == "partner_id" and value:
+                        vals[key] = int(value)
+                    elif key == "ref" and value:
+                        vals[key] = value
+            except ValueError as err:
+                raise UserError(
+                    _(
+                        "Line %(line)s of the file: %(error)s",
+                        line=index,
+                        error=err,
+                    )
+                ) from err
+            rows.append(vals)
+        return rows
+
+    def generate_moves(self, rows):
+        """Create one journal entry per row with a single ``create``.
+
+        ``rows`` is an iterable of dicts mapping ``L<n>`` keys to the amounts
+        of the template's input lines, with optional ``date``, ``ref`` and
+        ``partner_id`` keys overriding the wizard values and an optional
+        ``move_vals`` dict merged into the values of the move. Rows where all
+        the amounts are null are skipped. Returns the created moves.
+        """
+        self.ensure_one()
+        template = self.template_id
+        company_cur = self.company_id.currency_id
+        input_sequences = set(
+            template.line_ids.filtered(lambda x: x.type == "input").mapped("sequence")
+        )
+        computed_lines = template._get_computed_lines_in_order()
+        cache = {}
+        move_vals_list = []
+        for index, row in enumerate(rows, start=1):
+            sequence2amount = {
+                int(key[1:]): amount
+                for key, amount in row.items()
+                if LINE_REFERENCE.fullmatch(key)
+            }
+            if set(sequence2amount) != input_sequences:
+                raise UserError(
+                    _(
+                        "Row %(row)s: the amounts must be given for the input "
+                        "lines %(lines)s of the template, and only for them.",
+                        row=index,
+                        lines=", ".join(f"L{seq}" for seq in sorted(input_sequences)),
+                    )
+                )
+            template.compute_lines(sequence2amount, computed_lines=computed_lines)
+            if all(company_cur.is_zero(x) for x in sequence2amount.values()):
+                continue
+            date = row.get("date") or self.date
+            move_vals = self._prepare_move(
+                date=date, ref=row.get("ref") or self.ref or template.ref
+            )
+            move_vals["line_ids"] = self._prepare_move_lines(
+                sequence2amount,
+                date=date,
+                partner=self.env["res.partner"].browse(row.get("partner_id")),
+                cache=cache,
+            )
+            move_vals.update(row.get("move_vals", {}))
+            move_vals_list.append(move_vals)
+        moves = self.env["account.move"].create(move_vals_list)
+        moves._message_log_batch(
+            bodies=dict.fromkeys(moves.ids, self._get_move_creation_message())
+        )
+        return moves
+
+    def _get_move_creation_message(self):
+        return Markup(
+            _(
+                "Journal entry created from template "
+                "<a href=# data-oe-model=account.move.template "
+                "data-oe-id=%(template_id)d>%(template_name)s</a>.",
+                template_id=self.template_id.id,
+                template_name=self.template_id.display_name,
+            )
+        )
+
+    def _prepare_move(self, date=None, ref=None):
         move_vals = {
-            "ref": self.ref,
-            "journal_id": self.journal_id.id,
-            "date": self.date,
+            "ref": ref or self.ref,
+            "journal_id": (self.journal_id or self.template_id.journal_id).id,
+            "date": date or self.date,
             "company_id": self.company_id.id,
             "line_ids": [],
         }
         return move_vals
 
-    def _prepare_move_line(self, line, amount):
-        date_maturity = False
-        if line.payment_term_id:
-            date_maturity = max(
+    def _prepare_move_lines(self, sequence2amount, date=None, partner=None, cache=None):
+        company_cur = self.company_id.currency_id
+        if cache is None:
+            cache = {}
+        lines_vals = []
+        for line in self.template_id.line_ids:
+            amount = sequence2amount[line.sequence]
+            if not company_cur.is_zero(amount):
+                lines_vals.append(
+                    Command.create(
+                        self._prepare_move_line(
+                            line, amount, date=date, partner=partner, cache=cache
+                        )
+                    )
+                )
+        return lines_vals
+
+    def _get_template_line_cache(self, line):
+        """Values of a template line that do not depend on the generated
+        amount, resolved once per template line when generating many moves"""
+        tax_tag_ids = None
+        if line.tax_ids:
+            document_type = "refund" if line.is_refund else "invoice"
+            atrl_ids = self.env["account.tax.repartition.line"].search(
                 [
-                    line._get_due_date(self.date)
-                    for line in line.payment_term_id.line_ids
+                    ("tax_id", "in", line.tax_ids.ids),
+                    ("document_type", "=", document_type),
+                    ("repartition_type", "=", "base"),
                 ]
             )
+            tax_tag_ids = atrl_ids.mapped("tag_ids").ids
+        if line.tax_repartition_line_id:
+            tax_tag_ids = line.tax_repartition_line_id.tag_ids.ids
+        return {
+            "tax_tag_ids": tax_tag_ids,
+            "payment_term_lines": line.payment_term_id.line_ids,
+            # date -> maturity date
+            "date_maturity": {},
+        }
+
+    def _prepare_move_line(self, line, amount, date=None, partner=None, cache=None):
+        date = date or self.date
+        if cache is None:
+            cache = {}
+        if line.id not in cache:
+            cache[line.id] = self._get_template_line_cache(line)
+        line_cache = cache[line.id]
+        date_maturity = False
+        if line_cache["payment_term_lines"]:
+            if date not in line_cache["date_maturity"]:
+                line_cache["date_maturity"][date] = max(
+                    term_line._get_due_date(date)
+                    for term_line in line_cache["payment_term_lines"]
+                )
+            date_maturity = line_cache["date_maturity"][date]
         debit = line.move_line_type == "dr"
         values = {
             "name": line.name,
             "account_id": line.account_id.id,
             "credit": not debit and amount or 0.0,
             "debit": debit and amount or 0.0,
-            "partner_id": self.partner_id.id or line.partner_id.id,
-            "date_maturity": date_maturity or self.date,
+            "partner_id": (partner or self.partner_id or line.partner_id).id,
+            "date_maturity": date_maturity or date,
             "tax_repartition_line_id": line.tax_repartition_line_id.id or False,
             "analytic_distribution": line.analytic_distribution,
         }
         if line.tax_ids:
             values["tax_ids"] = [Command.set(line.tax_ids.ids)]
-            document_type = "refund" if line.is_refund else "invoice"
-            atrl_ids = self.env["account.tax.repartition.line"].search(
-                [
-                    ("tax_id", "in", line.tax_ids.ids),
-                    ("document_type", "=", document_type),
-                    ("repartition_type", "=", "base"),
-                ]
-            )
-            values["tax_tag_ids"] = [Command.set(atrl_ids.mapped("tag_ids").ids)]
-        if line.tax_repartition_line_id:
-            values["tax_tag_ids"] = [
-                Command.set(line.tax_repartition_line_id.tag_ids.ids)
-            ]
+        if line_cache["tax_tag_ids"] is not None:
+            values["tax_tag_ids"] = [Command.set(line_cache["tax_tag_ids"])]
         # With overwrite options
         overwrite = self._context.get("overwrite", {})
         move_line_vals = overwrite.get(f"L{line.sequence}", {})
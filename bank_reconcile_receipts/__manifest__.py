@@ -42,8 +42,13 @@ Technical:
     ],
     'data': [
         'security/ir.model.access.csv',
+        'data/bank_partner_match_key_data.xml',
+        'data/ir_cron.xml',
         'views/account_reconcile_model_views.xml',
         'views/account_bank_statement_line_views.xml',
+        'views/bank_reference_memory_views.xml',
+        'wizard/bank_receipt_auto_apply_views.xml',
+        'wizard/bank_statement_stream_import_views.xml',
     ],
     'demo': [],
     'installable': True,
@@ -1,4 +1,7 @@
 from . import account_reconcile_model
 from . import bank_rec_widget
 from . import account_bank_statement_line
-from . import account_bank_statement_line_simple
\ No newline at end of file
+from . import account_bank_statement_line_simple
+from . import bank_partner_match_key
+from . import res_partner
+from . import bank_reference_memory
\ No newline at end of file
@@ -1,7 +1,11 @@
-from odoo import models, fields, api, _
-from odoo.exceptions import UserError
+from collections import defaultdict
+
+from odoo import models, fields, api, Command, _
+from odoo.exceptions import UserError, ValidationError
 import logging
 
+from .bank_partner_match_key import PARTNER_MATCH_MIN_SCORE
+
 _logger = logging.getLogger(__name__)
 
 
@@ -15,6 +19,7 @@ class AccountBankStatementLine(models.Model):
         
         created_payments = []
         skipped_lines = []
+        found_partners = self.filtered(lambda l: not l.partner_id)._find_partners_by_payment_ref()
         
         for line in self:
             _logger.warning(f"Processing line {line.id}: {line.payment_ref} - Amount: {line.amount}")
@@ -42,12 +47,9 @@ class AccountBankStatementLine(models.Model):
             _logger.warning(f"Initial partner: {partner_id.name if partner_id else 'None'}")
             
             if not partner_id and line.payment_ref:
-                # Try to find partner by name
-                _logger.warning(f"Searching partner by payment_ref: {line.payment_ref}")
-                partner_id = self.env['res.partner'].search([
-                    ('name', 'ilike', line.payment_ref[:50])
-                ], limit=1)
-                _logger.warning(f"Found partner by search: {partner_id.name if partner_id else 'None'}")
+                # Try to find partner from the payment reference
+                partner_id = found_partners.get(line, self.env['res.partner'])
+                _logger.warning(f"Found partner by payment_ref: {partner_id.name if partner_id else 'None'}")
             
             if not partner_id:
                 # Create a generic partner if none found
@@ -106,6 +108,7 @@ class AccountBankStatementLine(models.Model):
                     'move_id': payment.move_id.id
                 })
                 _logger.warning(f"Line {line.id} marked as reconciled with move {payment.move_id.id}")
+                line._learn_from_payments({line: payment})
                 
                 created_payments.append(payment)
                 
@@ -165,6 +168,7 @@ class AccountBankStatementLine(models.Model):
         _logger.warning(f"Number of lines to process: {len(self)}")
         
         created_payments = []
+        found_partners = self.filtered(lambda l: not l.partner_id)._find_partners_by_payment_ref()
         
         for line in self:
             _logger.warning(f"Force processing line {line.id}: {line.payment_ref} - Amount: {line.amount}")
@@ -187,12 +191,9 @@ class AccountBankStatementLine(models.Model):
             _logger.warning(f"Initial partner: {partner_id.name if partner_id else 'None'}")
             
             if not partner_id and line.payment_ref:
-                # Try to find partner by name
-                _logger.warning(f"Searching partner by payment_ref: {line.payment_ref}")
-                partner_id = self.env['res.partner'].search([
-                    ('name', 'ilike', line.payment_ref[:50])
-                ], limit=1)
-                _logger.warning(f"Found partner by search: {partner_id.name if partner_id else 'None'}")
+                # Try to find partner from the payment reference
+                partner_id = found_partners.get(line, self.env['res.partner'])
+                _logger.warning(f"Found partner by payment_ref: {partner_id.name if partner_id else 'None'}")
             
             if not partner_id:
                 # Create a generic partner if none found
@@ -284,4 +285,250 @@ class AccountBankStatementLine(models.Model):
                     'message': 'No payments were created. Check logs for details.',
                     'type': 'warning',
                 }
-            }
\ No newline at end of file
+            }
+
+    # -------------------------------------------------------------------------
+    # Bulk mode
+    # -------------------------------------------------------------------------
+
+    def _get_payment_receipt_type(self):
+        """(payment_type, partner_type) of the payment created for the line"""
+        self.ensure_one()
+        if self.amount > 0:
+            return 'inbound', 'customer'
+        return 'outbound', 'supplier'
+
+    def _get_partner_candidates(self, limit=3):
+        """Ranked partner candidates of each line, from the partner matching
+        index, with one lookup per company for the whole batch
+
+        :return: dict {statement line: [(partner, score), ...]}
+        """
+        candidates = {}
+        match_key_model = self.env['bank.partner.match.key']
+        for company, lines in self.filtered('payment_ref').grouped('company_id').items():
+            by_ref = match_key_model._match_partners(lines.mapped('payment_ref'), company, limit)
+            for line in lines:
+                candidates[line] = by_ref.get(line.payment_ref, [])
+        return candidates
+
+    def _find_partners_by_payment_ref(self):
+        """Partner of each line: the one remembered for its reference pattern,
+        otherwise the best candidate of the matching index when its score is
+        high enough
+
+        :return: dict {statement line: partner}
+        """
+        partners = {
+            line: memory.partner_id
+            for line, memory in self.env['bank.reference.memory']._recall(self).items()
+        }
+        partners.update({
+            line: candidates[0][0]
+            for line, candidates in self.filtered(
+                lambda l: l not in partners
+            )._get_partner_candidates(limit=1).items()
+            if candidates and candidates[0][1] >= PARTNER_MATCH_MIN_SCORE
+        })
+        return partners
+
+    def _learn_from_payments(self, payment_by_line):
+        """Feed the partner matching index and the reference memory with the
+        lines reconciled with a payment
+
+        :param payment_by_line: dict {statement line: account.payment}
+        """
+        self.env['bank.partner.match.key']._learn_references({
+            line: payment.partner_id for line, payment in payment_by_line.items()
+        })
+        self.env['bank.reference.memory']._remember(payment_by_line)
+
+    def _get_payment_receipt_partners(self):
+        """Partner of the payment of each line: the partner of the line, a
+        partner found by the payment reference or a new partner, created at
+        once for the whole batch (one per distinct name).
+
+        :return: dict {statement line: partner}
+        """
+        partners = {line: line.partner_id for line in self if line.partner_id}
+        partners.update(self.filtered(lambda l: not l.partner_id)._find_partners_by_payment_ref())
+        missing = self.filtered(lambda l: l not in partners)
+        if missing:
+            payment_types_by_name = defaultdict(set)
+            for line in missing:
+                name = line.payment_ref or f"Bank Transaction {line.date}"
+                payment_types_by_name[name].add(line._get_payment_receipt_type()[0])
+            new_partners = self.env['res.partner'].create([{
+                'name': name,
+                'is_company': True,
+                'customer_rank': 1 if 'inbound' in payment_types else 0,
+                'supplier_rank': 1 if 'outbound' in payment_types else 0,
+            } for name, payment_types in payment_types_by_name.items()])
+            partner_by_name = dict(zip(payment_types_by_name, new_partners))
+            for line in missing:
+                partners[line] = partner_by_name[line.payment_ref or f"Bank Transaction {line.date}"]
+        return partners
+
+    def _prepare_payment_receipt_vals(self, partner, payment_method_line):
+        self.ensure_one()
+        payment_type, partner_type = self._get_payment_receipt_type()
+        return {
+            'payment_type': payment_type,
+            'partner_type': partner_type,
+            'partner_id': partner.id,
+            'amount': abs(self.amount),
+            'currency_id': self.currency_id.id or self.journal_id.currency_id.id or self.env.company.currency_id.id,
+            'journal_id': self.journal_id.id,
+            'payment_method_line_id': payment_method_line.id,
+            'date': self.date,
+            'memo': f"Bank reconciliation: {self.payment_ref or self.ref}",
+        }
+
+    def _reconcile_payment_receipts(self, payment_by_line):
+        """Reconcile each statement line with its posted payment.
+
+        The suspense line of the statement entry is moved to the outstanding
+        account of the payment, then all the pairs are reconciled together.
+        """
+        plan = []
+        for line, payment in payment_by_line.items():
+            __, suspense_lines, __ = line._seek_for_lines()
+            payment_lines = payment._seek_for_lines()[0]
+            line.move_id.with_context(
+                skip_readonly_check=True,
+                skip_account_move_synchronization=True,
+            ).write({
+                'line_ids': [
+                    Command.update(suspense_line.id, {
+                        'account_id': payment_lines.account_id[:1].id,
+                        'partner_id': payment.partner_id.id,
+                    })
+                    for suspense_line in suspense_lines
+                ],
+            })
+            plan.append(suspense_lines | payment_lines)
+        self.env['account.move.line']._reconcile_plan(plan)
+        self._learn_from_payments(payment_by_line)
+
+    def _process_payment_receipts(self, vals_by_line):
+        """Create, post and reconcile the payments of the lines at once"""
+        lines_by_partner = defaultdict(lambda: self.browse())
+        for line in self:
+            if line.partner_id.id != vals_by_line[line]['partner_id']:
+                lines_by_partner[vals_by_line[line]['partner_id']] |= line
+        for partner_id, lines in lines_by_partner.items():
+            lines.partner_id = partner_id
+        payments = self.env['account.payment'].create([vals_by_line[line] for line in self])
+        payments.action_post()
+        payment_by_line = dict(zip(self, payments))
+        self._reconcile_payment_receipts(payment_by_line)
+        return payment_by_line
+
+    def _run_payment_receipts(self, vals_by_line):
+        """Create, post and reconcile the payments of the lines in one batch.
+
+        When the batch fails, the lines are processed one by one so that a
+        faulty line does not block the others.
+
+        :return: dict {statement line: {'status': 'created' or 'error',
+            'payment': account.payment, 'message': str}}
+        """
+        if not self:
+            return {}
+        results = {}
+        try:
+            with self.env.cr.savepoint():
+                payment_by_line = self._process_payment_receipts(vals_by_line)
+        except (UserError, ValidationError) as e:
+            _logger.info("Bulk payment creation failed (%s), processing lines one by one", e)
+            payment_by_line = {}
+            for line in self:
+                try:
+                    with self.env.cr.savepoint():
+                        payment_by_line.update(line._process_payment_receipts(vals_by_line))
+                except (UserError, ValidationError) as line_error:
+                    results[line] = {'status': 'error', 'message': str(line_error)}
+        for line, payment in payment_by_line.items():
+            results[line] = {'status': 'created', 'payment': payment, 'message': payment.name}
+        return results
+
+    def _create_payment_receipts_bulk(self):
+        """Create and reconcile a payment/receipt for every selected line.
+
+        Partners and payment methods are resolved for all the lines in one
+        pass, payments are created, posted and reconciled in one batch
+        (see ``_run_payment_receipts``).
+
+        :return: dict {statement line: {'status': 'created', 'skipped' or
+            'error', 'payment': account.payment, 'message': str}}
+        """
+        results = {}
+        lines = self.browse()
+        for line in self:
+            if line.is_reconciled:
+                results[line] = {'status': 'skipped', 'message': _("Already reconciled")}
+            else:
+                lines |= line
+        partners = lines._get_payment_receipt_partners()
+        method_lines = {}
+        vals_by_line = {}
+        for line in lines:
+            payment_type = line._get_payment_receipt_type()[0]
+            key = (line.journal_id, payment_type)
+            if key not in method_lines:
+                method_lines[key] = line.journal_id._get_available_payment_method_lines(payment_type)[:1]
+            if not method_lines[key]:
+                results[line] = {'status': 'error', 'message': _(
+                    "No payment method available for %(payment_type)s payments in journal %(journal)s",
+                    payment_type=payment_type, journal=line.journal_id.name,
+                )}
+                continue
+            vals_by_line[line] = line._prepare_payment_receipt_vals(partners[line], method_lines[key])
+        results.update(lines.filtered(lambda l: l in vals_by_line)._run_payment_receipts(vals_by_line))
+        return results
+
+    @api.model
+    def _get_payment_receipts_notification(self, results, title):
+        """Notification summarizing the per-line outcomes of a bulk run"""
+        payments = self.env['account.payment'].union(*(
+            result['payment'] for result in results.values() if result.get('payment')
+        ))
+        errors = [
+            f"{line.payment_ref or line.id}: {result['message']}"
+            for line, result in results.items() if result['status'] == 'error'
+        ]
+        skipped = sum(1 for result in results.values() if result['status'] == 'skipped')
+        message = _(
+            "%(created)s payments created, %(skipped)s lines skipped, %(errors)s errors.",
+            created=len(payments), skipped=skipped, errors=len(errors),
+        )
+        if errors:
+            message += '\n' + '\n'.join(errors[:20])
+            if len(errors) > 20:
+                message += '\n' + _("... and %s more", len(errors) - 20)
+        params = {
+            'title': title,
+            'message': message,
+            'type': 'warning' if errors or not payments else 'success',
+            'sticky': bool(errors),
+        }
+        if payments:
+            params['next'] = {
+                'type': 'ir.actions.act_window',
+                'name': _("Created Payments"),
+                'res_model': 'account.payment',
+                'domain': [('id', 'in', payments.ids)],
+                'view_mode': 'list,form',
+                'target': 'current',
+            }
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': params,
+        }
+
+    def action_create_payment_receipt_bulk(self):
+        """Bulk mode of action_create_payment_receipt, for large selections"""
+        return self._get_payment_receipts_notification(
+            self._create_payment_receipts_bulk(), _("Create Payments/Receipts"),
+        )
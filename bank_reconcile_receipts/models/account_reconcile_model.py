@@ -1,9 +1,17 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError, ValidationError
+from odoo.tools import split_every
 import logging
+import re
+
+from .bank_partner_match_key import PARTNER_MATCH_MIN_SCORE
 
 _logger = logging.getLogger(__name__)
 
+RECEIPT_COUNTERPART_TYPES = ('customer_receipts', 'vendor_payments')
+# Statement lines evaluated per batch by the scheduled action
+AUTO_APPLY_BATCH_SIZE = 1000
+
 
 class AccountReconcileModel(models.Model):
     _inherit = 'account.reconcile.model'
@@ -33,6 +41,12 @@ class AccountReconcileModel(models.Model):
         help="Automatically post the created payment/receipt"
     )
     
+    auto_apply_receipts = fields.Boolean(
+        string='Auto-apply in Batch',
+        help="Apply this model automatically to the unreconciled statement lines "
+             "from the scheduled action"
+    )
+
     payment_memo_template = fields.Char(
         string='Payment Memo Template',
         default='Bank reconciliation: {statement_name}',
@@ -154,6 +168,25 @@ class AccountReconcileModel(models.Model):
             _logger.info(f"Using standard write-off for counterpart_type: {self.counterpart_type}")
             return super()._get_write_off_move_lines_dict(st_line, move_lines)
 
+    def _select_receipt_partner(self, candidates):
+        """Best ranked partner candidate that is a company of the model kind
+        (customer for receipts, supplier for payments)"""
+        self.ensure_one()
+        rank_field = 'customer_rank' if self.counterpart_type == 'customer_receipts' else 'supplier_rank'
+        return next((
+            partner for partner, score in candidates
+            if score >= PARTNER_MATCH_MIN_SCORE and partner.is_company and partner[rank_field] > 0
+        ), self.env['res.partner'])
+
+    def _get_payment_memo(self, st_line, partner):
+        self.ensure_one()
+        memo = self.payment_memo_template or 'Bank reconciliation payment'
+        return memo.format(
+            statement_name=st_line.statement_id.name or '',
+            partner_name=partner.name or '',
+            amount=st_line.amount
+        )
+
     def _create_payment_from_reconcile_model(self, st_line):
         """Create payment/receipt based on reconcile model configuration"""
         _logger.info(f"*** PAYMENT CREATION STARTED ***")
@@ -183,32 +216,26 @@ class AccountReconcileModel(models.Model):
         partner_id = st_line.partner_id
         _logger.info(f"Statement line partner: {partner_id.name if partner_id else 'None'}")
         
+        if not partner_id and st_line.payment_ref:
+            # Partner recordado para el patrón de la referencia
+            memory = self.env['bank.reference.memory']._recall(st_line).get(st_line)
+            if memory and memory.counterpart_type == counterpart_type:
+                partner_id = memory.partner_id
+
         if not partner_id:
-            # Buscar partner por nombre si no está asignado
+            # Buscar partner en el índice de referencias si no está asignado
             if st_line.payment_ref:
                 _logger.info(f"Searching partner by payment reference: {st_line.payment_ref}")
-                partner_domain = [
-                    ('is_company', '=', True),
-                    ('name', 'ilike', st_line.payment_ref[:50])
-                ]
-                if partner_type == 'customer':
-                    partner_domain.append(('customer_rank', '>', 0))
-                else:
-                    partner_domain.append(('supplier_rank', '>', 0))
-                
-                partner_id = self.env['res.partner'].search(partner_domain, limit=1)
+                partner_id = reconcile_model._select_receipt_partner(
+                    st_line._get_partner_candidates(limit=10).get(st_line, [])
+                )
                 
         if not partner_id:
             _logger.warning(f"No partner found for statement line {st_line.id}")
             return {'moves': self.env['account.move']}
         
         # Preparar memo del pago
-        memo = reconcile_model.payment_memo_template or 'Bank reconciliation payment'
-        memo = memo.format(
-            statement_name=st_line.statement_id.name or '',
-            partner_name=partner_id.name or '',
-            amount=st_line.amount
-        )
+        memo = reconcile_model._get_payment_memo(st_line, partner_id)
         
         # Obtener método de pago
         payment_method_line = reconcile_model.payment_method_line_id
@@ -249,6 +276,7 @@ class AccountReconcileModel(models.Model):
         try:
             payment = self.env['account.payment'].create(payment_vals)
             _logger.info(f"Payment created with ID: {payment.id} - Name: {payment.name}")
+            st_line._learn_from_payments({st_line: payment})
             
             # Auto-post el payment para que genere las líneas contables
             if reconcile_model.auto_post_payment:
@@ -359,4 +387,187 @@ class AccountReconcileModel(models.Model):
     def _onchange_counterpart_type_payment_method(self):
         """Clear payment method when counterpart type changes"""
         if self.counterpart_type not in ['customer_receipts', 'vendor_payments']:
-            self.payment_method_line_id = False
\ No newline at end of file
+            self.payment_method_line_id = False
+
+    # -------------------------------------------------------------------------
+    # Batch auto-apply
+    # -------------------------------------------------------------------------
+
+    def _matches_receipt_line(self, st_line, partner):
+        """Whether the rule conditions of the model accept the statement line,
+        evaluated in memory so that a whole batch of lines is matched without
+        further queries"""
+        self.ensure_one()
+        payment_type = 'inbound' if self.counterpart_type == 'customer_receipts' else 'outbound'
+        if st_line._get_payment_receipt_type()[0] != payment_type:
+            return False
+        if self.match_journal_ids and st_line.journal_id not in self.match_journal_ids:
+            return False
+        if self.match_nature == 'amount_received' and st_line.amount < 0:
+            return False
+        if self.match_nature == 'amount_paid' and st_line.amount > 0:
+            return False
+        amount = abs(st_line.amount)
+        if self.match_amount == 'lower' and amount >= self.match_amount_max:
+            return False
+        if self.match_amount == 'greater' and amount <= self.match_amount_min:
+            return False
+        if self.match_amount == 'between' and not self.match_amount_min <= amount <= self.match_amount_max:
+            return False
+        label = st_line.payment_ref or ''
+        if self.match_label == 'contains' and (self.match_label_param or '').lower() not in label.lower():
+            return False
+        if self.match_label == 'not_contains' and (self.match_label_param or '').lower() in label.lower():
+            return False
+        if self.match_label == 'match_regex' and not re.match(self.match_label_param or '', label):
+            return False
+        if self.match_partner:
+            if self.match_partner_ids and partner not in self.match_partner_ids:
+                return False
+            if self.match_partner_category_ids and not partner.category_id & self.match_partner_category_ids:
+                return False
+        return True
+
+    def _get_receipt_payment_method_line(self, journal):
+        """Payment method of the model when it belongs to ``journal``, the
+        first available method of the journal otherwise"""
+        self.ensure_one()
+        if self.payment_method_line_id.journal_id == journal:
+            return self.payment_method_line_id
+        payment_type = 'inbound' if self.counterpart_type == 'customer_receipts' else 'outbound'
+        return journal._get_available_payment_method_lines(payment_type)[:1]
+
+    @api.model
+    def _get_receipt_models(self, company, auto_apply_only=False):
+        domain = [
+            ('counterpart_type', 'in', RECEIPT_COUNTERPART_TYPES),
+            ('company_id', '=', company.id),
+            ('auto_post_payment', '=', True),
+        ]
+        if auto_apply_only:
+            domain.append(('auto_apply_receipts', '=', True))
+        return self.search(domain, order='sequence, id')
+
+    @api.model
+    def _compute_receipt_matches(self, st_lines, reconcile_models=None):
+        """Pick the reconcile model, partner and payment method of each line.
+
+        Models are tried in sequence order and the first one accepting the
+        line wins. Partners (and payment methods) remembered for the
+        reference pattern of the line are used first; the others are looked
+        up in the matching index for all the lines at once. Lines without
+        partner are left unmatched.
+
+        :return: dict {statement line: {'reconcile_model', 'partner',
+            'payment_method_line'}}, for the matched lines only
+        """
+        memories = self.env['bank.reference.memory']._recall(st_lines.filtered(lambda l: not l.partner_id))
+        candidates = st_lines.filtered(
+            lambda l: not l.partner_id and l not in memories
+        )._get_partner_candidates(limit=10)
+        matches = {}
+        method_lines = {}
+        for company, lines in st_lines.grouped('company_id').items():
+            if reconcile_models is None:
+                company_models = self._get_receipt_models(company)
+            else:
+                company_models = reconcile_models.filtered(lambda m: m.company_id == company)
+            for line in lines:
+                memory = memories.get(line)
+                for reconcile_model in company_models:
+                    remembered = memory and memory.counterpart_type == reconcile_model.counterpart_type
+                    if line.partner_id:
+                        partner = line.partner_id
+                    elif remembered:
+                        partner = memory.partner_id
+                    else:
+                        partner = reconcile_model._select_receipt_partner(candidates.get(line, []))
+                    if not partner or not reconcile_model._matches_receipt_line(line, partner):
+                        continue
+                    if remembered and memory.payment_method_line_id.journal_id == line.journal_id:
+                        payment_method_line = memory.payment_method_line_id
+                    else:
+                        key = (reconcile_model, line.journal_id)
+                        if key not in method_lines:
+                            method_lines[key] = reconcile_model._get_receipt_payment_method_line(line.journal_id)
+                        payment_method_line = method_lines[key]
+                    if not payment_method_line:
+                        continue
+                    matches[line] = {
+                        'reconcile_model': reconcile_model,
+                        'partner': partner,
+                        'payment_method_line': payment_method_line,
+                    }
+                    break
+        return matches
+
+    @api.model
+    def _apply_receipt_matches(self, matches):
+        """Create, post and reconcile the payments of the matched lines in
+        one batch.
+
+        :return: per-line outcomes, see ``_run_payment_receipts``
+        """
+        vals_by_line = {}
+        for st_line, match in matches.items():
+            vals = st_line._prepare_payment_receipt_vals(match['partner'], match['payment_method_line'])
+            vals['memo'] = match['reconcile_model']._get_payment_memo(st_line, match['partner'])
+            vals_by_line[st_line] = vals
+        st_lines = self.env['account.bank.statement.line'].union(*vals_by_line)
+        return st_lines._run_payment_receipts(vals_by_line)
+
+    @api.model
+    def _auto_apply_receipt_models(self, st_lines, reconcile_models=None):
+        """Evaluate the receipt models over ``st_lines`` and process the matches
+
+        :return: dict {statement line: outcome}, unmatched lines are skipped
+        """
+        st_lines = st_lines.filtered(lambda l: not l.is_reconciled)
+        matches = self._compute_receipt_matches(st_lines, reconcile_models)
+        results = {
+            st_line: {'status': 'skipped', 'message': _("No matching reconcile model")}
+            for st_line in st_lines if st_line not in matches
+        }
+        results.update(self._apply_receipt_matches(matches))
+        return results
+
+    @api.model
+    def _get_unreconciled_statement_lines_domain(self, journals, date_from=None, date_to=None):
+        domain = [
+            ('journal_id', 'in', journals.ids),
+            ('is_reconciled', '=', False),
+            ('state', '=', 'posted'),
+        ]
+        if date_from:
+            domain.append(('date', '>=', date_from))
+        if date_to:
+            domain.append(('date', '<=', date_to))
+        return domain
+
+    @api.model
+    def _cron_auto_apply_receipts(self):
+        """Scheduled action: apply the models flagged for batch auto-apply to
+        the unreconciled statement lines, by company and batches of lines"""
+        st_line_model = self.env['account.bank.statement.line']
+        for company in self.env['res.company'].search([]):
+            reconcile_models = self.with_company(company)._get_receipt_models(company, auto_apply_only=True)
+            if not reconcile_models:
+                continue
+            journals = reconcile_models.match_journal_ids
+            if not all(reconcile_model.match_journal_ids for reconcile_model in reconcile_models):
+                journals = self.env['account.journal'].search([
+                    ('type', '=', 'bank'),
+                    ('company_id', '=', company.id),
+                ])
+            st_line_ids = st_line_model.with_company(company).search(
+                self._get_unreconciled_statement_lines_domain(journals), order='date, id',
+            ).ids
+            for ids in split_every(AUTO_APPLY_BATCH_SIZE, st_line_ids):
+                results = self.with_company(company)._auto_apply_receipt_models(
+                    st_line_model.with_company(company).browse(ids), reconcile_models,
+                )
+                _logger.info(
+                    "Receipt models auto-applied on %s statement lines of %s: %s payments created",
+                    len(ids), company.name, sum(1 for r in results.values() if r['status'] == 'created'),
+                )
+                self.env.invalidate_all()
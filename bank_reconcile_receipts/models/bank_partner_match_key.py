@@ -0,0 +1,263 @@
+from collections import defaultdict
+import re
+import unicodedata
+
+from odoo import models, fields, api
+from odoo.tools import SQL, split_every
+from odoo.tools.sql import create_index, index_exists
+
+# Words of bank references and company names that do not identify a partner
+STOPWORDS = {
+    'SA', 'SRL', 'SAS', 'SAU', 'SOCIEDAD', 'ANONIMA', 'CIA', 'DE', 'DEL', 'LA', 'LAS', 'LOS', 'EL', 'Y',
+    'TRANSF', 'TRANSFERENCIA', 'TRF', 'PAGO', 'PAGOS', 'COBRO', 'DEBITO', 'CREDITO', 'DEB', 'CRED',
+    'CTA', 'CUENTA', 'CBU', 'CVU', 'CUIT', 'CUIL', 'DNI', 'NRO', 'REF', 'BANCO', 'DEPOSITO',
+}
+# Minimum length of a digit sequence considered a document or account number
+IDENTIFIER_MIN_LENGTH = 8
+# Minimum similarity for a reference token to match a partner name token
+TOKEN_SIMILARITY_THRESHOLD = 0.5
+# Score of the candidates found by document, bank account or past reference
+IDENTIFIER_SCORE = 1.0
+# Minimum score of a candidate to be taken as the partner of a bank reference
+PARTNER_MATCH_MIN_SCORE = 0.6
+
+
+def normalize_text(value):
+    """Upper case ASCII words of ``value``, without accents nor punctuation"""
+    value = unicodedata.normalize('NFKD', value or '').encode('ascii', 'ignore').decode()
+    return ' '.join(re.findall(r'[A-Z0-9]+', value.upper()))
+
+
+def get_name_tokens(value):
+    """Significant words of ``value`` to be matched against partner names"""
+    return [
+        token for token in normalize_text(value).split()
+        if len(token) >= 3 and not token.isdigit() and token not in STOPWORDS
+    ]
+
+
+def get_identifiers(value):
+    """Digit sequences of ``value`` long enough to be a CUIT/DNI or an account
+    number, separators removed (``20-12345678-9`` gives ``20123456789``)"""
+    return [
+        identifier
+        for identifier in (re.sub(r'\D', '', group) for group in re.findall(r'\d[\d\-\./ ]*\d', value or ''))
+        if len(identifier) >= IDENTIFIER_MIN_LENGTH
+    ]
+
+
+class BankPartnerMatchKey(models.Model):
+    """Partner matching index for bank statement references.
+
+    Holds the normalized keys a bank reference can be matched with: the
+    words of the partner names (fuzzy matched with trigram similarity when
+    pg_trgm is available), the digits of the partner VAT (CUIT) and bank
+    account numbers, and the references of the statement lines already
+    reconciled with the partner.
+    """
+    _name = 'bank.partner.match.key'
+    _description = 'Bank Reference Partner Matching Key'
+    _log_access = False
+
+    partner_id = fields.Many2one(
+        'res.partner',
+        required=True,
+        index=True,
+        ondelete='cascade'
+    )
+
+    company_id = fields.Many2one(
+        'res.company',
+        ondelete='cascade'
+    )
+
+    source = fields.Selection([
+        ('name', 'Name'),
+        ('vat', 'Tax ID'),
+        ('bank', 'Bank Account'),
+        ('reference', 'Statement Reference'),
+    ], required=True)
+
+    key = fields.Char(
+        required=True,
+        index=True
+    )
+
+    token_count = fields.Integer(
+        help="Number of significant words of the partner name, to weight the name matches"
+    )
+
+    def init(self):
+        if self.env.registry.has_trigram and not index_exists(self.env.cr, 'bank_partner_match_key_key_trgm_idx'):
+            create_index(
+                self.env.cr, 'bank_partner_match_key_key_trgm_idx', self._table,
+                ['key gin_trgm_ops'], method='gin',
+            )
+
+    # -------------------------------------------------------------------------
+    # Maintenance
+    # -------------------------------------------------------------------------
+
+    @api.model
+    def _prepare_partner_keys(self, partners):
+        """Name, VAT and bank account keys of ``partners``"""
+        vals_list = []
+        for partner in partners.filtered('active'):
+            company_id = partner.company_id.id
+            tokens = list(dict.fromkeys(get_name_tokens(partner.name)))
+            vals_list += [{
+                'partner_id': partner.id,
+                'company_id': company_id,
+                'source': 'name',
+                'key': token,
+                'token_count': len(tokens),
+            } for token in tokens]
+            vat = re.sub(r'\D', '', partner.vat or '')
+            if len(vat) >= IDENTIFIER_MIN_LENGTH:
+                vals_list.append({'partner_id': partner.id, 'company_id': company_id, 'source': 'vat', 'key': vat})
+            for acc_number in set(partner.bank_ids.mapped('sanitized_acc_number')):
+                acc_number = re.sub(r'\D', '', acc_number or '')
+                if len(acc_number) >= IDENTIFIER_MIN_LENGTH:
+                    vals_list.append({
+                        'partner_id': partner.id,
+                        'company_id': company_id,
+                        'source': 'bank',
+                        'key': acc_number,
+                    })
+        return vals_list
+
+    @api.model
+    def _refresh_partners(self, partners):
+        """Rebuild the name, VAT and bank account keys of ``partners``"""
+        partners = partners.with_context(active_test=False).exists()
+        self.sudo().search([
+            ('partner_id', 'in', partners.ids),
+            ('source', '!=', 'reference'),
+        ]).unlink()
+        self.sudo().create(self._prepare_partner_keys(partners))
+
+    @api.model
+    def _rebuild_index(self):
+        """Rebuild the partner keys of all the partners, keeping the learned
+        statement references"""
+        self.sudo().search([('source', '!=', 'reference')]).unlink()
+        partner_ids = self.env['res.partner'].sudo().with_context(active_test=False).search([]).ids
+        for ids in split_every(1000, partner_ids):
+            partners = self.env['res.partner'].sudo().browse(ids)
+            self.sudo().create(self._prepare_partner_keys(partners))
+            self.env.invalidate_all()
+        return True
+
+    @api.model
+    def _learn_references(self, partner_by_line):
+        """Remember the references of statement lines reconciled with a partner
+
+        :param partner_by_line: dict {statement line: partner}
+        """
+        existing = {
+            (match_key.partner_id.id, match_key.key)
+            for match_key in self.sudo().search([
+                ('source', '=', 'reference'),
+                ('partner_id', 'in', [partner.id for partner in partner_by_line.values()]),
+            ])
+        }
+        vals_list = []
+        for st_line, partner in partner_by_line.items():
+            key = normalize_text(st_line.payment_ref)
+            if partner and key and (partner.id, key) not in existing:
+                existing.add((partner.id, key))
+                vals_list.append({
+                    'partner_id': partner.id,
+                    'company_id': st_line.company_id.id,
+                    'source': 'reference',
+                    'key': key,
+                })
+        self.sudo().create(vals_list)
+
+    # -------------------------------------------------------------------------
+    # Matching
+    # -------------------------------------------------------------------------
+
+    @api.model
+    def _match_partners(self, references, company=None, limit=3):
+        """Ranked partner candidates for each of ``references``, computed for
+        the whole batch with one query.
+
+        Document, bank account and past reference matches score 1.0; name
+        matches score the share of the partner name words found in the
+        reference, fuzzy matched by trigram similarity. Ties are broken by
+        partner id so that the result is deterministic.
+
+        :param references: iterable of bank references (payment_ref)
+        :param company: only consider partners shared or of this company
+        :return: dict {reference: [(partner, score), ...]} best first
+        """
+        company = company or self.env.company
+        references = list(dict.fromkeys(ref for ref in references if ref))
+        idents, tokens = [], []
+        for index, ref in enumerate(references):
+            idents += [(index, ident) for ident in get_identifiers(ref)]
+            idents.append((index, normalize_text(ref)))
+            tokens += [(index, token) for token in set(get_name_tokens(ref))]
+        if not references:
+            return {}
+        self.flush_model()
+        if self.env.registry.has_trigram:
+            token_match = SQL(
+                "mk.key %% ref.token AND similarity(mk.key, ref.token) >= %s", TOKEN_SIMILARITY_THRESHOLD,
+            )
+            token_score = SQL("similarity(mk.key, ref.token)")
+        else:
+            token_match = SQL("mk.key = ref.token")
+            token_score = SQL("1.0")
+        company_clause = SQL("(mk.company_id IS NULL OR mk.company_id = %s)", company.id)
+        self.env.cr.execute(SQL(
+            """
+            WITH ref_ident AS (
+                SELECT * FROM unnest(%(ident_index)s::int[], %(ident)s::varchar[]) AS ref(idx, ident)
+            ), ref_token AS (
+                SELECT * FROM unnest(%(token_index)s::int[], %(token)s::varchar[]) AS ref(idx, token)
+            ), ident_match AS (
+                SELECT ref.idx, mk.partner_id, %(ident_score)s::float AS score
+                  FROM ref_ident ref
+                  JOIN bank_partner_match_key mk
+                    ON mk.key = ref.ident AND mk.source IN ('vat', 'bank', 'reference')
+                 WHERE %(company_clause)s
+            ), name_key_match AS (
+                SELECT ref.idx, mk.partner_id, mk.key, MAX(mk.token_count) AS token_count,
+                       MAX(%(token_score)s) AS score
+                  FROM ref_token ref
+                  JOIN bank_partner_match_key mk ON mk.source = 'name' AND %(token_match)s
+                 WHERE %(company_clause)s
+              GROUP BY ref.idx, mk.partner_id, mk.key
+            ), name_match AS (
+                SELECT idx, partner_id, SUM(score) / GREATEST(MAX(token_count), 1) AS score
+                  FROM name_key_match
+              GROUP BY idx, partner_id
+            ), ranked AS (
+                SELECT idx, partner_id, MAX(score) AS score,
+                       ROW_NUMBER() OVER (PARTITION BY idx ORDER BY MAX(score) DESC, partner_id) AS rank
+                  FROM (SELECT * FROM ident_match UNION ALL SELECT * FROM name_match) AS candidate
+              GROUP BY idx, partner_id
+            )
+            SELECT idx, partner_id, score FROM ranked WHERE rank <= %(limit)s ORDER BY idx, rank
+            """,
+            ident_index=[index for index, __ in idents],
+            ident=[ident for __, ident in idents],
+            token_index=[index for index, __ in tokens],
+            token=[token for __, token in tokens],
+            ident_score=IDENTIFIER_SCORE,
+            token_score=token_score,
+            token_match=token_match,
+            company_clause=company_clause,
+            limit=limit,
+        ))
+        rows = self.env.cr.fetchall()
+        # Apply the access rules and drop archived partners with one search
+        partners = self.env['res.partner'].search([('id', 'in', list({row[1] for row in rows}))])
+        candidates = defaultdict(list)
+        for index, partner_id, score in rows:
+            partner = partners.browse(partner_id)
+            if partner in partners:
+                candidates[references[index]].append((partner, min(score, 1.0)))
+        return candidates
@@ -0,0 +1,184 @@
+import re
+
+from odoo import models, fields, api
+from odoo.tools import SQL
+from odoo.tools.sql import create_index, index_exists
+
+from .bank_partner_match_key import IDENTIFIER_MIN_LENGTH, normalize_text
+
+# Default maximum number of remembered references, least recently used are evicted
+DEFAULT_MEMORY_SIZE = 10000
+
+
+def get_reference_pattern(value):
+    """Normalized reference where the short numbers (periods, installments,
+    invoice numbers) are replaced by ``#`` so that recurring references share
+    a pattern. Long numbers (CUIT, account numbers) identify the partner and
+    are kept, without separators."""
+    value = re.sub(r'\d[\d\-\./ ]*\d', lambda group: ' %s ' % re.sub(r'\D', '', group.group()), value or '')
+    return ' '.join(
+        '#' if token.isdigit() and len(token) < IDENTIFIER_MIN_LENGTH else token
+        for token in normalize_text(value).split()
+    )
+
+
+class BankReferenceMemory(models.Model):
+    """Reference memory of the bank reconciliation.
+
+    Remembers, for each journal, reference pattern and direction, the
+    partner and payment method of the last statement line reconciled with a
+    payment. It is consulted before any partner search through a hash index
+    on the key and bounded in size: the least recently used entries are
+    evicted beyond the ``bank_reconcile_receipts.reference_memory_size``
+    system parameter.
+    """
+    _name = 'bank.reference.memory'
+    _description = 'Bank Reconciliation Reference Memory'
+    _order = 'last_used desc, id desc'
+    _rec_name = 'pattern'
+
+    key = fields.Char(
+        required=True,
+        readonly=True
+    )
+
+    journal_id = fields.Many2one(
+        'account.journal',
+        string='Journal',
+        required=True,
+        ondelete='cascade'
+    )
+
+    pattern = fields.Char(
+        string='Reference Pattern',
+        required=True
+    )
+
+    payment_type = fields.Selection([
+        ('inbound', 'Incoming'),
+        ('outbound', 'Outgoing'),
+    ], required=True)
+
+    partner_id = fields.Many2one(
+        'res.partner',
+        string='Partner',
+        required=True,
+        ondelete='cascade'
+    )
+
+    counterpart_type = fields.Selection([
+        ('customer_receipts', 'Customer Receipts'),
+        ('vendor_payments', 'Vendor Payments'),
+    ], required=True)
+
+    payment_method_line_id = fields.Many2one(
+        'account.payment.method.line',
+        string='Payment Method',
+        ondelete='set null'
+    )
+
+    last_used = fields.Datetime(
+        string='Last Used',
+        index=True
+    )
+
+    hit_count = fields.Integer(
+        string='Hits',
+        readonly=True
+    )
+
+    _sql_constraints = [
+        ('key_uniq', 'unique(key)', 'A reference pattern is remembered only once per journal and direction.'),
+    ]
+
+    def init(self):
+        if not index_exists(self.env.cr, 'bank_reference_memory_key_hash_idx'):
+            create_index(self.env.cr, 'bank_reference_memory_key_hash_idx', self._table, ['key'], method='hash')
+
+    @api.model
+    def _get_line_key(self, st_line):
+        pattern = get_reference_pattern(st_line.payment_ref)
+        if not pattern:
+            return False
+        return f"{st_line.journal_id.id}|{st_line._get_payment_receipt_type()[0]}|{pattern}"
+
+    @api.model
+    def _recall(self, st_lines):
+        """Remembered entry of each line, read with one lookup on the key
+        index for the whole batch. The lookup is read-only: the entries are
+        only marked as used by ``_remember`` when a payment is created.
+
+        :return: dict {statement line: bank.reference.memory}
+        """
+        keys = {st_line: self._get_line_key(st_line) for st_line in st_lines}
+        if not any(keys.values()):
+            return {}
+        memories = self.sudo().search([('key', 'in', list({key for key in keys.values() if key}))])
+        by_key = {memory.key: memory.with_env(self.env) for memory in memories}
+        return {st_line: by_key[key] for st_line, key in keys.items() if key in by_key}
+
+    @api.model
+    def _remember(self, payment_by_line):
+        """Record the partner and payment method of reconciled lines; the
+        entries already remembered are marked as used
+
+        :param payment_by_line: dict {statement line: account.payment}
+        """
+        entries = {}
+        for st_line, payment in payment_by_line.items():
+            key = self._get_line_key(st_line)
+            if not key:
+                continue
+            entries[key] = {
+                'key': key,
+                'journal_id': st_line.journal_id.id,
+                'pattern': key.split('|', 2)[2],
+                'payment_type': payment.payment_type,
+                'partner_id': payment.partner_id.id,
+                'counterpart_type': 'customer_receipts' if payment.payment_type == 'inbound' else 'vendor_payments',
+                'payment_method_line_id': payment.payment_method_line_id.id,
+                'last_used': fields.Datetime.now(),
+            }
+        if not entries:
+            return
+        existing = self.sudo().search([('key', 'in', list(entries))])
+        if existing:
+            self.env.cr.execute(SQL(
+                """
+                UPDATE bank_reference_memory
+                   SET last_used = NOW() AT TIME ZONE 'UTC', hit_count = hit_count + 1
+                 WHERE id = ANY(%s)
+                """,
+                existing.ids,
+            ))
+            existing.invalidate_recordset(['last_used', 'hit_count'])
+        for memory in existing:
+            vals = entries.pop(memory.key)
+            if (memory.partner_id.id, memory.payment_method_line_id.id) != (
+                vals['partner_id'], vals['payment_method_line_id']
+            ):
+                memory.write({
+                    'partner_id': vals['partner_id'],
+                    'payment_method_line_id': vals['payment_method_line_id'],
+                })
+        self.sudo().create(list(entries.values()))
+        self._evict()
+
+    @api.model
+    def _evict(self):
+        """Delete the least recently used entries beyond the memory size"""
+        size = int(self.env['ir.config_parameter'].sudo().get_param(
+            'bank_reconcile_receipts.reference_memory_size', DEFAULT_MEMORY_SIZE,
+        ))
+        self.flush_model()
+        self.env.cr.execute(SQL(
+            """
+            DELETE FROM bank_reference_memory
+             WHERE id IN (SELECT id FROM bank_reference_memory
+                           ORDER BY last_used DESC NULLS LAST, id DESC
+                          OFFSET %s)
+            """,
+            size,
+        ))
+        if self.env.cr.rowcount:
+            self.invalidate_model()
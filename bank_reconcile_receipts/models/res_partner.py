@@ -0,0 +1,43 @@
+from odoo import models, api
+
+# Partner fields feeding the partner matching index
+MATCH_KEY_FIELDS = {'name', 'vat', 'active', 'company_id', 'bank_ids'}
+
+
+class ResPartner(models.Model):
+    _inherit = 'res.partner'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        partners = super().create(vals_list)
+        self.env['bank.partner.match.key']._refresh_partners(partners)
+        return partners
+
+    def write(self, vals):
+        res = super().write(vals)
+        if MATCH_KEY_FIELDS.intersection(vals):
+            self.env['bank.partner.match.key']._refresh_partners(self)
+        return res
+
+
+class ResPartnerBank(models.Model):
+    _inherit = 'res.partner.bank'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        banks = super().create(vals_list)
+        self.env['bank.partner.match.key']._refresh_partners(banks.partner_id)
+        return banks
+
+    def write(self, vals):
+        partners = self.partner_id
+        res = super().write(vals)
+        if {'acc_number', 'partner_id', 'active'}.intersection(vals):
+            self.env['bank.partner.match.key']._refresh_partners(partners | self.partner_id)
+        return res
+
+    def unlink(self):
+        partners = self.partner_id
+        res = super().unlink()
+        self.env['bank.partner.match.key']._refresh_partners(partners)
+        return res
@@ -0,0 +1,2 @@
+from . import bank_receipt_auto_apply
+from . import bank_statement_stream_import
\ No newline at end of file
@@ -0,0 +1,158 @@
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+
+
+class BankReceiptAutoApply(models.TransientModel):
+    _name = 'bank.receipt.auto.apply'
+    _description = 'Auto-apply Receipt Reconcile Models'
+
+    company_id = fields.Many2one(
+        'res.company',
+        required=True,
+        default=lambda self: self.env.company
+    )
+
+    journal_ids = fields.Many2many(
+        'account.journal',
+        string='Journals',
+        required=True,
+        domain="[('type', '=', 'bank'), ('company_id', '=', company_id)]",
+        default=lambda self: self._default_journal_ids()
+    )
+
+    reconcile_model_ids = fields.Many2many(
+        'account.reconcile.model',
+        string='Reconcile Models',
+        domain="[('counterpart_type', 'in', ('customer_receipts', 'vendor_payments')), "
+               "('company_id', '=', company_id), ('auto_post_payment', '=', True)]",
+        default=lambda self: self.env['account.reconcile.model']._get_receipt_models(self.env.company),
+        help="Models tried in sequence order on every unreconciled statement line"
+    )
+
+    date_from = fields.Date(string='From')
+
+    date_to = fields.Date(string='To')
+
+    line_ids = fields.One2many(
+        'bank.receipt.auto.apply.line',
+        'wizard_id',
+        string='Preview'
+    )
+
+    line_count = fields.Integer(compute='_compute_line_count')
+
+    @api.model
+    def _default_journal_ids(self):
+        if self.env.context.get('active_model') == 'account.journal':
+            return self.env['account.journal'].browse(self.env.context.get('active_ids')).filtered(
+                lambda j: j.type == 'bank'
+            )
+        return self.env['account.journal']
+
+    @api.depends('line_ids')
+    def _compute_line_count(self):
+        for wizard in self:
+            wizard.line_count = len(wizard.line_ids)
+
+    def _get_statement_lines(self):
+        self.ensure_one()
+        return self.env['account.bank.statement.line'].search(
+            self.env['account.reconcile.model']._get_unreconciled_statement_lines_domain(
+                self.journal_ids, self.date_from, self.date_to,
+            ),
+            order='date, id',
+        )
+
+    def _reopen(self):
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+    def action_preview(self):
+        """Compute the matches without creating any payment"""
+        self.ensure_one()
+        matches = self.env['account.reconcile.model']._compute_receipt_matches(
+            self._get_statement_lines(), self.reconcile_model_ids,
+        )
+        self.line_ids = [(5, 0, 0)] + [(0, 0, {
+            'st_line_id': st_line.id,
+            'reconcile_model_id': match['reconcile_model'].id,
+            'partner_id': match['partner'].id,
+            'payment_method_line_id': match['payment_method_line'].id,
+        }) for st_line, match in matches.items()]
+        return self._reopen()
+
+    def action_apply(self):
+        """Create and reconcile the payments: those of the preview when it
+        was computed (with the partners possibly corrected), all the
+        matches otherwise"""
+        self.ensure_one()
+        reconcile_model = self.env['account.reconcile.model']
+        if self.line_ids:
+            results = reconcile_model._apply_receipt_matches({
+                line.st_line_id: {
+                    'reconcile_model': line.reconcile_model_id,
+                    'partner': line.partner_id,
+                    'payment_method_line': line.payment_method_line_id,
+                }
+                for line in self.line_ids.filtered(lambda l: not l.st_line_id.is_reconciled)
+            })
+        else:
+            results = reconcile_model._auto_apply_receipt_models(
+                self._get_statement_lines(), self.reconcile_model_ids,
+            )
+        if not results:
+            raise UserError(_("There are no unreconciled statement lines to process."))
+        return self.env['account.bank.statement.line']._get_payment_receipts_notification(
+            results, _("Auto-apply Receipt Models"),
+        )
+
+
+class BankReceiptAutoApplyLine(models.TransientModel):
+    _name = 'bank.receipt.auto.apply.line'
+    _description = 'Auto-apply Receipt Reconcile Models Preview'
+
+    wizard_id = fields.Many2one(
+        'bank.receipt.auto.apply',
+        required=True,
+        ondelete='cascade'
+    )
+
+    st_line_id = fields.Many2one(
+        'account.bank.statement.line',
+        string='Statement Line',
+        required=True,
+        readonly=True
+    )
+
+    date = fields.Date(related='st_line_id.date')
+
+    payment_ref = fields.Char(related='st_line_id.payment_ref', string='Label')
+
+    amount = fields.Monetary(related='st_line_id.amount')
+
+    currency_id = fields.Many2one(related='st_line_id.currency_id')
+
+    reconcile_model_id = fields.Many2one(
+        'account.reconcile.model',
+        string='Reconcile Model',
+        required=True,
+        readonly=True
+    )
+
+    partner_id = fields.Many2one(
+        'res.partner',
+        string='Partner',
+        required=True
+    )
+
+    payment_method_line_id = fields.Many2one(
+        'account.payment.method.line',
+        string='Payment Method',
+        required=True,
+        readonly=True
+    )
@@ -0,0 +1,371 @@
+import base64
+import csv
+import hashlib
+import io
+import logging
+from datetime import datetime
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+
+from ..models.bank_partner_match_key import normalize_text
+
+_logger = logging.getLogger(__name__)
+
+# Rows read looking for the header row (banks put titles and filters above it)
+HEADER_SEARCH_LIMIT = 50
+# Unparseable rows listed in the import summary
+MAX_REPORTED_ERRORS = 20
+
+# Header names (normalized) recognized for each column of the preset formats
+FORMAT_COLUMNS = {
+    'ar_debit_credit': {
+        'date': ['FECHA', 'FECHA MOVIMIENTO', 'FECHA OPERACION', 'FECHA MOV'],
+        'label': ['CONCEPTO', 'DESCRIPCION', 'DETALLE', 'LEYENDA', 'MOVIMIENTO'],
+        'ref': ['REFERENCIA', 'COMPROBANTE', 'NRO COMPROBANTE', 'NUMERO COMPROBANTE', 'NRO DE COMPROBANTE'],
+        'debit': ['DEBITO', 'DEBITOS', 'DEBE', 'IMPORTE DEBITO'],
+        'credit': ['CREDITO', 'CREDITOS', 'HABER', 'IMPORTE CREDITO'],
+        'balance': ['SALDO', 'SALDO PARCIAL'],
+    },
+    'ar_amount': {
+        'date': ['FECHA', 'FECHA MOVIMIENTO', 'FECHA OPERACION', 'FECHA MOV'],
+        'label': ['CONCEPTO', 'DESCRIPCION', 'DETALLE', 'LEYENDA', 'MOVIMIENTO'],
+        'ref': ['REFERENCIA', 'COMPROBANTE', 'NRO COMPROBANTE', 'NUMERO COMPROBANTE', 'NRO DE COMPROBANTE'],
+        'amount': ['IMPORTE', 'MONTO', 'IMPORTE PESOS'],
+        'balance': ['SALDO', 'SALDO PARCIAL'],
+    },
+}
+
+GENERIC_COLUMN_FIELDS = {
+    'date': 'date_column',
+    'label': 'label_column',
+    'ref': 'ref_column',
+    'partner': 'partner_column',
+    'amount': 'amount_column',
+    'debit': 'debit_column',
+    'credit': 'credit_column',
+    'balance': 'balance_column',
+}
+
+
+class BankStatementStreamImport(models.TransientModel):
+    """Import bank statement lines from CSV/TXT extracts.
+
+    The file is read row by row from the filestore and the lines are created
+    by chunks, so that very large extracts are imported in constant memory.
+    Each line gets a hashed ``unique_import_id`` and the lines already
+    imported are skipped, so the same extract (or overlapping ones) can be
+    imported again safely.
+    """
+    _name = 'bank.statement.stream.import'
+    _description = 'Bank Statement CSV/TXT Import'
+
+    journal_id = fields.Many2one(
+        'account.journal',
+        string='Journal',
+        required=True,
+        domain="[('type', '=', 'bank')]",
+        default=lambda self: self._default_journal_id()
+    )
+
+    data_file = fields.Binary(
+        string='File',
+        required=True,
+        attachment=True
+    )
+
+    filename = fields.Char()
+
+    file_format = fields.Selection([
+        ('ar_debit_credit', 'Homebanking AR - Debit/Credit columns'),
+        ('ar_amount', 'Homebanking AR - Signed amount column'),
+        ('generic', 'Generic CSV (column mapping)'),
+    ], string='Format', required=True, default='ar_debit_credit',
+       help="Homebanking formats find their columns by header name (Fecha, Concepto, "
+            "Débito, Crédito, Importe, Saldo...); the generic format uses the mapping below.")
+
+    delimiter = fields.Selection([
+        (';', 'Semicolon (;)'),
+        (',', 'Comma (,)'),
+        ('\t', 'Tab'),
+        ('|', 'Pipe (|)'),
+    ], required=True, default=';')
+
+    encoding = fields.Selection([
+        ('utf-8-sig', 'UTF-8'),
+        ('cp1252', 'Windows-1252 / Latin-1'),
+    ], required=True, default='cp1252')
+
+    date_format = fields.Char(
+        required=True,
+        default='%d/%m/%Y'
+    )
+
+    decimal_separator = fields.Selection([
+        (',', 'Comma (1.234,56)'),
+        ('.', 'Dot (1,234.56)'),
+    ], required=True, default=',')
+
+    skip_lines = fields.Integer(
+        help="Generic format mapped by column number: rows to skip before the data (titles, header)"
+    )
+
+    date_column = fields.Char(help="Header name or column number (1 for the first column)")
+    label_column = fields.Char(string='Label Column')
+    ref_column = fields.Char(string='Reference Column')
+    partner_column = fields.Char(string='Partner Name Column')
+    amount_column = fields.Char(string='Amount Column', help="Signed amount; or use debit and credit columns")
+    debit_column = fields.Char(string='Debit Column')
+    credit_column = fields.Char(string='Credit Column')
+    balance_column = fields.Char(
+        string='Balance Column',
+        help="Running balance, used to tell apart identical movements of the same day"
+    )
+
+    chunk_size = fields.Integer(
+        required=True,
+        default=1000,
+        help="Statement lines created per batch"
+    )
+
+    post_process = fields.Selection([
+        ('none', 'Only import the lines'),
+        ('auto_apply', 'Auto-apply receipt reconcile models'),
+        ('receipts', 'Create payments/receipts for every line'),
+    ], string='After Import', required=True, default='none')
+
+    @api.model
+    def _default_journal_id(self):
+        if self.env.context.get('active_model') == 'account.journal':
+            return self.env['account.journal'].browse(self.env.context.get('active_id')).filtered(
+                lambda j: j.type == 'bank'
+            )
+        return self.env['account.journal']
+
+    # -------------------------------------------------------------------------
+    # Reading
+    # -------------------------------------------------------------------------
+
+    def _open_data_file(self):
+        """Binary stream of the uploaded file, read from the filestore when
+        possible instead of loading it in memory"""
+        self.ensure_one()
+        attachment = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('res_id', '=', self.id),
+            ('res_field', '=', 'data_file'),
+        ], limit=1)
+        if attachment.store_fname:
+            return open(attachment._full_path(attachment.store_fname), 'rb')
+        return io.BytesIO(base64.b64decode(self.data_file or b''))
+
+    def _get_generic_columns(self):
+        return {
+            column: getattr(self, fname).strip()
+            for column, fname in GENERIC_COLUMN_FIELDS.items()
+            if getattr(self, fname) and getattr(self, fname).strip()
+        }
+
+    def _check_columns(self, columns):
+        if 'date' not in columns:
+            raise UserError(_("The date column of the file could not be found."))
+        if 'amount' not in columns and not {'debit', 'credit'} <= set(columns):
+            raise UserError(_("The file needs an amount column or both debit and credit columns."))
+
+    def _find_header_columns(self, row, column_names):
+        """Column indexes of ``row`` when it is the header row, else None
+
+        :param column_names: dict {column: [accepted header names]}
+        """
+        headers = [normalize_text(cell) for cell in row]
+        columns = {}
+        for column, names in column_names.items():
+            index = next((i for i, header in enumerate(headers) if header in names), None)
+            if index is not None:
+                columns[column] = index
+        return columns if 'date' in columns else None
+
+    def _iter_rows(self, stream):
+        """Yield (row number, {column: cell}) for each data row of the file"""
+        self.ensure_one()
+        reader = csv.reader(
+            io.TextIOWrapper(stream, encoding=self.encoding, errors='replace', newline=''),
+            delimiter=self.delimiter,
+        )
+        if self.file_format == 'generic':
+            mapping = self._get_generic_columns()
+            if all(value.isdigit() for value in mapping.values()):
+                columns = {column: int(value) - 1 for column, value in mapping.items()}
+                skip_lines = self.skip_lines
+            else:
+                columns, skip_lines = None, 0
+                column_names = {column: [normalize_text(value)] for column, value in mapping.items()}
+        else:
+            columns, skip_lines = None, 0
+            column_names = FORMAT_COLUMNS[self.file_format]
+        if columns is not None:
+            self._check_columns(columns)
+        for row_number, row in enumerate(reader, 1):
+            if row_number <= skip_lines or not any(cell.strip() for cell in row):
+                continue
+            if columns is None:
+                columns = self._find_header_columns(row, column_names)
+                if columns is not None:
+                    self._check_columns(columns)
+                elif row_number >= HEADER_SEARCH_LIMIT:
+                    raise UserError(_("The header row of the file could not be found."))
+                continue
+            yield row_number, {
+                column: row[index].strip() if index < len(row) else ''
+                for column, index in columns.items()
+            }
+        if columns is None:
+            raise UserError(_("The header row of the file could not be found."))
+
+    def _parse_amount(self, value):
+        value = (value or '').strip().replace('$', '').replace(' ', '')
+        if not value:
+            return 0.0
+        negative = value.startswith('(') and value.endswith(')') or value.endswith('-')
+        value = value.strip('()').rstrip('-')
+        thousands = '.' if self.decimal_separator == ',' else ','
+        value = value.replace(thousands, '').replace(self.decimal_separator, '.')
+        amount = float(value)
+        return -amount if negative else amount
+
+    def _parse_row(self, cells):
+        """Statement line values of a data row; raise ValueError when the
+        row cannot be read"""
+        date = datetime.strptime(cells['date'], self.date_format).date()
+        if 'amount' in cells:
+            amount = self._parse_amount(cells['amount'])
+        else:
+            amount = abs(self._parse_amount(cells.get('credit'))) - abs(self._parse_amount(cells.get('debit')))
+        label = ' '.join(filter(None, [cells.get('label'), cells.get('ref')]))
+        return {
+            'date': date,
+            'amount': amount,
+            'payment_ref': label or '/',
+            'partner_name': cells.get('partner') or False,
+            'balance': cells.get('balance') or '',
+        }
+
+    def _get_unique_import_id(self, vals, occurrence):
+        """Hash of the line content; the balance and the occurrence among
+        the identical rows of the same date tell apart repeated movements"""
+        content = '|'.join(str(part) for part in (
+            vals['date'], f"{vals['amount']:.2f}", vals['payment_ref'], vals['balance'], occurrence,
+        ))
+        return f"{self.journal_id.id}-{hashlib.sha256(content.encode()).hexdigest()}"
+
+    # -------------------------------------------------------------------------
+    # Import
+    # -------------------------------------------------------------------------
+
+    def _import_chunk(self, vals_list, stats):
+        """Create the lines of the chunk not imported yet and run the
+        post-processing on them"""
+        st_line_model = self.env['account.bank.statement.line']
+        existing = set(st_line_model.search_fetch(
+            [('unique_import_id', 'in', [vals['unique_import_id'] for vals in vals_list])],
+            ['unique_import_id'],
+        ).mapped('unique_import_id'))
+        new_vals_list = []
+        for vals in vals_list:
+            if vals['unique_import_id'] in existing:
+                stats['duplicates'] += 1
+                continue
+            existing.add(vals['unique_import_id'])
+            new_vals_list.append(vals)
+        st_lines = st_line_model.create(new_vals_list)
+        stats['created'] += len(st_lines)
+        if self.post_process == 'auto_apply':
+            results = self.env['account.reconcile.model']._auto_apply_receipt_models(st_lines)
+        elif self.post_process == 'receipts':
+            results = st_lines._create_payment_receipts_bulk()
+        else:
+            results = {}
+        stats['payments'] += sum(1 for result in results.values() if result['status'] == 'created')
+        stats['payment_errors'] += sum(1 for result in results.values() if result['status'] == 'error')
+        self.env.flush_all()
+        self.env.invalidate_all()
+
+    def _run_import(self):
+        """Stream the file into statement lines, one chunk at a time
+
+        :return: dict of counters and the first parsing errors
+        """
+        self.ensure_one()
+        if self.chunk_size <= 0:
+            raise UserError(_("The chunk size must be positive."))
+        stats = {'created': 0, 'duplicates': 0, 'payments': 0, 'payment_errors': 0, 'errors': []}
+        journal_id = self.journal_id.id
+        chunk_size = self.chunk_size
+        chunk = []
+        # Occurrences of each row content within the current date, reset when
+        # the date changes to keep the memory bounded
+        current_date, occurrences = None, {}
+        with self._open_data_file() as stream:
+            for row_number, cells in self._iter_rows(stream):
+                try:
+                    vals = self._parse_row(cells)
+                except (ValueError, KeyError) as e:
+                    stats['errors'].append((row_number, str(e)))
+                    continue
+                if vals['amount'] == 0.0:
+                    continue
+                if vals['date'] != current_date:
+                    current_date, occurrences = vals['date'], {}
+                key = (vals['amount'], vals['payment_ref'], vals['balance'])
+                occurrence = occurrences.get(key, 0)
+                occurrences[key] = occurrence + 1
+                vals['unique_import_id'] = self._get_unique_import_id(vals, occurrence)
+                vals['journal_id'] = journal_id
+                del vals['balance']
+                chunk.append(vals)
+                if len(chunk) >= chunk_size:
+                    self._import_chunk(chunk, stats)
+                    chunk = []
+            if chunk:
+                self._import_chunk(chunk, stats)
+        _logger.info(
+            "Statement import in journal %s: %s lines created, %s already imported, %s errors",
+            journal_id, stats['created'], stats['duplicates'], len(stats['errors']),
+        )
+        return stats
+
+    def action_import(self):
+        self.ensure_one()
+        stats = self._run_import()
+        message = _(
+            "%(created)s lines imported, %(duplicates)s already imported, %(errors)s unreadable rows.",
+            created=stats['created'], duplicates=stats['duplicates'], errors=len(stats['errors']),
+        )
+        if self.post_process != 'none':
+            message += '\n' + _(
+                "%(payments)s payments created, %(payment_errors)s lines with errors.",
+                payments=stats['payments'], payment_errors=stats['payment_errors'],
+            )
+        if stats['errors']:
+            message += '\n' + '\n'.join(
+                _("Row %(row)s: %(error)s", row=row, error=error)
+                for row, error in stats['errors'][:MAX_REPORTED_ERRORS]
+            )
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _("Bank Statement Import"),
+                'message': message,
+                'type': 'warning' if stats['errors'] or stats['payment_errors'] else 'success',
+                'sticky': bool(stats['errors']),
+                'next': {
+                    'type': 'ir.actions.act_window',
+                    'name': _("Statement Lines"),
+                    'res_model': 'account.bank.statement.line',
+                    'domain': [('journal_id', '=', self.journal_id.id)],
+                    'view_mode': 'list,form',
+                    'target': 'current',
+                },
+            },
+        }
@@ -77,6 +77,7 @@ Transform your credit card management today with this professional-grade solutio
         "data/card_plan_data.xml",
         "data/account_data.xml",
         "data/holiday_data.xml",
+        "data/cron_data.xml",
         "views/card_plan_view.xml",
         "views/holiday_view.xml",
         "views/card_tax_deduction_view.xml",
@@ -87,6 +88,8 @@ Transform your credit card management today with this professional-grade solutio
         "views/card_accreditation_view.xml",
         "views/card_reconciliation_view.xml",
         "views/card_batch_transfer_view.xml",
+        "views/card_accreditation_forecast_view.xml",
+        "views/card_accreditation_summary_view.xml",
         "views/menu_view.xml",
         "wizards/card_surcharge_wizard_view.xml",
         "wizards/card_transfer_wizard_view.xml",
@@ -5,8 +5,11 @@ from . import card_plan
 from . import holiday
 from . import sale_order
 from . import account_payment
+from . import account_partial_reconcile
 from . import account_journal
 from . import card_accreditation
+from . import card_accreditation_forecast
+from . import card_accreditation_summary
 from . import card_tax_deduction
 from . import card_batch_transfer
 from . import account_move
@@ -0,0 +1,31 @@
+# © 2025 ADHOC SA
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import models, api
+
+
+class AccountPartialReconcile(models.Model):
+    _inherit = 'account.partial.reconcile'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Propagate new reconciliations to card batch transfers"""
+        partials = super().create(vals_list)
+        partials._get_card_batch_transfers()._sync_state_from_inbound_payment()
+        return partials
+
+    def unlink(self):
+        """Propagate unreconciliations to card batch transfers"""
+        batch_transfers = self._get_card_batch_transfers()
+        result = super().unlink()
+        batch_transfers._sync_state_from_inbound_payment()
+        return result
+
+    def _get_card_batch_transfers(self):
+        """Batch transfers whose inbound payment is matched by these partials"""
+        payments = (self.debit_move_id | self.credit_move_id).payment_id
+        if not payments:
+            return self.env['card.batch.transfer']
+        return self.env['card.batch.transfer'].search([
+            ('inbound_payment_id', 'in', payments.ids)
+        ])
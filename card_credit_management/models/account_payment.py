@@ -237,8 +237,7 @@ class AccountPayment(models.Model):
                 payment._create_accreditation_record()
         
         # Update related batch transfers when payment is posted
-        for payment in self:
-            payment._update_related_batch_transfers()
+        self._sync_card_batch_transfers()
         
         return result
 
@@ -247,25 +246,8 @@ class AccountPayment(models.Model):
         result = super().write(vals)
         
         # Check if reconciliation status or state changed
-        if 'is_reconciled' in vals or any(field in vals for field in ['state']):
-            for payment in self:
-                # Handle internal transfer payments
-                if payment.is_internal_transfer and payment.payment_type == 'inbound':
-                    if (payment.is_reconciled and payment.state in ('posted', 'paid')) or payment.state in ('posted', 'paid'):
-                        payment._update_batch_transfer_reconciliation_status(reconciled=True)
-                    elif not payment.is_reconciled:
-                        payment._update_batch_transfer_reconciliation_status(reconciled=False)
-                
-                # Handle regular inbound payments that may be related to batch transfers
-                elif (payment.payment_type == 'inbound' and 
-                      not payment.is_internal_transfer):
-                    if payment.state in ('posted', 'paid'):  # When payment is posted/paid, mark batch as reconciled
-                        payment._update_batch_transfer_from_payment_reconciliation(reconciled=True)
-                    elif payment.state in ('cancel', 'draft'):
-                        payment._update_batch_transfer_from_payment_reconciliation(reconciled=False)
-                
-                # Handle batch transfers where this payment is the inbound_payment_id
-                payment._update_related_batch_transfers()
+        if 'is_reconciled' in vals or 'state' in vals:
+            self._sync_card_batch_transfers()
         
         return result
 
@@ -273,65 +255,75 @@ class AccountPayment(models.Model):
         """Override to handle batch transfer reconciliation status"""
         result = super().action_unreconcile()
         
-        # Update batch transfer accreditations when payment is unreconciled
-        for payment in self:
-            if payment.is_internal_transfer and payment.payment_type == 'inbound':
-                payment._update_batch_transfer_reconciliation_status(reconciled=False)
-            elif payment.payment_type == 'inbound' and not payment.is_internal_transfer:
-                payment._update_batch_transfer_from_payment_reconciliation(reconciled=False)
+        # Update batch transfers when payment is unreconciled
+        self._sync_card_batch_transfers(reconciled=False)
         
         return result
 
-    def _update_batch_transfer_reconciliation_status(self, reconciled=True):
-        """Update the reconciliation status of related batch transfer accreditations"""
-        self.ensure_one()
-        
-        if not self.is_internal_transfer:
+    def _sync_card_batch_transfers(self, reconciled=None):
+        """Propagate payment state and reconciliation changes to card batch transfers.
+
+        Event-driven counterpart of the batch transfer payment state fields:
+        called on posting, state writes and reconciliation changes for the
+        whole recordset, so affected transfers and their accreditations are
+        fetched once and updated with batched writes.
+        """
+        payments = self.exists()
+        if not payments:
             return
-            
-        # Find the batch transfer related to this payment
-        batch_transfers = self.env['card.batch.transfer'].search([
-            '|', 
-            ('outbound_payment_id', '=', self.id),
-            ('inbound_payment_id', '=', self.id)
-        ])
         
-        for batch_transfer in batch_transfers:
-            if reconciled:
-                batch_transfer.action_mark_accreditations_reconciled()
-            else:
-                batch_transfer.action_mark_accreditations_credited()
+        # Batch transfers where these payments are the inbound (paired) payment
+        self.env['card.batch.transfer'].search([
+            ('inbound_payment_id', 'in', payments.ids)
+        ])._sync_state_from_inbound_payment()
+        
+        # Regular inbound card payments related to batch transfers through their accreditations
+        payments.filtered(
+            lambda p: p.payment_type == 'inbound' and not p.is_internal_transfer
+        )._update_batch_transfer_from_payment_reconciliation(reconciled=reconciled)
 
-    def _update_batch_transfer_from_payment_reconciliation(self, reconciled=True):
-        """Update batch transfer status when a regular inbound payment state changes"""
-        self.ensure_one()
+    def _update_batch_transfer_from_payment_reconciliation(self, reconciled=None):
+        """Update batch transfer status when regular inbound payment states change.
+
+        :param reconciled: force the direction; by default posted/paid payments
+            reconcile their batch transfers and cancelled/draft ones revert them.
+        """
+        if not self:
+            return
         
-        # Find accreditations related to this payment
+        # Find batch transfers containing accreditations of these payments
         accreditations = self.env['card.accreditation'].search([
-            ('payment_id', '=', self.id)
+            ('payment_id', 'in', self.ids),
+            ('batch_transfer_id', '!=', False),
         ])
+        batch_transfers = accreditations.batch_transfer_id
+        if not batch_transfers:
+            return
         
-        # Find batch transfers that contain these accreditations
-        batch_transfers = self.env['card.batch.transfer'].search([
-            ('accreditation_ids', 'in', accreditations.ids)
-        ])
+        if reconciled is None:
+            reconciling_payments = self.filtered(lambda p: p.state in ('posted', 'paid'))
+            reverting_payments = self.filtered(lambda p: p.state in ('cancel', 'canceled', 'draft'))
+        elif reconciled:
+            reconciling_payments, reverting_payments = self, self.browse()
+        else:
+            reconciling_payments, reverting_payments = self.browse(), self
         
-        for batch_transfer in batch_transfers:
-            # Check if all payments in this batch transfer are in the right state
-            if reconciled:
-                # Get all accreditations in the batch transfer
-                all_payments = batch_transfer.accreditation_ids.mapped('payment_id')
-                # Check if all inbound payments are posted/paid
-                inbound_payments = all_payments.filtered(lambda p: p.payment_type == 'inbound')
-                
-                if inbound_payments and all(p.state in ('posted', 'paid') for p in inbound_payments):
-                    # All inbound payments are posted/paid, mark batch as reconciled
-                    if batch_transfer.state == 'transferred':
-                        batch_transfer.state = 'reconciled'
-            else:
-                # If any payment becomes unposted, revert to credited or transferred state
-                if batch_transfer.state == 'reconciled':
-                    batch_transfer.state = 'transferred'
+        # If any payment becomes unposted, revert to transferred state
+        to_revert = batch_transfers.filtered(
+            lambda t: t.state == 'reconciled'
+            and t.accreditation_ids.payment_id & reverting_payments
+        )
+        # Mark as reconciled when all inbound payments of the batch are posted/paid
+        to_reconcile = (batch_transfers - to_revert).filtered(
+            lambda t: t.state == 'transferred'
+            and t.accreditation_ids.payment_id & reconciling_payments
+            and all(
+                p.state in ('posted', 'paid')
+                for p in t.accreditation_ids.payment_id.filtered(lambda p: p.payment_type == 'inbound')
+            )
+        )
+        to_revert.write({'state': 'transferred'})
+        to_reconcile.write({'state': 'reconciled'})
 
     def _create_accreditation_record(self):
         """Crea registro en el modelo de acreditaciones"""
@@ -351,37 +343,6 @@ class AccountPayment(models.Model):
             'currency_id': self.currency_id.id,
         })
 
-    def _update_related_batch_transfers(self):
-        """Update batch transfers that have this payment as inbound_payment_id"""
-        self.ensure_one()
-        
-        # Find batch transfers where this payment is the inbound payment
-        batch_transfers = self.env['card.batch.transfer'].search([
-            ('inbound_payment_id', '=', self.id)
-        ])
-        
-        for batch_transfer in batch_transfers:
-            # Force recompute of payment paid status and state
-            batch_transfer._compute_is_payment_paid()
-            batch_transfer._compute_inbound_payment_state()
-            
-            # Auto-update batch transfer state based on payment state
-            if self.state == 'in_process' and batch_transfer.state == 'reconciled':
-                # Payment was unreconciled, batch should go back to transferred
-                batch_transfer.state = 'transferred'
-                batch_transfer.message_post(
-                    body=f"Batch transfer automatically updated to 'transferred' because inbound payment {self.name} was unreconciled (state: {self.state})",
-                    message_type='notification'
-                )
-            elif (self.state == 'posted' and self.is_reconciled and 
-                  batch_transfer.state == 'transferred'):
-                # Payment is fully reconciled, batch should go to reconciled
-                batch_transfer.state = 'reconciled'
-                batch_transfer.message_post(
-                    body=f"Batch transfer automatically updated to 'reconciled' because inbound payment {self.name} is fully reconciled",
-                    message_type='notification'
-                )
-
     def action_draft(self):
         """Override to prevent setting to draft if accreditations are in batch transfers"""
         # Check if any related accreditations are in batch transfers
@@ -205,6 +205,19 @@ class CardAccreditation(models.Model):
         ('adjustment', 'Adjustment'),
     ], string='Movement Type', default='sale')
 
+    # Fields that move an accreditation between cash-in forecast buckets
+    _FORECAST_FIELDS = {
+        'state', 'estimated_accreditation_date', 'journal_id', 'card_plan_id',
+        'currency_id', 'company_id', 'original_amount', 'fee', 'financial_cost',
+        'estimated_liquidation_amount',
+    }
+
+    # Fields that move an accreditation between operations summary rows
+    _SUMMARY_FIELDS = {
+        'state', 'collection_date', 'journal_id', 'card_plan_id', 'currency_id',
+        'company_id', 'original_amount', 'fee', 'financial_cost', 'net_amount',
+    }
+
     @api.depends('partner_id', 'journal_id', 'batch_number', 'coupon_number')
     def _compute_display_name(self):
         for record in self:
@@ -950,13 +963,15 @@ class CardAccreditation(models.Model):
             
             accreditation.write({'state': 'draft'})
 
-    @api.model
-    def create(self, vals):
+    @api.model_create_multi
+    def create(self, vals_list):
         """Override create to handle fee expense generation"""
-        record = super().create(vals)
+        records = super().create(vals_list)
         # NOTE: Fee and financial cost expenses are handled through vendor invoices,
         # not automatic journal entries. Only tax deductions create automatic entries.
-        return record
+        records._refresh_cash_forecast()
+        records._refresh_operations_summary()
+        return records
 
     def write(self, vals):
         """Override write to handle fee expense generation and tax deduction auto-posting"""
@@ -966,6 +981,14 @@ class CardAccreditation(models.Model):
             for record in self:
                 old_fees[record.id] = record.fee
         
+        # Store forecast keys before writing so vacated buckets are refreshed too
+        old_forecast_keys = set()
+        if self._FORECAST_FIELDS.intersection(vals):
+            old_forecast_keys = self._get_forecast_keys()
+        old_summary_keys = set()
+        if self._SUMMARY_FIELDS.intersection(vals):
+            old_summary_keys = self._get_summary_keys()
+        
         # Store old state values to detect state changes
         old_states = {}
         if 'state' in vals:
@@ -1000,8 +1023,55 @@ class CardAccreditation(models.Model):
                 if new_state == 'draft' and old_state != 'draft':
                     record._sync_payment_to_draft()
         
+        if self._FORECAST_FIELDS.intersection(vals):
+            self._refresh_cash_forecast(old_forecast_keys)
+        if self._SUMMARY_FIELDS.intersection(vals):
+            self._refresh_operations_summary(old_summary_keys)
+        
         return result
 
+    def unlink(self):
+        """Override unlink to drop the records from the forecast and summary"""
+        forecast_keys = self._get_forecast_keys()
+        summary_keys = self._get_summary_keys()
+        result = super().unlink()
+        self.env['card.accreditation.forecast']._refresh_keys(forecast_keys)
+        self.env['card.accreditation.summary']._refresh_keys(summary_keys)
+        return result
+
+    def _get_forecast_keys(self):
+        """Return the cash-in forecast buckets these accreditations fall into"""
+        return {
+            (record.company_id.id, record.journal_id.id, record.card_plan_id.id,
+             record.currency_id.id, record.estimated_accreditation_date)
+            for record in self
+            if record.estimated_accreditation_date
+        }
+
+    def _refresh_cash_forecast(self, extra_keys=None):
+        """Refresh the forecast buckets touched by these accreditations"""
+        self.env['card.accreditation.forecast']._refresh_keys(
+            self._get_forecast_keys() | (extra_keys or set())
+        )
+
+    def _get_summary_keys(self):
+        """Return the operations summary rows these accreditations fall into"""
+        summary_model = self.env['card.accreditation.summary']
+        today = fields.Date.context_today(self)
+        return {
+            (record.company_id.id, record.journal_id.id, record.card_plan_id.id,
+             record.currency_id.id, record.state,
+             summary_model._get_aging_bucket(record.collection_date, today))
+            for record in self
+            if record.collection_date
+        }
+
+    def _refresh_operations_summary(self, extra_keys=None):
+        """Refresh the operations summary rows touched by these accreditations"""
+        self.env['card.accreditation.summary']._refresh_keys(
+            self._get_summary_keys() | (extra_keys or set())
+        )
+
     def _handle_fee_change(self, new_fee):
         """Handle fee changes by creating/updating fee expense"""
         self.ensure_one()
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+
+from datetime import timedelta
+
+from odoo import models, fields, api
+
+FORECAST_HORIZON_DAYS = 90
+
+
+class CardAccreditationForecast(models.Model):
+    """Precomputed expected card inflows per day, journal, plan and currency.
+
+    Rows are maintained incrementally from ``card.accreditation`` changes
+    (see ``card.accreditation._refresh_cash_forecast``) and rebuilt daily by
+    cron so the forecast window keeps rolling forward.
+    """
+    _name = 'card.accreditation.forecast'
+    _description = 'Credit Card Cash-In Forecast'
+    _order = 'forecast_date, journal_id, card_plan_id'
+    _rec_name = 'forecast_date'
+
+    forecast_date = fields.Date(
+        string='Expected Date',
+        required=True,
+        readonly=True,
+        index=True
+    )
+
+    journal_id = fields.Many2one(
+        'account.journal',
+        string='Journal',
+        required=True,
+        readonly=True,
+        ondelete='cascade'
+    )
+
+    card_plan_id = fields.Many2one(
+        'card.plan',
+        string='Card Plan',
+        required=True,
+        readonly=True,
+        ondelete='cascade'
+    )
+
+    currency_id = fields.Many2one(
+        'res.currency',
+        string='Currency',
+        required=True,
+        readonly=True
+    )
+
+    company_id = fields.Many2one(
+        'res.company',
+        string='Company',
+        required=True,
+        readonly=True
+    )
+
+    expected_amount = fields.Monetary(
+        string='Expected Amount',
+        currency_field='currency_id',
+        readonly=True,
+        help='Sum of the estimated liquidation amount of pending accreditations'
+    )
+
+    accreditation_count = fields.Integer(
+        string='Number of Accreditations',
+        readonly=True
+    )
+
+    _sql_constraints = [
+        ('forecast_key_uniq',
+         'unique(company_id, journal_id, card_plan_id, currency_id, forecast_date)',
+         'Only one forecast row per date, journal, card plan and currency is allowed.'),
+    ]
+
+    _SOURCE_GROUPBY = [
+        'company_id',
+        'journal_id',
+        'card_plan_id',
+        'currency_id',
+        'estimated_accreditation_date:day',
+    ]
+
+    @api.model
+    def _get_source_domain(self):
+        """Accreditations that still represent an expected cash inflow"""
+        today = fields.Date.context_today(self)
+        return [
+            ('state', '=', 'pending'),
+            ('estimated_accreditation_date', '>=', today),
+            ('estimated_accreditation_date', '<=', today + timedelta(days=FORECAST_HORIZON_DAYS)),
+        ]
+
+    @api.model
+    def _read_source_totals(self, domain):
+        """Aggregate accreditations by forecast key with a single grouped query"""
+        accreditation_model = self.env['card.accreditation']
+        accreditation_model.flush_model()
+        totals = {}
+        for company, journal, plan, currency, day, amount, count in accreditation_model._read_group(
+            self._get_source_domain() + domain,
+            self._SOURCE_GROUPBY,
+            ['estimated_liquidation_amount:sum', '__count'],
+        ):
+            totals[(company.id, journal.id, plan.id, currency.id, day)] = (amount, count)
+        return totals
+
+    @api.model
+    def _refresh_keys(self, keys):
+        """Recompute the forecast rows for the given keys.
+
+        A key is a ``(company_id, journal_id, card_plan_id, currency_id, date)``
+        tuple, as returned by ``card.accreditation._get_forecast_keys``.
+        """
+        keys = {key for key in keys if all(key)}
+        if not keys:
+            return
+        key_domain = [
+            ('journal_id', 'in', list({key[1] for key in keys})),
+            ('card_plan_id', 'in', list({key[2] for key in keys})),
+            ('currency_id', 'in', list({key[3] for key in keys})),
+            ('estimated_accreditation_date', 'in', list({key[4] for key in keys})),
+        ]
+        totals = {
+            key: value
+            for key, value in self._read_source_totals(key_domain).items()
+            if key in keys
+        }
+        rows = self.sudo().search([
+            ('journal_id', 'in', key_domain[0][2]),
+            ('card_plan_id', 'in', key_domain[1][2]),
+            ('currency_id', 'in', key_domain[2][2]),
+            ('forecast_date', 'in', key_domain[3][2]),
+        ])
+        self._apply_totals(totals, rows.filtered(lambda row: row._get_key() in keys))
+
+    @api.model
+    def _rebuild_forecast(self):
+        """Rebuild the whole forecast window from scratch"""
+        self._apply_totals(self._read_source_totals([]), self.sudo().search([]))
+        return True
+
+    @api.model
+    def _cron_rebuild_forecast(self):
+        """Daily job: roll the forecast window and drop expired rows"""
+        return self._rebuild_forecast()
+
+    @api.model
+    def _apply_totals(self, totals, rows):
+        """Write ``totals`` over ``rows``: update, delete stale, create missing"""
+        to_unlink = self.sudo().browse()
+        for row in rows:
+            key = row._get_key()
+            if key not in totals:
+                to_unlink |= row
+                continue
+            amount, count = totals.pop(key)
+            if row.currency_id.compare_amounts(row.expected_amount, amount) or row.accreditation_count != count:
+                row.write({'expected_amount': amount, 'accreditation_count': count})
+        to_unlink.unlink()
+        if totals:
+            self.sudo().create([{
+                'company_id': company_id,
+                'journal_id': journal_id,
+                'card_plan_id': card_plan_id,
+                'currency_id': currency_id,
+                'forecast_date': day,
+                'expected_amount': amount,
+                'accreditation_count': count,
+            } for (company_id, journal_id, card_plan_id, currency_id, day), (amount, count) in totals.items()])
+
+    def _get_key(self):
+        self.ensure_one()
+        return (self.company_id.id, self.journal_id.id, self.card_plan_id.id, self.currency_id.id, self.forecast_date)
+
+    @api.model
+    def get_cash_in_forecast(self, days=FORECAST_HORIZON_DAYS, journal_ids=None, card_plan_ids=None,
+                             groupby=('forecast_date', 'currency_id')):
+        """Return the expected card inflows for the next ``days`` days.
+
+        Reads only the precomputed forecast rows, so it is cheap regardless of
+        the number of coupons. Returns a list of dicts with one entry per
+        ``groupby`` combination plus ``expected_amount`` and
+        ``accreditation_count``; relational values are returned as ids and
+        dates as strings.
+        """
+        today = fields.Date.context_today(self)
+        domain = [
+            ('forecast_date', '>=', today),
+            ('forecast_date', '<=', today + timedelta(days=days)),
+            ('company_id', 'in', self.env.companies.ids),
+        ]
+        if journal_ids:
+            domain.append(('journal_id', 'in', journal_ids))
+        if card_plan_ids:
+            domain.append(('card_plan_id', 'in', card_plan_ids))
+
+        groupby = [fname + ':day' if fname == 'forecast_date' else fname for fname in groupby]
+        result = []
+        for *groups, amount, count in self._read_group(
+            domain, groupby, ['expected_amount:sum', 'accreditation_count:sum'], order=', '.join(groupby)
+        ):
+            row = {}
+            for spec, value in zip(groupby, groups):
+                fname = spec.split(':')[0]
+                if isinstance(value, models.BaseModel):
+                    value = value.id
+                elif fname == 'forecast_date':
+                    value = fields.Date.to_string(value)
+                row[fname] = value
+            row.update(expected_amount=amount, accreditation_count=count)
+            result.append(row)
+        return result
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+
+from datetime import timedelta
+
+from odoo import models, fields, api
+
+# (bucket, minimum age in days, maximum age in days)
+AGING_BUCKETS = [
+    ('0_7', 0, 7),
+    ('8_30', 8, 30),
+    ('31_60', 31, 60),
+    ('61_90', 61, 90),
+    ('90_plus', 91, None),
+]
+
+
+class CardAccreditationSummary(models.Model):
+    """Materialized counters of card receivables per journal, plan, state and age.
+
+    Rows are maintained incrementally from ``card.accreditation`` changes
+    (batch transfer state changes reach it through the accreditation state
+    cascade) and rebuilt daily by cron so coupons move between aging buckets.
+    """
+    _name = 'card.accreditation.summary'
+    _description = 'Credit Card Operations Summary'
+    _order = 'journal_id, card_plan_id, state, aging_bucket'
+    _rec_name = 'journal_id'
+
+    journal_id = fields.Many2one(
+        'account.journal',
+        string='Journal',
+        required=True,
+        readonly=True,
+        ondelete='cascade'
+    )
+
+    card_plan_id = fields.Many2one(
+        'card.plan',
+        string='Card Plan',
+        required=True,
+        readonly=True,
+        ondelete='cascade'
+    )
+
+    state = fields.Selection(
+        selection=lambda self: self.env['card.accreditation']._fields['state'].selection,
+        string='Status',
+        required=True,
+        readonly=True
+    )
+
+    aging_bucket = fields.Selection([
+        ('0_7', '0-7 days'),
+        ('8_30', '8-30 days'),
+        ('31_60', '31-60 days'),
+        ('61_90', '61-90 days'),
+        ('90_plus', '+90 days'),
+    ], string='Age', required=True, readonly=True,
+       help='Days elapsed since the collection date')
+
+    currency_id = fields.Many2one(
+        'res.currency',
+        string='Currency',
+        required=True,
+        readonly=True
+    )
+
+    company_id = fields.Many2one(
+        'res.company',
+        string='Company',
+        required=True,
+        readonly=True
+    )
+
+    accreditation_count = fields.Integer(
+        string='Number of Accreditations',
+        readonly=True
+    )
+
+    original_amount = fields.Monetary(
+        string='Original Amount',
+        currency_field='currency_id',
+        readonly=True
+    )
+
+    total_tax_deductions = fields.Monetary(
+        string='Total Tax Deductions',
+        currency_field='currency_id',
+        readonly=True
+    )
+
+    net_amount = fields.Monetary(
+        string='Final Net Amount',
+        currency_field='currency_id',
+        readonly=True
+    )
+
+    _sql_constraints = [
+        ('summary_key_uniq',
+         'unique(company_id, journal_id, card_plan_id, currency_id, state, aging_bucket)',
+         'Only one summary row per journal, card plan, currency, status and age is allowed.'),
+    ]
+
+    _SOURCE_GROUPBY = [
+        'company_id',
+        'journal_id',
+        'card_plan_id',
+        'currency_id',
+        'state',
+        'collection_date:day',
+    ]
+
+    _SOURCE_AGGREGATES = [
+        '__count',
+        'original_amount:sum',
+        'total_tax_deductions:sum',
+        'net_amount:sum',
+    ]
+
+    @api.model
+    def _get_aging_bucket(self, collection_date, today):
+        age = (today - collection_date).days
+        for bucket, min_age, max_age in AGING_BUCKETS:
+            if max_age is None or age <= max_age:
+                return bucket
+        return AGING_BUCKETS[-1][0]
+
+    @api.model
+    def _get_bucket_date_domain(self, buckets, today):
+        """Collection date bounds covering all the given aging buckets"""
+        ranges = [(min_age, max_age) for bucket, min_age, max_age in AGING_BUCKETS if bucket in buckets]
+        domain = []
+        if all(max_age is not None for min_age, max_age in ranges):
+            domain.append(('collection_date', '>=', today - timedelta(days=max(r[1] for r in ranges))))
+        min_age = min(r[0] for r in ranges)
+        if min_age > 0:
+            domain.append(('collection_date', '<=', today - timedelta(days=min_age)))
+        return domain
+
+    @api.model
+    def _read_source_totals(self, domain):
+        """Aggregate accreditations by summary key with a single grouped query"""
+        accreditation_model = self.env['card.accreditation']
+        accreditation_model.flush_model()
+        today = fields.Date.context_today(self)
+        totals = {}
+        for company, journal, plan, currency, state, day, *values in accreditation_model._read_group(
+            domain, self._SOURCE_GROUPBY, self._SOURCE_AGGREGATES,
+        ):
+            key = (company.id, journal.id, plan.id, currency.id, state, self._get_aging_bucket(day, today))
+            current = totals.get(key, (0, 0.0, 0.0, 0.0))
+            totals[key] = tuple(a + (b or 0) for a, b in zip(current, values))
+        return totals
+
+    @api.model
+    def _refresh_keys(self, keys):
+        """Recompute the summary rows for the given keys.
+
+        A key is a ``(company_id, journal_id, card_plan_id, currency_id,
+        state, aging_bucket)`` tuple, as returned by
+        ``card.accreditation._get_summary_keys``.
+        """
+        keys = {key for key in keys if all(key)}
+        if not keys:
+            return
+        today = fields.Date.context_today(self)
+        journal_ids = list({key[1] for key in keys})
+        card_plan_ids = list({key[2] for key in keys})
+        currency_ids = list({key[3] for key in keys})
+        states = list({key[4] for key in keys})
+        totals = {
+            key: value
+            for key, value in self._read_source_totals([
+                ('journal_id', 'in', journal_ids),
+                ('card_plan_id', 'in', card_plan_ids),
+                ('currency_id', 'in', currency_ids),
+                ('state', 'in', states),
+            ] + self._get_bucket_date_domain({key[5] for key in keys}, today)).items()
+            if key in keys
+        }
+        rows = self.sudo().search([
+            ('journal_id', 'in', journal_ids),
+            ('card_plan_id', 'in', card_plan_ids),
+            ('currency_id', 'in', currency_ids),
+            ('state', 'in', states),
+        ])
+        self._apply_totals(totals, rows.filtered(lambda row: row._get_key() in keys))
+
+    @api.model
+    def _rebuild_summary(self):
+        """Rebuild all the summary rows from scratch"""
+        self._apply_totals(self._read_source_totals([]), self.sudo().search([]))
+        return True
+
+    @api.model
+    def _cron_rebuild_summary(self):
+        """Daily job: move accreditations to their new aging bucket"""
+        return self._rebuild_summary()
+
+    @api.model
+    def _apply_totals(self, totals, rows):
+        """Write ``totals`` over ``rows``: update, delete stale, create missing"""
+        to_unlink = self.sudo().browse()
+        for row in rows:
+            key = row._get_key()
+            if key not in totals:
+                to_unlink |= row
+                continue
+            vals = dict(zip(
+                ['accreditation_count', 'original_amount', 'total_tax_deductions', 'net_amount'],
+                totals.pop(key),
+            ))
+            if any(row[fname] != value for fname, value in vals.items()):
+                row.write(vals)
+        to_unlink.unlink()
+        if totals:
+            self.sudo().create([{
+                'company_id': company_id,
+                'journal_id': journal_id,
+                'card_plan_id': card_plan_id,
+                'currency_id': currency_id,
+                'state': state,
+                'aging_bucket': aging_bucket,
+                'accreditation_count': count,
+                'original_amount': original_amount,
+                'total_tax_deductions': total_tax_deductions,
+                'net_amount': net_amount,
+            } for (company_id, journal_id, card_plan_id, currency_id, state, aging_bucket),
+                  (count, original_amount, total_tax_deductions, net_amount) in totals.items()])
+
+    def _get_key(self):
+        self.ensure_one()
+        return (self.company_id.id, self.journal_id.id, self.card_plan_id.id,
+                self.currency_id.id, self.state, self.aging_bucket)
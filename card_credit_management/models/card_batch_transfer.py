@@ -1,8 +1,12 @@
 # -*- coding: utf-8 -*-
 
+import logging
+
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError, ValidationError
 
+_logger = logging.getLogger(__name__)
+
 
 class CardBatchTransfer(models.Model):
     _name = 'card.batch.transfer'
@@ -183,65 +187,59 @@ class CardBatchTransfer(models.Model):
     
     @api.depends('inbound_payment_id', 'inbound_payment_id.state')
     def _compute_is_payment_paid(self):
-        """Compute if the inbound payment is in paid state and auto-update state"""
+        """Compute if the inbound payment is in paid state"""
         for transfer in self:
             # Only consider 'paid' state, not 'posted'
             transfer.is_payment_paid = bool(
                 transfer.inbound_payment_id and transfer.inbound_payment_id.state == 'paid'
             )
-            
-            # Auto-update batch transfer state based on payment state
-            if transfer.is_payment_paid and transfer.state == 'transferred':
-                # Use write to trigger accreditation updates
-                transfer.write({'state': 'reconciled'})
-            elif not transfer.is_payment_paid and transfer.state == 'reconciled':
-                # Only revert if payment is cancelled or draft, not if it's just not posted yet
-                if transfer.inbound_payment_id and transfer.inbound_payment_id.state in ('cancel', 'draft'):
-                    # Use write to trigger accreditation updates
-                    transfer.write({'state': 'transferred'})
 
     @api.depends('inbound_payment_id', 'inbound_payment_id.state')
     def _compute_inbound_payment_state(self):
         """Compute inbound payment state automatically from the actual payment"""
         for transfer in self:
-            old_payment_state = transfer.inbound_payment_state
             if transfer.inbound_payment_id:
                 transfer.inbound_payment_state = transfer.inbound_payment_id.state
             else:
                 transfer.inbound_payment_state = 'draft'
-            
-            # Auto-update batch transfer state based on payment state changes
-            self._auto_update_batch_state_from_payment(old_payment_state)
     
-    def _auto_update_batch_state_from_payment(self, old_payment_state):
-        """Automatically update batch transfer state when payment state changes"""
-        for transfer in self:
-            if not transfer.inbound_payment_id:
-                continue
-                
-            current_payment_state = transfer.inbound_payment_state
-            
-            # When payment goes from 'posted' to 'in_process' (unreconciled), 
-            # batch transfer should go back to 'transferred'
-            if (old_payment_state == 'posted' and 
-                current_payment_state == 'in_process' and 
-                transfer.state == 'reconciled'):
-                
-                transfer.state = 'transferred'
+    def _sync_state_from_inbound_payment(self):
+        """Align the batch transfer state with the state of its inbound payment.
+
+        Called from payment events (posting, state changes, reconciliation)
+        rather than from compute methods, so reading transfers never writes.
+        Transfers changing state are updated with one write per direction.
+        """
+        transfers = self.filtered('inbound_payment_id')
+        
+        # When the inbound payment is paid (reconciled with the bank),
+        # batch transfer should go to 'reconciled'
+        to_reconcile = transfers.filtered(
+            lambda t: t.state == 'transferred' and (
+                t.inbound_payment_id.state == 'paid'
+                or (t.inbound_payment_id.state == 'posted' and t.inbound_payment_id.is_reconciled)
+            )
+        )
+        # When the inbound payment is unreconciled, reset or cancelled,
+        # batch transfer should go back to 'transferred'
+        to_revert = transfers.filtered(
+            lambda t: t.state == 'reconciled'
+            and t.inbound_payment_id.state in ('draft', 'in_process', 'cancel', 'canceled')
+        )
+        
+        if to_reconcile:
+            to_reconcile.write({'state': 'reconciled'})
+            for transfer in to_reconcile:
                 transfer.message_post(
-                    body=f"Batch transfer automatically updated to 'transferred' because inbound payment was unreconciled (state: {current_payment_state})",
+                    body=f"Batch transfer automatically updated to 'reconciled' because inbound payment {transfer.inbound_payment_id.name} is fully reconciled",
                     message_type='notification'
                 )
-            
-            # When payment is reconciled (posted and reconciled), 
-            # batch transfer should go to 'reconciled'  
-            elif (current_payment_state == 'posted' and 
-                  transfer.is_payment_reconciled and 
-                  transfer.state == 'transferred'):
-                
-                transfer.state = 'reconciled'
+        
+        if to_revert:
+            to_revert.write({'state': 'transferred'})
+            for transfer in to_revert:
                 transfer.message_post(
-                    body=f"Batch transfer automatically updated to 'reconciled' because inbound payment is fully reconciled",
+                    body=f"Batch transfer automatically updated to 'transferred' because inbound payment {transfer.inbound_payment_id.name} was unreconciled (state: {transfer.inbound_payment_id.state})",
                     message_type='notification'
                 )
     
@@ -273,17 +271,11 @@ class CardBatchTransfer(models.Model):
     
     def _update_accreditations_state_on_reconciled(self):
         """Helper method to update accreditations to reconciled state"""
-        if hasattr(self, 'accreditation_ids') and self.accreditation_ids:
-            self.accreditation_ids.filtered(lambda acc: acc.state == 'credited').write({
-                'state': 'reconciled'
-            })
+        self.action_mark_accreditations_reconciled()
     
     def _update_accreditations_state_on_transferred(self):
         """Helper method to update accreditations to credited state"""
-        if hasattr(self, 'accreditation_ids') and self.accreditation_ids:
-            self.accreditation_ids.filtered(lambda acc: acc.state == 'reconciled').write({
-                'state': 'credited'
-            })
+        self.action_mark_accreditations_credited()
     
     @api.model_create_multi
     def create(self, vals_list):
@@ -307,31 +299,44 @@ class CardBatchTransfer(models.Model):
         for transfer in self:
             if transfer.state != 'confirmed':
                 raise UserError("Only confirmed transfers can be executed.")
-            
-            # Create paired internal transfer payments following account_internal_transfer pattern
-            transfer._create_paired_internal_transfer_payments()
-            
-            transfer.move_id = transfer.outbound_payment_id.move_id.id
-            transfer.state = 'transferred'
-            
-            # Mark accreditations as credited
-            for accreditation in transfer.accreditation_ids:
-                accreditation.write({
-                    'state': 'credited',
-                    'actual_accreditation_date': transfer.transfer_date,
-                    'actual_liquidation_amount': accreditation.net_amount,
-                })
+        
+        # Create paired internal transfer payments following account_internal_transfer pattern
+        self._create_paired_internal_transfer_payments()
+        
+        for transfer in self:
+            transfer.write({
+                'move_id': transfer.outbound_payment_id.move_id.id,
+                'state': 'transferred',
+            })
+        
+        # Mark accreditations as credited, one write per transfer date
+        for transfer_date in set(self.mapped('transfer_date')):
+            self.filtered(lambda t: t.transfer_date == transfer_date).accreditation_ids.write({
+                'state': 'credited',
+                'actual_accreditation_date': transfer_date,
+            })
     
     def _create_paired_internal_transfer_payments(self):
-        """Create paired internal transfer payments following account_internal_transfer pattern"""
+        """Create paired internal transfer payments following account_internal_transfer pattern.
+
+        All outbound payments are created with a single ``create`` and posted
+        together; posting creates the paired inbound payments.
+        """
+        method_lines = {}
+        
+        def get_manual_method_line(journal, payment_type):
+            key = (journal.id, payment_type)
+            if key not in method_lines:
+                lines = (journal.outbound_payment_method_line_ids if payment_type == 'outbound'
+                         else journal.inbound_payment_method_line_ids)
+                method_lines[key] = lines.filtered(lambda l: l.payment_method_id.code == 'manual')[:1]
+            return method_lines[key]
+        
+        payment_vals_list = []
         for transfer in self:
             # Validate that journals have outstanding accounts configured
-            source_payment_method_line = transfer.source_journal_id.outbound_payment_method_line_ids.filtered(
-                lambda l: l.payment_method_id.code == 'manual'
-            )[:1]
-            dest_payment_method_line = transfer.destination_journal_id.inbound_payment_method_line_ids.filtered(
-                lambda l: l.payment_method_id.code == 'manual'  
-            )[:1]
+            source_payment_method_line = get_manual_method_line(transfer.source_journal_id, 'outbound')
+            dest_payment_method_line = get_manual_method_line(transfer.destination_journal_id, 'inbound')
             
             if not source_payment_method_line.payment_account_id:
                 raise ValidationError(
@@ -346,11 +351,10 @@ class CardBatchTransfer(models.Model):
                 )
             
             # Use the destination outstanding account for reconciliation
-            destination_account = dest_payment_method_line.payment_account_id
-            transfer.destination_account_id = destination_account.id
+            transfer.destination_account_id = dest_payment_method_line.payment_account_id.id
             
             # Create only the outbound payment - the paired payment will be created automatically by action_post
-            outbound_payment = self.env['account.payment'].with_context(_skip_card_validation=True).create({
+            payment_vals_list.append({
                 'payment_type': 'outbound',
                 'partner_type': 'supplier',
                 'partner_id': False,  # No partner for internal transfers
@@ -363,14 +367,102 @@ class CardBatchTransfer(models.Model):
                 'memo': f'Batch Transfer: {transfer.name}',
                 'is_internal_transfer': True,
             })
-            
-            # Post the outbound payment - this will automatically create the paired inbound payment
-            outbound_payment.action_post()
-            transfer.outbound_payment_id = outbound_payment.id
-            
+        
+        outbound_payments = self.env['account.payment'].with_context(_skip_card_validation=True).create(payment_vals_list)
+        
+        # Post the outbound payments - this will automatically create the paired inbound payments
+        outbound_payments.action_post()
+        
+        for transfer, outbound_payment in zip(self, outbound_payments):
             # Get the automatically created inbound payment
-            inbound_payment = outbound_payment.paired_internal_transfer_payment_id
-            transfer.inbound_payment_id = inbound_payment.id
+            transfer.write({
+                'outbound_payment_id': outbound_payment.id,
+                'inbound_payment_id': outbound_payment.paired_internal_transfer_payment_id.id,
+            })
+    
+    @api.model
+    def _get_pending_accreditation_domain(self, date_limit):
+        """Pending accreditations due on ``date_limit`` that are not in a batch yet"""
+        return [
+            ('state', '=', 'pending'),
+            ('batch_transfer_id', '=', False),
+            ('estimated_accreditation_date', '<=', date_limit),
+            ('journal_id.final_bank_journal_id', '!=', False),
+        ]
+
+    @api.model
+    def _build_pending_batch_transfers(self, date_limit=None, execute=True, journals=None):
+        """Group all due pending accreditations into batch transfers.
+
+        Pending accreditations that are not in a batch yet and whose estimated
+        accreditation date is on or before ``date_limit`` (today by default)
+        are grouped by company, journal, destination journal, currency and
+        expected date with a single grouped query. One batch transfer is
+        created per group, all with a single ``create``, and the accreditations
+        are linked through the one2many. When ``execute`` is set, the transfers
+        are confirmed and their paired payments created in one pass.
+
+        :param journals: only batch the accreditations of these card journals
+        :return: the created batch transfers
+        """
+        date_limit = date_limit or fields.Date.context_today(self)
+        domain = self._get_pending_accreditation_domain(date_limit)
+        if journals is not None:
+            domain.append(('journal_id', 'in', journals.ids))
+        groups = self.env['card.accreditation']._read_group(
+            domain,
+            ['company_id', 'journal_id', 'currency_id', 'estimated_accreditation_date:day'],
+            ['id:array_agg'],
+        )
+        if not groups:
+            return self.browse()
+        
+        transfers = self.create([{
+            'transfer_date': expected_date,
+            'source_journal_id': journal.id,
+            'destination_journal_id': journal.final_bank_journal_id.id,
+            'currency_id': currency.id,
+            'company_id': company.id,
+            'accreditation_ids': [(6, 0, accreditation_ids)],
+            'notes': f'Auto-created batch for {len(accreditation_ids)} accreditations',
+        } for company, journal, currency, expected_date, accreditation_ids in groups])
+        
+        # Mark all accreditations as credited at once
+        transfers.accreditation_ids.write({
+            'state': 'credited',
+            'actual_accreditation_date': fields.Date.context_today(self),
+        })
+        
+        if execute:
+            transfers.action_confirm()
+            transfers.action_transfer()
+        
+        return transfers
+    
+    @api.model
+    def _cron_build_batch_transfers(self):
+        """Nightly settlement preparation: batch and transfer due accreditations.
+
+        Each company and card journal is processed in its own savepoint, so a
+        misconfigured journal or a payment error only leaves its own
+        accreditations pending, to be retried on the next run.
+        """
+        date_limit = fields.Date.context_today(self)
+        groups = self.env['card.accreditation']._read_group(
+            self._get_pending_accreditation_domain(date_limit),
+            ['company_id', 'journal_id'],
+        )
+        for company, journal in groups:
+            try:
+                with self.env.cr.savepoint():
+                    self.with_company(company)._build_pending_batch_transfers(date_limit, journals=journal)
+            except Exception as e:
+                _logger.warning(
+                    "Error building the batch transfers of journal %s (company %s): %s",
+                    journal.name, company.name, e,
+                )
+                self.env.invalidate_all()
+        return True
     
     def action_cancel(self):
         """Cancel the batch transfer and related payments"""
@@ -599,18 +691,16 @@ class CardBatchTransfer(models.Model):
         return super().unlink()
     
     def action_mark_accreditations_reconciled(self):
-        """Mark all accreditations in this batch transfer as reconciled"""
-        for transfer in self:
-            transfer.accreditation_ids.filtered(lambda acc: acc.state == 'credited').write({
-                'state': 'reconciled'
-            })
+        """Mark all accreditations in these batch transfers as reconciled"""
+        self.accreditation_ids.filtered(lambda acc: acc.state == 'credited').write({
+            'state': 'reconciled'
+        })
     
     def action_mark_accreditations_credited(self):
-        """Mark all accreditations in this batch transfer as credited (back from reconciled)"""
-        for transfer in self:
-            transfer.accreditation_ids.filtered(lambda acc: acc.state == 'reconciled').write({
-                'state': 'credited'
-            })
+        """Mark all accreditations in these batch transfers as credited (back from reconciled)"""
+        self.accreditation_ids.filtered(lambda acc: acc.state == 'reconciled').write({
+            'state': 'credited'
+        })
     
     def action_check_reconciliation_status(self):
         """Check and display the current reconciliation status without automatic changes"""
@@ -694,35 +784,39 @@ class CardBatchTransfer(models.Model):
         
         result = super().write(vals)
         
-        # If state is updated, update accreditations accordingly
+        # If state is updated, update accreditations accordingly, in one write
+        # per transition across all transfers
         if 'state' in vals:
-            for transfer in self:
-                old_state = old_states.get(transfer.id)
-                new_state = vals['state']
-                
-                # If state changed to reconciled, mark accreditations as reconciled
-                if old_state == 'transferred' and new_state == 'reconciled':
-                    transfer.action_mark_accreditations_reconciled()
-                # If state changed from reconciled to transferred, mark accreditations as credited
-                elif old_state == 'reconciled' and new_state == 'transferred':
-                    transfer.action_mark_accreditations_credited()
-                # If state changed to draft, reset accreditations to pending
-                elif new_state == 'draft' and old_state != 'draft':
-                    accreditations_to_reset = transfer.accreditation_ids.filtered(
-                        lambda acc: acc.state in ('credited', 'reconciled')
-                    )
-                    if accreditations_to_reset:
-                        accreditations_to_reset.write({'state': 'pending'})
-                        # Log the automatic change
+            new_state = vals['state']
+            
+            # If state changed to reconciled, mark accreditations as reconciled
+            if new_state == 'reconciled':
+                self.filtered(
+                    lambda t: old_states.get(t.id) == 'transferred'
+                ).action_mark_accreditations_reconciled()
+            # If state changed from reconciled to transferred, mark accreditations as credited
+            elif new_state == 'transferred':
+                self.filtered(
+                    lambda t: old_states.get(t.id) == 'reconciled'
+                ).action_mark_accreditations_credited()
+            # If state changed to draft, reset accreditations to pending
+            elif new_state == 'draft':
+                transfers = self.filtered(lambda t: old_states.get(t.id) != 'draft')
+                accreditations_to_reset = transfers.accreditation_ids.filtered(
+                    lambda acc: acc.state in ('credited', 'reconciled')
+                )
+                if accreditations_to_reset:
+                    accreditations_to_reset.write({'state': 'pending'})
+                    # Log the automatic change
+                    for transfer in accreditations_to_reset.batch_transfer_id:
+                        reset_count = len(accreditations_to_reset.filtered(lambda acc: acc.batch_transfer_id == transfer))
                         transfer.message_post(
-                            body=f"Batch transfer state changed to draft. Automatically reset {len(accreditations_to_reset)} accreditation(s) to pending state."
+                            body=f"Batch transfer state changed to draft. Automatically reset {reset_count} accreditation(s) to pending state."
                         )
         
-        # If inbound_payment_id is updated, recompute payment state
+        # If inbound_payment_id is updated, align the state with the new payment
         if 'inbound_payment_id' in vals:
-            for transfer in self:
-                transfer._compute_is_payment_paid()
-                transfer._compute_inbound_payment_state()
+            self._sync_state_from_inbound_payment()
         
         return result
     
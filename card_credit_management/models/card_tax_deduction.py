@@ -232,12 +232,35 @@ class CardTaxDeduction(models.Model):
         # Retornar la primera línea (débito)
         return move.line_ids.filtered(lambda l: l.debit > 0)[0]
     
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Refrescar el pronóstico de cobros y el resumen de las acreditaciones afectadas"""
+        deductions = super().create(vals_list)
+        deductions.accreditation_id._refresh_cash_forecast()
+        deductions.accreditation_id._refresh_operations_summary()
+        return deductions
+    
+    def write(self, vals):
+        """Refrescar el pronóstico de cobros y el resumen si cambia el monto deducido"""
+        old_accreditations = self.accreditation_id if 'accreditation_id' in vals else self.env['card.accreditation']
+        result = super().write(vals)
+        if 'amount' in vals or 'accreditation_id' in vals:
+            accreditations = self.accreditation_id | old_accreditations
+            accreditations._refresh_cash_forecast()
+            accreditations._refresh_operations_summary()
+        return result
+    
     def unlink(self):
         """Prevenir eliminación de deducciones registradas"""
         for deduction in self:
             if deduction.state == 'posted':
                 raise UserError("Cannot delete posted tax deductions")
-        return super().unlink()
+        accreditations = self.accreditation_id
+        result = super().unlink()
+        accreditations = accreditations.exists()
+        accreditations._refresh_cash_forecast()
+        accreditations._refresh_operations_summary()
+        return result
 
 
 class CardTaxDeductionTemplate(models.Model):
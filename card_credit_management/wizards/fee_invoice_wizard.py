@@ -1,3 +1,7 @@
+import base64
+import csv
+import io
+
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError
 
@@ -59,6 +63,15 @@ class FeeInvoiceWizard(models.TransientModel):
         required=True
     )
     
+    grouping_mode = fields.Selection([
+        ('detailed', 'One line per accreditation'),
+        ('grouped', 'Grouped by card plan, account and period'),
+    ], string='Invoice Lines',
+       default='detailed',
+       required=True,
+       help='Grouped mode creates one line per card plan, expense account and month, '
+            'and attaches the detail per coupon to the invoice as a CSV file')
+    
     description = fields.Text(
         string='Invoice Description',
         default='Credit card processing fees'
@@ -134,58 +147,87 @@ class FeeInvoiceWizard(models.TransientModel):
             'invoice_line_ids': [],
         }
         
-        # Create invoice lines for each accreditation
-        for accreditation in self.accreditation_ids:
-            # Add fee line if fee > 0 and not already invoiced
-            if accreditation.fee > 0 and not accreditation.fee_invoiced:
-                fee_line_vals = {
-                    'name': f'Credit Card Processing Fee - {accreditation.partner_id.name} - {accreditation.collection_date} - Batch: {accreditation.batch_number or "N/A"} - Coupon: {accreditation.coupon_number or "N/A"}',
-                    'quantity': 1,
-                    'price_unit': accreditation.fee,
-                    'account_id': self._get_fee_expense_account(accreditation),
-                }
-                invoice_vals['invoice_line_ids'].append((0, 0, fee_line_vals))
-            
-            # Add financial cost line if requested and cost > 0 and not already invoiced
-            if (self.include_financial_cost and 
-                accreditation.financial_cost > 0 and 
-                not accreditation.financial_cost_invoiced):
+        # Resolve expense accounts once per card plan instead of once per coupon
+        account_cache = {}
+        
+        def get_account(kind, accreditation):
+            key = (kind, accreditation.card_plan_id.id)
+            if key not in account_cache:
+                if kind == 'fee':
+                    account_cache[key] = self._get_fee_expense_account(accreditation)
+                else:
+                    account_cache[key] = self._get_financial_cost_expense_account(accreditation)
+            return account_cache[key]
+        
+        # Work out what has to be invoiced for each accreditation
+        fee_accreditations = self.accreditation_ids.filtered(
+            lambda acc: acc.fee > 0 and not acc.fee_invoiced
+        )
+        financial_accreditations = self.env['card.accreditation']
+        if self.include_financial_cost:
+            financial_accreditations = self.accreditation_ids.filtered(
+                lambda acc: acc.financial_cost > 0 and not acc.financial_cost_invoiced
+            )
+      
+        # Id sets for O(1) membership tests in the loops below
+        fee_ids = set(fee_accreditations.ids)
+        financial_ids = set(financial_accreditations.ids)
+        
+        if self.grouping_mode == 'grouped':
+            invoice_vals['invoice_line_ids'] = self._prepare_grouped_invoice_lines(
+                fee_accreditations, financial_accreditations, get_account
+            )
+        else:
+            for accreditation in self.accreditation_ids:
+                # Add fee line if fee > 0 and not already invoiced
+                if accreditation.id in fee_ids:
+                    fee_line_vals = {
+                        'name': f'Credit Card Processing Fee - {accreditation.partner_id.name} - {accreditation.collection_date} - Batch: {accreditation.batch_number or "N/A"} - Coupon: {accreditation.coupon_number or "N/A"}',
+                        'quantity': 1,
+                        'price_unit': accreditation.fee,
+                        'account_id': get_account('fee', accreditation),
+                    }
+                    invoice_vals['invoice_line_ids'].append((0, 0, fee_line_vals))
                 
-                financial_line_vals = {
-                    'name': f'Financial Cost (Installments) - {accreditation.partner_id.name} - {accreditation.collection_date} - Batch: {accreditation.batch_number or "N/A"} - Coupon: {accreditation.coupon_number or "N/A"}',
-                    'quantity': 1,
-                    'price_unit': accreditation.financial_cost,
-                    'account_id': self._get_financial_cost_expense_account(accreditation),
-                }
-                invoice_vals['invoice_line_ids'].append((0, 0, financial_line_vals))
+                # Add financial cost line if requested and cost > 0 and not already invoiced
+                if accreditation.id in financial_ids:
+                    financial_line_vals = {
+                        'name': f'Financial Cost (Installments) - {accreditation.partner_id.name} - {accreditation.collection_date} - Batch: {accreditation.batch_number or "N/A"} - Coupon: {accreditation.coupon_number or "N/A"}',
+                        'quantity': 1,
+                        'price_unit': accreditation.financial_cost,
+                        'account_id': get_account('financial_cost', accreditation),
+                    }
+                    invoice_vals['invoice_line_ids'].append((0, 0, financial_line_vals))
         
         # Create the invoice
         invoice = self.env['account.move'].create(invoice_vals)
         
-        # Mark accreditations as invoiced
-        for accreditation in self.accreditation_ids:
-            updates = {}
-            if accreditation.fee > 0 and not accreditation.fee_invoiced:
-                updates['fee_invoiced'] = True
-            if (self.include_financial_cost and 
-                accreditation.financial_cost > 0 and 
-                not accreditation.financial_cost_invoiced):
-                updates['financial_cost_invoiced'] = True
-            
-            if updates:
-                accreditation.write(updates)
+        # Mark accreditations as invoiced with one write per combination of flags
+        (fee_accreditations & financial_accreditations).write({
+            'fee_invoiced': True,
+            'financial_cost_invoiced': True,
+        })
+        (fee_accreditations - financial_accreditations).write({'fee_invoiced': True})
+        (financial_accreditations - fee_accreditations).write({'financial_cost_invoiced': True})
         
-        # Log activity on each accreditation
-        for accreditation in self.accreditation_ids:
-            invoice_items = []
-            if accreditation.fee > 0 and not accreditation.fee_invoiced:
-                invoice_items.append(f'Fee: {accreditation.fee}')
-            if (self.include_financial_cost and 
-                accreditation.financial_cost > 0 and 
-                not accreditation.financial_cost_invoiced):
-                invoice_items.append(f'Financial Cost: {accreditation.financial_cost}')
-            
-            if invoice_items:
+        if self.grouping_mode == 'grouped':
+            # Keep the per-coupon detail in a breakdown file attached to the invoice
+            attachment = self._create_breakdown_attachment(invoice, fee_accreditations, financial_accreditations)
+            invoice.message_post(
+                body=_('Invoice created from %d credit card accreditations. See the attached breakdown for the detail per coupon.')
+                % len(fee_accreditations | financial_accreditations),
+                attachment_ids=attachment.ids,
+                subtype_xmlid='mail.mt_note',
+            )
+        else:
+            # Log activity on each accreditation
+            for accreditation in fee_accreditations | financial_accreditations:
+                invoice_items = []
+                if accreditation.id in fee_ids:
+                    invoice_items.append(f'Fee: {accreditation.fee}')
+                if accreditation.id in financial_ids:
+                    invoice_items.append(f'Financial Cost: {accreditation.financial_cost}')
+                
                 accreditation.message_post(
                     body=f'Invoiced to {self.partner_id.name} in invoice {invoice.name}: {", ".join(invoice_items)}',
                     subtype_xmlid='mail.mt_note'
@@ -201,6 +243,61 @@ class FeeInvoiceWizard(models.TransientModel):
             'target': 'current',
         }
 
+    def _prepare_grouped_invoice_lines(self, fee_accreditations, financial_accreditations, get_account):
+        """Build one invoice line per card plan, expense account and period (month)"""
+        groups = {}
+        for kind, accreditations, amount_field, label in (
+            ('fee', fee_accreditations, 'fee', 'Credit Card Processing Fee'),
+            ('financial_cost', financial_accreditations, 'financial_cost', 'Financial Cost (Installments)'),
+        ):
+            for accreditation in accreditations:
+                period = accreditation.collection_date.strftime('%m/%Y')
+                key = (label, accreditation.card_plan_id, get_account(kind, accreditation), period)
+                amount, count = groups.get(key, (0.0, 0))
+                groups[key] = (amount + accreditation[amount_field], count + 1)
+        
+        return [
+            (0, 0, {
+                'name': f'{label} - {plan.display_name} - {period} ({count} coupons)',
+                'quantity': 1,
+                'price_unit': amount,
+                'account_id': account_id,
+            })
+            for (label, plan, account_id, period), (amount, count) in groups.items()
+        ]
+
+    def _create_breakdown_attachment(self, invoice, fee_accreditations, financial_accreditations):
+        """Attach a CSV with the invoiced amounts per accreditation to the invoice"""
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow([
+            'Collection Date', 'Customer', 'Journal', 'Card Plan', 'Batch', 'Coupon',
+            'Original Amount', 'Fee', 'Financial Cost',
+        ])
+        fee_ids = set(fee_accreditations.ids)
+        financial_ids = set(financial_accreditations.ids)
+        for accreditation in (fee_accreditations | financial_accreditations).sorted('collection_date'):
+            writer.writerow([
+                fields.Date.to_string(accreditation.collection_date),
+                accreditation.partner_id.name,
+                accreditation.journal_id.name,
+                accreditation.card_plan_id.name,
+                accreditation.batch_number or '',
+                accreditation.coupon_number or '',
+                accreditation.original_amount,
+                accreditation.fee if accreditation.id in fee_ids else 0.0,
+                accreditation.financial_cost if accreditation.id in financial_ids else 0.0,
+            ])
+        
+        return self.env['ir.attachment'].create({
+            'name': f'card_fee_breakdown_{fields.Date.to_string(self.invoice_date)}.csv',
+            'type': 'binary',
+            'datas': base64.b64encode(output.getvalue().encode('utf-8')),
+            'mimetype': 'text/csv',
+            'res_model': 'account.move',
+            'res_id': invoice.id,
+        })
+
     def _get_fee_expense_account(self, accreditation):
         """Get the expense account for fee from card plan or default"""
         if accreditation.card_plan_id and accreditation.card_plan_id.fee_account_id:
@@ -171,7 +171,7 @@ class CreditCardPaymentWizard(models.TransientModel):
         # Determine the correct currency and amount based on payment type
         if self.payment_type == 'usd':
             # For USD payments, use USD currency and user-specified amount
-            payment_currency = self.env['res.currency'].search([('name', '=', 'USD')], limit=1)
+            payment_currency = self.env['res.currency']._get_currency_by_name('USD')
             if not payment_currency:
                 raise UserError(_("USD currency not found in system."))
             payment_amount = self.amount  # Use amount from wizard, not total available
@@ -178,8 +178,8 @@ class CreditCardStatementWizard(models.TransientModel):
                 continue
                 
             # Get ARS and USD currencies
-            ars_currency = self.env['res.currency'].search([('name', '=', 'ARS')], limit=1)
-            usd_currency = self.env['res.currency'].search([('name', '=', 'USD')], limit=1)
+            ars_currency = self.env['res.currency']._get_currency_by_name('ARS')
+            usd_currency = self.env['res.currency']._get_currency_by_name('USD')
             
             if not ars_currency or not usd_currency:
                 # Fallback to simple sum if currencies not found
@@ -187,7 +187,7 @@ class CreditCardStatementWizard(models.TransientModel):
                 continue
             
             # Convert USD total to ARS using closing date exchange rate
-            usd_in_ars = usd_currency._convert(
+            usd_in_ars = usd_currency._cached_convert(
                 record.total_to_pay_usd,
                 ars_currency,
                 record.journal_id.company_id,
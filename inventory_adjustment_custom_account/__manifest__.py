@@ -35,6 +35,7 @@ This module extends Odoo's standard inventory adjustment functionality by allowi
 2. Create a new inventory adjustment or update an existing one
 3. For each product line, you can now select a custom adjustment account
 4. The selected account will be used instead of the default valuation account when posting the inventory adjustment
+5. Large counts can be imported from a CSV file (location, product, lot, counted quantity, adjustment account code) with **Inventory > Operations > Import Physical Count**
     """,
     'author': 'OnlyOne Odoo Team',
     'website': 'www.onlyone.odoo.com',
@@ -42,7 +43,9 @@ This module extends Odoo's standard inventory adjustment functionality by allowi
         'stock_account', # Dependencia clave para la valoración de inventario
     ],
     'data': [
+        'security/ir.model.access.csv',
         'views/stock_quant_views.xml',
+        'wizard/stock_count_import_views.xml',
     ],
     'installable': True,
     'application': False,
@@ -1,9 +1,6 @@
 # -*- coding: utf-8 -*-
 from odoo import models, fields, api, _
 from odoo.tools.float_utils import float_is_zero
-import logging # Importar logging
-
-_logger = logging.getLogger(__name__) # Inicializar logger
 
 class StockQuant(models.Model):
     _inherit = 'stock.quant'
@@ -18,45 +15,24 @@ class StockQuant(models.Model):
              " If left empty, the default account from the inventory adjustment location will be used."
     )
 
-    # --- Lógica Principal: Aplicar Inventario y Pasar Contexto ---
-    # Heredamos _apply_inventory para pasar la cuenta en contexto,
-    # el objetivo es que lo use el stock.move al crear la capa
-    def _apply_inventory(self):
-        # Log al inicio del método
-        _logger.info(f"--- Inicio _apply_inventory para Quants: {self.ids} ---")
-
-        # Iteramos sobre los quants para construir el mapa y loggear la información
-        quant_account_map = {}
-        for quant in self:
-             # Log individual para ver qué cuenta se seleccionó (si alguna)
-             _logger.info(f"Procesando Quant ID: {quant.id}, Producto: {quant.product_id.display_name}, Cantidad Contada: {quant.inventory_quantity}, Cuenta Ajuste Seleccionada: {quant.x_adjustment_account_id.id} ({quant.x_adjustment_account_id.display_name})")
-             if quant.x_adjustment_account_id:
-                 quant_account_map[quant.id] = quant.x_adjustment_account_id.id
-
-        # Log para ver el mapa construido
-        _logger.info(f"[Paso 1 & 2 - Check 1] Mapa de Cuentas Personalizadas Creado: {quant_account_map}")
-
-        # Preparamos el contexto para pasarlo a super()
-        final_ctx = self.env.context.copy() # Copiamos el contexto actual
-        if quant_account_map:
-            final_ctx['custom_adjustment_accounts'] = quant_account_map
-            _logger.info(f"[Paso 1 & 2 - Check 2] Contexto modificado para pasar a super(): {final_ctx}")
-            # Llamamos a super() usando el contexto modificado
-            res = super(StockQuant, self.with_context(final_ctx))._apply_inventory()
-        else:
-             _logger.info("[Paso 1 & 2 - Check 2] No hay cuentas personalizadas, llamando a super() con contexto original.")
-             # Llamamos a super() usando el contexto original
-             res = super(StockQuant, self)._apply_inventory()
-
-        # Log al final del método
-        _logger.info(f"--- Fin _apply_inventory para Quants: {self.ids} ---")
-
-        # Considera limpiar el campo DESPUÉS de llamar a super() y confirmar que fue exitoso
-        # Podrías querer hacerlo solo si res es True o no hay errores, pero es complejo.
-        # Ejemplo simple (sin garantía de éxito de la operación completa):
-        # self.filtered(lambda q: q.x_adjustment_account_id).write({'x_adjustment_account_id': False})
-
-        return res
+    # --- Edición en Modo Inventario ---
+    # En inventory_mode sólo se pueden escribir los campos de este listado,
+    # la cuenta se agrega para editarla junto con la cantidad contada
+    @api.model
+    def _get_inventory_fields_write(self):
+        return super()._get_inventory_fields_write() + ['x_adjustment_account_id']
+
+    # --- Lógica Principal: Llevar la Cuenta al Movimiento ---
+    # La cuenta seleccionada viaja en los valores del stock.move de cada quant,
+    # así el asiento de cada movimiento usa su propia cuenta aunque se apliquen
+    # miles de quants a la vez
+    def _get_inventory_move_values(self, qty, location_id, location_dest_id, package_id=False, package_dest_id=False):
+        vals = super()._get_inventory_move_values(
+            qty, location_id, location_dest_id, package_id=package_id, package_dest_id=package_dest_id
+        )
+        if self.x_adjustment_account_id:
+            vals['x_adjustment_account_id'] = self.x_adjustment_account_id.id
+        return vals
 
     # --- Métodos Adicionales (UI/Cálculos) ---
     @api.onchange('inventory_quantity')
@@ -76,25 +52,9 @@ class StockQuant(models.Model):
     # inventory_diff_quantity = fields.Float(compute='_compute_inventory_diff_quantity', ...) # Si defines el campo
 
     # Este método puede ser llamado al hacer clic en "Aplicar" en la vista de lista
-    # OJO: Verifica si el botón estándar de Odoo 17 llama a este método o a _apply_inventory directamente.
-    #      Si llama a _apply_inventory, este método podría no ser necesario o causar doble ejecución del contexto.
-    #      Por seguridad, podrías comentar este método si no estás seguro que se use.
+    # La cuenta ya no viaja en el contexto: _get_inventory_move_values la copia a cada movimiento
     def action_apply_inventory(self):
-        _logger.info(f"--- Inicio action_apply_inventory para Quants: {self.ids} ---")
-        quant_account_map = {
-            quant.id: quant.x_adjustment_account_id.id
-            for quant in self if quant.x_adjustment_account_id
-        }
-        _logger.info(f"Mapa de Cuentas (desde action_apply_inventory): {quant_account_map}")
-        ctx = self.env.context.copy()
-        if quant_account_map:
-            ctx['custom_adjustment_accounts'] = quant_account_map
-            _logger.info(f"Contexto a pasar desde action_apply_inventory: {ctx}")
-
-        # Llamar a _apply_inventory CON el contexto (puede ser redundante si _apply_inventory ya lo hace)
-        self.with_context(ctx)._apply_inventory()
-
-        _logger.info(f"--- Fin action_apply_inventory para Quants: {self.ids} ---")
+        self._apply_inventory()
         # Es posible que necesites devolver una acción o True/False dependiendo de Odoo 17
         # Devolver True suele ser seguro para cerrar asistentes o indicar éxito simple.
         return {'type': 'ir.actions.act_window_close'} # Acción común para botones
\ No newline at end of file
@@ -4,12 +4,10 @@ from odoo import models, fields
 class StockValuationLayer(models.Model):
     _inherit = 'stock.valuation.layer'
 
-    # Solo mantenemos el campo por si acaso o para futura referencia/debug,
-    # pero ya no se usa activamente en la lógica de modificación del asiento.
+    # Cuenta de ajuste del movimiento que generó la capa, para trazabilidad
     x_adjustment_account_id = fields.Many2one(
         'account.account',
         string='Custom Adjustment Account',
-        company_dependent=True,
         copy=False,
         readonly=True,
-    )
\ No newline at end of file
+    )
@@ -0,0 +1,80 @@
+import base64
+
+from odoo.tests import tagged
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+
+@tagged('post_install', '-at_install')
+class TestStockCountImport(AccountTestInvoicingCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.stock_location = cls.env['stock.warehouse'].search([
+            ('company_id', '=', cls.env.company.id),
+        ], limit=1).lot_stock_id
+        cls.valuation_account = cls.env['account.account'].create({
+            'name': 'Mercaderías',
+            'code': '111001',
+            'account_type': 'asset_current',
+        })
+        cls.adjustment_account = cls.env['account.account'].create({
+            'name': 'Faltantes de Inventario',
+            'code': '511001',
+            'account_type': 'expense',
+        })
+        category = cls.env['product.category'].create({
+            'name': 'Valoración Automática',
+            'property_cost_method': 'standard',
+            'property_valuation': 'real_time',
+            'property_stock_valuation_account_id': cls.valuation_account.id,
+            'property_stock_account_input_categ_id': cls.company_data['default_account_expense'].id,
+            'property_stock_account_output_categ_id': cls.company_data['default_account_expense'].id,
+            'property_stock_journal': cls.company_data['default_journal_misc'].id,
+        })
+        cls.product = cls.env['product.product'].create({
+            'name': 'Producto Contado',
+            'default_code': 'CONT-01',
+            'is_storable': True,
+            'categ_id': category.id,
+            'standard_price': 5.0,
+        })
+
+    def _import(self, apply_inventory):
+        content = 'ubicacion;producto;cantidad;cuenta\n%s;CONT-01;10;%s\n' % (
+            self.stock_location.complete_name, self.adjustment_account.code,
+        )
+        wizard = self.env['stock.count.import'].create({
+            'data_file': base64.b64encode(content.encode()),
+            'filename': 'conteo.csv',
+            'apply_inventory': apply_inventory,
+        })
+        return wizard._run_import()
+
+    def _get_quant(self):
+        return self.env['stock.quant'].search([
+            ('product_id', '=', self.product.id),
+            ('location_id', '=', self.stock_location.id),
+        ])
+
+    def test_import_sets_count_and_account(self):
+        stats = self._import(apply_inventory=False)
+        self.assertEqual(stats['counted'], 1)
+        self.assertFalse(stats['errors'])
+        quant = self._get_quant()
+        self.assertEqual(quant.inventory_quantity, 10.0)
+        self.assertEqual(quant.x_adjustment_account_id, self.adjustment_account)
+
+    def test_import_applies_with_adjustment_account(self):
+        stats = self._import(apply_inventory=True)
+        self.assertEqual(stats['applied'], 1)
+        self.assertEqual(self._get_quant().quantity, 10.0)
+        move = self.env['stock.move'].search([
+            ('product_id', '=', self.product.id),
+            ('location_dest_id', '=', self.stock_location.id),
+        ])
+        self.assertEqual(move.x_adjustment_account_id, self.adjustment_account)
+        counterpart = move.account_move_ids.line_ids.filtered(lambda l: l.account_id == self.adjustment_account)
+        self.assertEqual(counterpart.credit, 50.0)
@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+import base64
+import csv
+import io
+import logging
+from collections import defaultdict
+
+from odoo import models, fields, _
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+# Filas con error listadas en el resumen de la importación
+MAX_REPORTED_ERRORS = 20
+
+# Nombres de encabezado (en minúsculas) aceptados para cada columna
+COUNT_COLUMNS = {
+    'location': ['location', 'ubicacion', 'ubicación'],
+    'product': ['product', 'producto', 'default_code', 'referencia', 'codigo', 'código', 'barcode'],
+    'lot': ['lot', 'lote', 'serial', 'lot/serial', 'lote/serie', 'serie'],
+    'quantity': ['quantity', 'counted quantity', 'cantidad', 'cantidad contada', 'conteo'],
+    'account': ['account', 'adjustment account', 'cuenta', 'cuenta ajuste', 'cuenta de ajuste'],
+}
+REQUIRED_COLUMNS = ('location', 'product', 'quantity')
+
+
+class StockCountImport(models.TransientModel):
+    """Importa un conteo físico (CSV) a los quants.
+
+    El archivo se lee fila por fila desde el filestore y se procesa por
+    bloques: ubicaciones, productos, lotes, cuentas y quants se resuelven con
+    una búsqueda por bloque, y la cantidad contada y la cuenta de ajuste se
+    escriben agrupadas por valor. Opcionalmente el inventario se aplica por
+    bloque, usando la cuenta de ajuste de cada quant.
+    """
+    _name = 'stock.count.import'
+    _description = 'Physical Count Import'
+
+    company_id = fields.Many2one(
+        'res.company',
+        required=True,
+        default=lambda self: self.env.company
+    )
+    data_file = fields.Binary(
+        string='File',
+        required=True,
+        attachment=True
+    )
+    filename = fields.Char()
+    delimiter = fields.Selection([
+        (';', 'Semicolon (;)'),
+        (',', 'Comma (,)'),
+        ('\t', 'Tab'),
+    ], required=True, default=';')
+    encoding = fields.Selection([
+        ('utf-8-sig', 'UTF-8'),
+        ('cp1252', 'Windows-1252 / Latin-1'),
+    ], required=True, default='utf-8-sig')
+    decimal_separator = fields.Selection([
+        (',', 'Comma (1.234,56)'),
+        ('.', 'Dot (1,234.56)'),
+    ], required=True, default=',')
+    chunk_size = fields.Integer(
+        required=True,
+        default=1000,
+        help="Rows processed (and quants applied) per batch"
+    )
+    apply_inventory = fields.Boolean(
+        string='Apply Inventory',
+        default=True,
+        help="Apply the counted quantities after the import. Otherwise the counts are only "
+             "set on the quants, to be reviewed and applied from the Physical Inventory."
+    )
+
+    def _open_data_file(self):
+        """Archivo subido como stream, leído desde el filestore cuando es posible"""
+        self.ensure_one()
+        attachment = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('res_id', '=', self.id),
+            ('res_field', '=', 'data_file'),
+        ], limit=1)
+        if attachment.store_fname:
+            return open(attachment._full_path(attachment.store_fname), 'rb')
+        return io.BytesIO(base64.b64decode(self.data_file or b''))
+
+    def _iter_rows(self, stream):
+        """Genera (número de fila, {columna: valor}) para cada fila de datos"""
+        self.ensure_one()
+        reader = csv.reader(
+            io.TextIOWrapper(stream, encoding=self.encoding, errors='replace', newline=''),
+            delimiter=self.delimiter,
+        )
+        columns = None
+        for row_number, row in enumerate(reader, 1):
+            if not any(cell.strip() for cell in row):
+                continue
+            if columns is None:
+                headers = [cell.strip().lower() for cell in row]
+                columns = {
+                    column: headers.index(name)
+                    for column, names in COUNT_COLUMNS.items()
+                    for name in names if name in headers
+                }
+                missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+                if missing:
+                    raise UserError(_("Missing columns in the file header: %s") % ', '.join(missing))
+                continue
+            yield row_number, {
+                column: row[index].strip() if index < len(row) else ''
+                for column, index in columns.items()
+            }
+
+    def _parse_quantity(self, value):
+        value = (value or '').replace(' ', '')
+        thousands = '.' if self.decimal_separator == ',' else ','
+        return float(value.replace(thousands, '').replace(self.decimal_separator, '.'))
+
+    # -------------------------------------------------------------------------
+    # Búsquedas por bloque
+    # -------------------------------------------------------------------------
+
+    def _resolve(self, cache, keys, search):
+        """Completa ``cache`` con los ``keys`` aún no resueltos, con una sola búsqueda"""
+        missing = {key for key in keys if key and key not in cache}
+        if missing:
+            cache.update(search(missing))
+            cache.update({key: False for key in missing if key not in cache})
+
+    def _search_locations(self, names):
+        locations = self.env['stock.location'].search_fetch([
+            ('usage', '=', 'internal'),
+            ('company_id', '=', self.company_id.id),
+            '|', ('complete_name', 'in', list(names)), ('barcode', 'in', list(names)),
+        ], ['complete_name', 'barcode'])
+        result = {location.barcode: location.id for location in locations if location.barcode in names}
+        result.update({location.complete_name: location.id for location in locations})
+        return result
+
+    def _search_products(self, codes):
+        products = self.env['product.product'].search_fetch([
+            ('is_storable', '=', True),
+            ('company_id', 'in', [False, self.company_id.id]),
+            '|', ('default_code', 'in', list(codes)), ('barcode', 'in', list(codes)),
+        ], ['default_code', 'barcode'])
+        result = {product.barcode: product.id for product in products if product.barcode in codes}
+        result.update({product.default_code: product.id for product in products if product.default_code})
+        return result
+
+    def _search_accounts(self, codes):
+        accounts = self.env['account.account'].with_company(self.company_id).search_fetch([
+            ('code', 'in', list(codes)),
+            ('deprecated', '=', False),
+        ], ['code'])
+        return {account.code: account.id for account in accounts}
+
+    def _get_lots(self, lot_keys):
+        """Lotes de cada (nombre, producto), los inexistentes se crean en lote"""
+        if not lot_keys:
+            return {}
+        lot_model = self.env['stock.lot']
+        lots = lot_model.search_fetch([
+            ('name', 'in', list({name for name, __ in lot_keys})),
+            ('product_id', 'in', list({product_id for __, product_id in lot_keys})),
+            ('company_id', 'in', [False, self.company_id.id]),
+        ], ['name', 'product_id'])
+        result = {(lot.name, lot.product_id.id): lot.id for lot in lots}
+        new_keys = [key for key in lot_keys if key not in result]
+        new_lots = lot_model.create([{
+            'name': name,
+            'product_id': product_id,
+            'company_id': self.company_id.id,
+        } for name, product_id in new_keys])
+        result.update(zip(new_keys, new_lots.ids))
+        return result
+
+    def _get_quants(self, keys):
+        """Quant de cada (ubicación, producto, lote), los inexistentes se crean en lote"""
+        quant_model = self.env['stock.quant'].with_company(self.company_id).with_context(inventory_mode=True)
+        quants = quant_model.search_fetch([
+            ('location_id', 'in', list({location_id for location_id, __, __ in keys})),
+            ('product_id', 'in', list({product_id for __, product_id, __ in keys})),
+        ], ['location_id', 'product_id', 'lot_id', 'package_id', 'owner_id'])
+        result = {}
+        # Se prefiere el quant sin paquete, nunca uno con propietario
+        for quant in quants.filtered(lambda q: not q.owner_id).sorted(lambda q: (bool(q.package_id), q.id)):
+            result.setdefault((quant.location_id.id, quant.product_id.id, quant.lot_id.id or False), quant.id)
+        new_keys = [key for key in keys if key not in result]
+        new_quants = quant_model.create([{
+            'location_id': location_id,
+            'product_id': product_id,
+            'lot_id': lot_id,
+        } for location_id, product_id, lot_id in new_keys])
+        result.update(zip(new_keys, new_quants.ids))
+        return result
+
+    # -------------------------------------------------------------------------
+    # Importación
+    # -------------------------------------------------------------------------
+
+    def _import_chunk(self, rows, caches, stats):
+        """Resuelve las filas del bloque, escribe los conteos y aplica el inventario"""
+        self._resolve(caches['location'], {cells['location'] for __, cells, __ in rows}, self._search_locations)
+        self._resolve(caches['product'], {cells['product'] for __, cells, __ in rows}, self._search_products)
+        self._resolve(caches['account'], {cells.get('account') for __, cells, __ in rows}, self._search_accounts)
+
+        counts = {}
+        for row_number, cells, quantity in rows:
+            location_id = caches['location'].get(cells['location'])
+            product_id = caches['product'].get(cells['product'])
+            account_id = caches['account'].get(cells.get('account')) if cells.get('account') else False
+            if not location_id:
+                stats['errors'].append((row_number, _("Location %s not found") % cells['location']))
+            elif not product_id:
+                stats['errors'].append((row_number, _("Product %s not found") % cells['product']))
+            elif cells.get('account') and not account_id:
+                stats['errors'].append((row_number, _("Account %s not found") % cells['account']))
+            else:
+                # Una fila repetida reemplaza a la anterior
+                counts[(location_id, product_id, cells.get('lot') or False)] = (quantity, account_id)
+        if not counts:
+            return
+
+        # El lote sólo se considera en productos con seguimiento
+        tracked_ids = set(self.env['product.product'].browse({product_id for __, product_id, __ in counts}).filtered(
+            lambda p: p.tracking != 'none'
+        ).ids)
+        lots = self._get_lots({
+            (lot_name, product_id) for __, product_id, lot_name in counts if lot_name and product_id in tracked_ids
+        })
+        counts = {
+            (location_id, product_id, lots.get((lot_name, product_id), False)): values
+            for (location_id, product_id, lot_name), values in counts.items()
+        }
+        quant_ids = self._get_quants(list(counts))
+
+        # Una escritura por cantidad contada y cuenta
+        quant_ids_by_values = defaultdict(list)
+        for key, values in counts.items():
+            quant_ids_by_values[values].append(quant_ids[key])
+        quant_model = self.env['stock.quant'].with_company(self.company_id).with_context(inventory_mode=True)
+        for (quantity, account_id), ids in quant_ids_by_values.items():
+            quant_model.browse(ids).write({
+                'inventory_quantity': quantity,
+                'inventory_quantity_set': True,
+                'x_adjustment_account_id': account_id,
+            })
+        quants = quant_model.browse(list(quant_ids.values()))
+        stats['counted'] += len(quants)
+
+        if self.apply_inventory:
+            quants = quants.filtered(lambda q: q.inventory_diff_quantity)
+            quants._apply_inventory()
+            stats['applied'] += len(quants)
+        self.env.flush_all()
+        self.env.invalidate_all()
+
+    def _run_import(self):
+        """Lee el archivo y lo procesa por bloques
+
+        :return: dict con contadores y los primeros errores
+        """
+        self.ensure_one()
+        if self.chunk_size <= 0:
+            raise UserError(_("The chunk size must be positive."))
+        stats = {'counted': 0, 'applied': 0, 'errors': []}
+        caches = {'location': {}, 'product': {}, 'account': {}}
+        chunk = []
+        with self._open_data_file() as stream:
+            for row_number, cells in self._iter_rows(stream):
+                try:
+                    quantity = self._parse_quantity(cells['quantity'])
+                except ValueError:
+                    stats['errors'].append((row_number, _("Invalid quantity %s") % cells['quantity']))
+                    continue
+                chunk.append((row_number, cells, quantity))
+                if len(chunk) >= self.chunk_size:
+                    self._import_chunk(chunk, caches, stats)
+                    chunk = []
+            if chunk:
+                self._import_chunk(chunk, caches, stats)
+        _logger.info(
+            "Physical count import: %s quants counted, %s applied, %s errors",
+            stats['counted'], stats['applied'], len(stats['errors']),
+        )
+        return stats
+
+    def action_import(self):
+        self.ensure_one()
+        stats = self._run_import()
+        message = _(
+            "%(counted)s quants counted, %(applied)s adjustments applied, %(errors)s rows with errors.",
+            counted=stats['counted'], applied=stats['applied'], errors=len(stats['errors']),
+        )
+        if stats['errors']:
+            message += '\n' + '\n'.join(
+                _("Row %(row)s: %(error)s", row=row, error=error)
+                for row, error in stats['errors'][:MAX_REPORTED_ERRORS]
+            )
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _("Physical Count Import"),
+                'message': message,
+                'type': 'warning' if stats['errors'] else 'success',
+                'sticky': bool(stats['errors']),
+                'next': self.env['stock.quant'].action_view_inventory(),
+            },
+        }
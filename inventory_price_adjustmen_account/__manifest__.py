@@ -2,11 +2,13 @@
     'name': 'Stock Valuation Account Adjustment',
     'version': '18.0.1.0.0',
     'category': 'Inventory/Inventory',
-    'summary': 'Adds specific account for manual standard price adjustments',
+    'summary': 'Adds specific account for manual standard price adjustments and batch inventory revaluations',
     'depends': ['stock_account'],
     'data': [
         'security/ir.model.access.csv',
+        'data/ir_cron.xml',
         'views/stock_valuation_views.xml',
+        'views/inventory_price_adjustment_views.xml',
     ],
     'installable': True,
     'application': False,
@@ -1,9 +1,341 @@
-from odoo import models, fields
+import logging
+from collections import defaultdict
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from odoo.tools import SQL, float_is_zero, split_every
+
+_logger = logging.getLogger(__name__)
+
+# Cantidad de capas de valoración creadas por lote
+LAYER_BATCH_SIZE = 1000
+
 
 class InventoryPriceAdjustment(models.Model):
     _name = 'inventory.price.adjustment'
     _description = 'Inventory Price Adjustment'
+    _order = 'adjustment_date desc, id desc'
 
     name = fields.Char(string='Name', required=True)
-    adjustment_date = fields.Date(string='Adjustment Date', required=True)
-    adjustment_amount = fields.Float(string='Adjustment Amount', required=True)
+    adjustment_date = fields.Date(string='Adjustment Date', required=True, default=fields.Date.context_today)
+    adjustment_amount = fields.Float(
+        string='Adjustment Amount',
+        readonly=True,
+        help="Total value added to (or removed from) the inventory valuation"
+    )
+    state = fields.Selection([
+        ('draft', 'Draft'),
+        ('queued', 'Queued'),
+        ('done', 'Done'),
+        ('error', 'Error'),
+    ], string='Status', default='draft', required=True, readonly=True, copy=False)
+    company_id = fields.Many2one(
+        'res.company',
+        string='Company',
+        required=True,
+        default=lambda self: self.env.company
+    )
+    error_message = fields.Text(string='Error', readonly=True, copy=False)
+    currency_id = fields.Many2one(related='company_id.currency_id')
+    method = fields.Selection([
+        ('cost', 'New Unit Cost'),
+        ('percentage', 'Percentage'),
+    ], string='Method', default='percentage', required=True)
+    new_cost = fields.Float(string='New Unit Cost', digits='Product Price')
+    percentage = fields.Float(
+        string='Percentage',
+        help="Percentage applied to the current unit cost, e.g. 25 for a 25% inflation adjustment"
+    )
+    categ_ids = fields.Many2many(
+        'product.category',
+        string='Product Categories',
+        help="Revalue all the storable products of these categories"
+    )
+    product_ids = fields.Many2many(
+        'product.product',
+        string='Products',
+        domain="[('is_storable', '=', True)]",
+        help="Revalue these products, in addition to the products of the selected categories"
+    )
+    account_id = fields.Many2one(
+        'account.account',
+        string='Counterpart Account',
+        domain="[('deprecated', '=', False)]",
+        help="Used for the categories without Manual Adjustment Valuation Account"
+    )
+    layer_ids = fields.One2many(
+        'stock.valuation.layer',
+        'price_adjustment_id',
+        string='Valuation Layers',
+        readonly=True
+    )
+    layer_count = fields.Integer(compute='_compute_layer_count')
+    account_move_ids = fields.Many2many(
+        'account.move',
+        string='Journal Entries',
+        readonly=True,
+        copy=False
+    )
+
+    @api.depends('layer_ids')
+    def _compute_layer_count(self):
+        for adjustment in self:
+            adjustment.layer_count = len(adjustment.layer_ids)
+
+    def _get_products(self):
+        self.ensure_one()
+        domain = [('is_storable', '=', True)]
+        if self.categ_ids:
+            domain = ['&'] + domain + ['|', ('categ_id', 'child_of', self.categ_ids.ids), ('id', 'in', self.product_ids.ids)]
+        else:
+            domain += [('id', 'in', self.product_ids.ids)]
+        return self.env['product.product'].with_company(self.company_id).search(domain)
+
+    def _get_new_unit_cost(self, unit_cost):
+        self.ensure_one()
+        if self.method == 'cost':
+            return self.new_cost
+        return unit_cost * (1 + self.percentage / 100)
+
+    def _compute_deltas(self, products):
+        """Diferencia de valor de cada producto, calculada en una sola pasada
+        con una consulta agrupada sobre las capas de valoración.
+
+        :return: dict {product: (nuevo costo unitario, cantidad, diferencia de valor)}
+        """
+        self.ensure_one()
+        currency = self.company_id.currency_id
+        valuation = {
+            product: (quantity, value)
+            for product, quantity, value in self.env['stock.valuation.layer'].sudo()._read_group(
+                [('product_id', 'in', products.ids), ('company_id', '=', self.company_id.id)],
+                ['product_id'],
+                ['quantity:sum', 'value:sum'],
+            )
+        }
+        deltas = {}
+        for product in products:
+            quantity, value = valuation.get(product, (0.0, 0.0))
+            if float_is_zero(quantity, precision_rounding=product.uom_id.rounding) or quantity < 0:
+                unit_cost = product.standard_price
+                quantity = 0.0
+            else:
+                unit_cost = value / quantity
+            new_cost = self._get_new_unit_cost(unit_cost)
+            delta = currency.round(new_cost * quantity - value) if quantity else 0.0
+            deltas[product] = (new_cost, quantity, delta)
+        return deltas
+
+    def _update_remaining_values(self, deltas):
+        """Reparte la diferencia en el valor remanente de las capas FIFO/AVCO,
+        para todos los productos con una única actualización"""
+        self.ensure_one()
+        product_ids, values = [], []
+        for product, (__, __, delta) in deltas.items():
+            if delta and product.cost_method in ('average', 'fifo'):
+                product_ids.append(product.id)
+                values.append(delta)
+        if not product_ids:
+            return
+        svl_model = self.env['stock.valuation.layer']
+        svl_model.flush_model(['remaining_qty', 'remaining_value'])
+        self.env.cr.execute(SQL(
+            """
+            WITH delta AS (
+                SELECT * FROM unnest(%s::int[], %s::numeric[]) AS d(product_id, value)
+            ), remaining AS (
+                SELECT svl.product_id, SUM(svl.remaining_qty) AS qty
+                  FROM stock_valuation_layer svl
+                  JOIN delta ON delta.product_id = svl.product_id
+                 WHERE svl.company_id = %s AND svl.remaining_qty > 0
+              GROUP BY svl.product_id
+            )
+            UPDATE stock_valuation_layer svl
+               SET remaining_value = svl.remaining_value + delta.value * svl.remaining_qty / remaining.qty
+              FROM delta
+              JOIN remaining ON remaining.product_id = delta.product_id
+             WHERE svl.product_id = delta.product_id
+               AND svl.company_id = %s
+               AND svl.remaining_qty > 0
+            """,
+            product_ids, values, self.company_id.id, self.company_id.id,
+        ))
+        svl_model.invalidate_model(['remaining_value'])
+
+    def _update_standard_prices(self, deltas):
+        """Actualiza el costo de los productos, con una escritura por costo"""
+        self.ensure_one()
+        products_by_cost = defaultdict(list)
+        for product, (new_cost, __, __) in deltas.items():
+            products_by_cost[new_cost].append(product.id)
+        for new_cost, product_ids in products_by_cost.items():
+            # disable_auto_svl: las capas de valoración ya fueron creadas por el ajuste
+            self.env['product.product'].browse(product_ids).with_company(self.company_id).with_context(
+                disable_auto_svl=True,
+            ).write({'standard_price': new_cost})
+
+    def _get_counterpart_account(self, category):
+        return category.with_company(self.company_id).property_stock_valuation_manual_adjustment_account_id or self.account_id
+
+    def _get_category_accounts(self, category):
+        """Diario, cuenta de valoración y contrapartida de la categoría"""
+        self.ensure_one()
+        category = category.with_company(self.company_id)
+        journal = category.property_stock_journal
+        valuation_account = category.property_stock_valuation_account_id
+        counterpart = self._get_counterpart_account(category)
+        if not journal or not valuation_account:
+            raise UserError(_(
+                "Set a Stock Journal and a Stock Valuation Account on the category %s."
+            ) % category.display_name)
+        if not counterpart:
+            raise UserError(_(
+                "Set a Manual Adjustment Valuation Account on the category %s or a Counterpart Account on the adjustment."
+            ) % category.display_name)
+        return journal, valuation_account, counterpart
+
+    def _create_account_moves(self, layers):
+        """Un asiento consolidado por diario y par de cuentas (valoración / contrapartida)"""
+        self.ensure_one()
+        accounts_by_category = {}
+        layer_ids_by_key = defaultdict(list)
+        value_by_key = defaultdict(float)
+        for layer in layers:
+            category = layer.product_id.categ_id
+            if category not in accounts_by_category:
+                if category.with_company(self.company_id).property_valuation != 'real_time':
+                    accounts_by_category[category] = None
+                else:
+                    accounts_by_category[category] = self._get_category_accounts(category)
+            key = accounts_by_category[category]
+            if key:
+                layer_ids_by_key[key].append(layer.id)
+                value_by_key[key] += layer.value
+
+        move_vals_list, move_layer_ids = [], []
+        for (journal, valuation_account, counterpart), layer_ids in layer_ids_by_key.items():
+            value = self.company_id.currency_id.round(value_by_key[(journal, valuation_account, counterpart)])
+            if self.company_id.currency_id.is_zero(value):
+                continue
+            move_layer_ids.append(layer_ids)
+            label = _('%(name)s - Revaluation of %(count)s product(s)', name=self.name, count=len(layer_ids))
+            move_vals_list.append({
+                'journal_id': journal.id,
+                'company_id': self.company_id.id,
+                'date': self.adjustment_date,
+                'ref': self.name,
+                'move_type': 'entry',
+                'line_ids': [
+                    (0, 0, {
+                        'name': label,
+                        'account_id': valuation_account.id,
+                        'debit': value if value > 0 else 0,
+                        'credit': -value if value < 0 else 0,
+                    }),
+                    (0, 0, {
+                        'name': label,
+                        'account_id': counterpart.id,
+                        'debit': -value if value < 0 else 0,
+                        'credit': value if value > 0 else 0,
+                    }),
+                ],
+            })
+        moves = self.env['account.move'].sudo().create(move_vals_list)
+        moves._post()
+        for move, layer_ids in zip(moves, move_layer_ids):
+            layers.browse(layer_ids).write({'account_move_id': move.id})
+        return moves
+
+    def _process(self):
+        """Revalúa todos los productos del ajuste: capas de valoración,
+        valores remanentes, costos y asientos consolidados"""
+        for adjustment in self:
+            if adjustment.state == 'done':
+                continue
+            products = adjustment._get_products()
+            deltas = adjustment._compute_deltas(products)
+            layer_vals_list = [{
+                'company_id': adjustment.company_id.id,
+                'product_id': product.id,
+                'description': _('%(name)s: unit cost %(old)s -> %(new)s', name=adjustment.name,
+                                 old=adjustment.currency_id.round(product.standard_price), new=new_cost),
+                'value': delta,
+                'quantity': 0,
+                'price_adjustment_id': adjustment.id,
+            } for product, (new_cost, __, delta) in deltas.items() if delta]
+            layer_ids = []
+            for vals_list in split_every(LAYER_BATCH_SIZE, layer_vals_list):
+                layer_ids += self.env['stock.valuation.layer'].sudo().create(list(vals_list)).ids
+            adjustment._update_remaining_values(deltas)
+            adjustment._update_standard_prices(deltas)
+            moves = adjustment._create_account_moves(self.env['stock.valuation.layer'].sudo().browse(layer_ids))
+            adjustment.write({
+                'state': 'done',
+                'adjustment_amount': sum(delta for __, __, delta in deltas.values()),
+                'account_move_ids': [(6, 0, moves.ids)],
+                'error_message': False,
+            })
+
+    def _check_can_process(self):
+        for adjustment in self:
+            if adjustment.state != 'draft':
+                raise UserError(_("Only draft adjustments can be applied."))
+            if not adjustment.categ_ids and not adjustment.product_ids:
+                raise UserError(_("Select the products or product categories to revalue."))
+            if adjustment.method == 'cost' and adjustment.new_cost < 0:
+                raise UserError(_("The new unit cost cannot be negative."))
+            if adjustment.method == 'percentage' and adjustment.percentage <= -100:
+                raise UserError(_("The percentage must be greater than -100."))
+            # Diarios y cuentas de las categorías con valoración automática
+            for category in adjustment._get_products().categ_id:
+                if category.with_company(adjustment.company_id).property_valuation == 'real_time':
+                    adjustment._get_category_accounts(category)
+
+    def action_apply(self):
+        self._check_can_process()
+        self._process()
+        return True
+
+    def action_queue(self):
+        """Aplica el ajuste en segundo plano"""
+        self._check_can_process()
+        self.write({'state': 'queued', 'error_message': False})
+        self.env.ref('inventory_price_adjustmen_account.ir_cron_process_price_adjustments')._trigger()
+        return True
+
+    def action_draft(self):
+        self.filtered(lambda a: a.state == 'error').write({'state': 'draft'})
+        return True
+
+    @api.model
+    def _cron_process_adjustments(self):
+        for adjustment in self.search([('state', '=', 'queued')], order='id'):
+            try:
+                with self.env.cr.savepoint():
+                    adjustment.with_company(adjustment.company_id)._process()
+            except Exception as e:
+                # Un ajuste con error no bloquea los siguientes
+                _logger.warning("Error processing inventory price adjustment %s: %s", adjustment.name, e)
+                self.env.invalidate_all()
+                adjustment.write({'state': 'error', 'error_message': str(e)})
+            self.env.cr.commit()
+
+    def action_view_account_moves(self):
+        self.ensure_one()
+        return {
+            'name': _('Journal Entries'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'account.move',
+            'view_mode': 'list,form',
+            'domain': [('id', 'in', self.account_move_ids.ids)],
+        }
+
+    def action_view_layers(self):
+        self.ensure_one()
+        return {
+            'name': _('Valuation Layers'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'stock.valuation.layer',
+            'view_mode': 'list,form',
+            'domain': [('price_adjustment_id', '=', self.id)],
+        }
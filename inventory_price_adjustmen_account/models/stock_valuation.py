@@ -60,3 +60,15 @@ class ProductCategory(models.Model):
         domain="[('deprecated', '=', False)]",
         help="This account will be used for manual standard price adjustments"
     )
+
+
+class StockValuationLayer(models.Model):
+    _inherit = 'stock.valuation.layer'
+
+    price_adjustment_id = fields.Many2one(
+        'inventory.price.adjustment',
+        string='Price Adjustment',
+        index='btree_not_null',
+        readonly=True,
+        ondelete='restrict'
+    )
@@ -1,2 +1,3 @@
 from . import account_journal
-from . import account_move
\ No newline at end of file
+from . import account_move
+from . import res_partner
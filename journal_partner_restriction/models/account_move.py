@@ -1,62 +1,17 @@
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError
 
+# Context value deferring the partner restriction during load(). It is checked
+# by identity, so it cannot be passed in the context of an RPC call.
+_DEFER_RESTRICTION = object()
+
 
 class AccountMove(models.Model):
     _inherit = 'account.move'
 
-    @api.depends('journal_id', 'move_type')
-    def _compute_allowed_partner_ids(self):
-        """Compute allowed partners based on journal restrictions"""
-        for move in self:
-            allowed_partners = self.env['res.partner']
-            
-            # Debug info
-            _logger = self.env.context.get('debug_partner_restriction', False)
-            if _logger:
-                print(f"Computing for move {move.id}: journal={move.journal_id.name if move.journal_id else 'None'}, restrict={move.journal_id.restrict_partners if move.journal_id else False}")
-            
-            if move.journal_id and move.journal_id.restrict_partners:
-                if move.journal_id.allowed_partner_ids:
-                    allowed_partners = move.journal_id.allowed_partner_ids
-                    
-                    # Filter by customer/supplier based on move type
-                    if move.move_type in ('out_invoice', 'out_refund'):
-                        allowed_partners = allowed_partners.filtered(lambda p: p.customer_rank > 0)
-                    elif move.move_type in ('in_invoice', 'in_refund'):
-                        allowed_partners = allowed_partners.filtered(lambda p: p.supplier_rank > 0)
-                    
-                    if _logger:
-                        print(f"Restricted partners: {[p.name for p in allowed_partners]}")
-                else:
-                    # No partners configured, empty set
-                    allowed_partners = self.env['res.partner']
-                    if _logger:
-                        print("No partners configured for restricted journal")
-            else:
-                # No restrictions - limit the search for better performance
-                domain = []
-                limit = 1000  # Reasonable limit
-                
-                if move.move_type in ('out_invoice', 'out_refund'):
-                    domain = [('customer_rank', '>', 0)]
-                elif move.move_type in ('in_invoice', 'in_refund'):
-                    domain = [('supplier_rank', '>', 0)]
-                else:
-                    domain = ['|', ('customer_rank', '>', 0), ('supplier_rank', '>', 0)]
-                
-                allowed_partners = self.env['res.partner'].search(domain, limit=limit)
-                
-                if _logger:
-                    print(f"No restrictions, found {len(allowed_partners)} partners")
-            
-            move.allowed_partner_ids = allowed_partners
-
-    allowed_partner_ids = fields.Many2many(
-        'res.partner',
-        string='Allowed Partners',
-        compute='_compute_allowed_partner_ids',
-        store=False
+    journal_restrict_partners = fields.Boolean(
+        related='journal_id.restrict_partners',
+        string='Journal Restricts Partners'
     )
 
     @api.onchange('journal_id')
@@ -153,35 +108,75 @@ class AccountMove(models.Model):
 
     @api.constrains('partner_id', 'journal_id')
     def _check_partner_journal_restriction(self):
-        """Validate that partner is allowed for the journal"""
-        for move in self:
-            if (move.journal_id and move.journal_id.restrict_partners and 
-                move.partner_id and move.journal_id.allowed_partner_ids):
-                if move.partner_id.id not in move.journal_id.allowed_partner_ids.ids:
-                    raise ValidationError(
-                        f'The partner "{move.partner_id.name}" is not allowed for journal "{move.journal_id.name}". '
-                        f'Please select a partner from the allowed list or update the journal configuration.'
-                    )
-    def _onchange_partner_id_check_restriction(self):
-        """Check if selected partner is allowed for the journal"""
-        if (self.journal_id and self.journal_id.restrict_partners and 
-            self.partner_id and self.journal_id.allowed_partner_ids):
-            if self.partner_id.id not in self.journal_id.allowed_partner_ids.ids:
-                return {
-                    'warning': {
-                        'title': 'Partner Not Allowed',
-                        'message': f'The partner "{self.partner_id.name}" is not allowed for journal "{self.journal_id.name}". Please select a different partner.'
-                    }
-                }
+        """Validate that partner is allowed for the journal.
 
-    @api.constrains('partner_id', 'journal_id')
-    def _check_partner_journal_restriction(self):
-        """Validate that partner is allowed for the journal"""
-        for move in self:
-            if (move.journal_id and move.journal_id.restrict_partners and 
-                move.partner_id and move.journal_id.allowed_partner_ids):
-                if move.partner_id.id not in move.journal_id.allowed_partner_ids.ids:
-                    raise ValidationError(
-                        f'The partner "{move.partner_id.name}" is not allowed for journal "{move.journal_id.name}". '
-                        f'Please select a partner from the allowed list or update the journal configuration.'
-                    )
\ No newline at end of file
+        Checks the whole recordset (e.g. imported moves) with a single query
+        and reports all the violations in one error. The check is skipped
+        while ``load()`` imports the moves, as it runs it once at the end.
+        """
+        if self.env.context.get('defer_partner_journal_restriction') is _DEFER_RESTRICTION:
+            return
+        violations = self._get_partner_journal_restriction_violations()
+        if violations:
+            raise ValidationError(violations._get_partner_journal_restriction_message())
+
+    def _get_partner_journal_restriction_violations(self):
+        """Return the moves whose partner is not allowed for their journal"""
+        moves = self.filtered(lambda m: m.partner_id and m.journal_id.restrict_partners)
+        if not moves:
+            return self.browse()
+        moves.flush_recordset(['partner_id', 'journal_id'])
+        self.env['account.journal'].flush_model(['allowed_partner_ids'])
+        self.env.cr.execute("""
+            SELECT move.id
+              FROM account_move move
+             WHERE move.id IN %s
+               AND EXISTS (SELECT 1 FROM journal_partner_rel rel
+                            WHERE rel.journal_id = move.journal_id)
+               AND NOT EXISTS (SELECT 1 FROM journal_partner_rel rel
+                                WHERE rel.journal_id = move.journal_id
+                                  AND rel.partner_id = move.partner_id)
+          ORDER BY move.id
+        """, [tuple(moves.ids)])
+        return self.browse([row[0] for row in self.env.cr.fetchall()])
+
+    def _get_partner_journal_restriction_message(self, max_lines=20):
+        """Single error message listing the given violating moves"""
+        if len(self) == 1:
+            return (
+                f'The partner "{self.partner_id.name}" is not allowed for journal "{self.journal_id.name}". '
+                f'Please select a partner from the allowed list or update the journal configuration.'
+            )
+        lines = [
+            f'- {move.display_name}: '
+            f'partner "{move.partner_id.name}" is not allowed for journal "{move.journal_id.name}"'
+            for move in self[:max_lines]
+        ]
+        if len(self) > max_lines:
+            lines.append(f'- ... and {len(self) - max_lines} more')
+        return (
+            f'{len(self)} entries use partners that are not allowed for their journal:\n'
+            + '\n'.join(lines)
+            + '\nPlease select partners from the allowed lists or update the journal configuration.'
+        )
+
+    @api.model
+    def load(self, fields, data):
+        """Validate partner restrictions once for the whole import"""
+        try:
+            with self.env.cr.savepoint():
+                result = super(AccountMove, self.with_context(defer_partner_journal_restriction=_DEFER_RESTRICTION)).load(fields, data)
+                violations = self.browse(result.get('ids') or [])._get_partner_journal_restriction_violations()
+                if violations:
+                    raise ValidationError(violations._get_partner_journal_restriction_message())
+        except ValidationError as e:
+            return {
+                'ids': False,
+                'messages': [{
+                    'type': 'error',
+                    'message': str(e),
+                    'record': False,
+                    'rows': {'from': 0, 'to': len(data) - 1},
+                }],
+            }
+        return result
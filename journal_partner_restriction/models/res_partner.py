@@ -0,0 +1,17 @@
+from odoo import models, fields
+
+
+class ResPartner(models.Model):
+    _inherit = 'res.partner'
+
+    # Inverse side of account.journal.allowed_partner_ids, on the same relation
+    # table. Searching on it is translated to an EXISTS on journal_partner_rel,
+    # which is indexed on (partner_id, journal_id).
+    allowed_journal_ids = fields.Many2many(
+        'account.journal',
+        'journal_partner_rel',
+        'partner_id',
+        'journal_id',
+        string='Restricted Journals',
+        help='Journals with partner restrictions where this partner is allowed'
+    )
@@ -37,6 +37,10 @@ Features:
 * Direct integration with Odoo's native payment forms for local currency
 * Only visible on bank and cash journals
 * Pre-filled forms with appropriate context
+* Treasury sweep / cash pooling:
+  - Zero-balance or threshold rules across bank and cash journals
+  - Dry-run report before executing the transfers
+  - Optional daily scheduled execution as one batch of internal transfers
     """,
     "data": [
         "security/security.xml",
@@ -44,6 +48,8 @@ Features:
         "views/currency_exchange_wizard_views.xml",
         "views/internal_transfer_wizard_views.xml",
         "views/account_journal_views.xml",
+        "views/treasury_sweep_views.xml",
+        "data/ir_cron.xml",
     ],
     "installable": True,
     "auto_install": False,
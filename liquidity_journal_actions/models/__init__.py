@@ -1 +1,2 @@
-from . import account_journal
\ No newline at end of file
+from . import account_journal
+from . import treasury_sweep_rule
\ No newline at end of file
@@ -0,0 +1,289 @@
+import logging
+from collections import defaultdict
+
+from odoo import models, fields, api, _
+from odoo.exceptions import ValidationError
+
+_logger = logging.getLogger(__name__)
+
+
+class TreasurySweepRule(models.Model):
+    _name = 'treasury.sweep.rule'
+    _description = 'Regla de concentración de fondos entre diarios de liquidez'
+    _check_company_auto = True
+
+    name = fields.Char(
+        string='Nombre',
+        required=True
+    )
+
+    active = fields.Boolean(default=True)
+
+    company_id = fields.Many2one(
+        'res.company',
+        string='Empresa',
+        required=True,
+        default=lambda self: self.env.company
+    )
+
+    concentration_journal_id = fields.Many2one(
+        'account.journal',
+        string='Diario Concentrador',
+        required=True,
+        check_company=True,
+        domain="[('type', 'in', ('bank', 'cash'))]",
+        help="Diario que recibe los excedentes y financia los faltantes de los diarios participantes"
+    )
+
+    currency_id = fields.Many2one(
+        'res.currency',
+        string='Moneda',
+        compute='_compute_currency_id'
+    )
+
+    sweep_mode = fields.Selection([
+        ('zero_balance', 'Saldo objetivo'),
+        ('threshold', 'Por umbrales'),
+    ], string='Modo', required=True, default='zero_balance',
+       help="Saldo objetivo: cada diario se lleva siempre a su saldo objetivo.\n"
+            "Por umbrales: sólo se transfiere cuando el saldo queda fuera del rango mínimo/máximo, "
+            "y entonces se lleva al saldo objetivo.")
+
+    line_ids = fields.One2many(
+        'treasury.sweep.rule.line',
+        'rule_id',
+        string='Diarios Participantes',
+        copy=True
+    )
+
+    auto_execute = fields.Boolean(
+        string='Ejecución Automática',
+        help="Ejecutar la concentración diariamente desde la acción planificada"
+    )
+
+    memo = fields.Char(
+        string='Descripción',
+        default='Concentración de fondos'
+    )
+
+    @api.depends('concentration_journal_id')
+    def _compute_currency_id(self):
+        for rule in self:
+            rule.currency_id = rule.concentration_journal_id.currency_id or rule.company_id.currency_id
+
+    @api.constrains('concentration_journal_id', 'line_ids')
+    def _check_journals(self):
+        for rule in self:
+            journals = rule.line_ids.journal_id
+            if rule.concentration_journal_id in journals:
+                raise ValidationError(_('El diario concentrador no puede ser un diario participante.'))
+            if len(journals) != len(rule.line_ids):
+                raise ValidationError(_('Cada diario sólo puede participar una vez en la regla.'))
+            if any((journal.currency_id or journal.company_id.currency_id) != rule.currency_id
+                   for journal in journals):
+                raise ValidationError(_(
+                    'Todos los diarios participantes deben estar en la moneda del diario concentrador (%s).'
+                ) % rule.currency_id.name)
+
+    @api.constrains('sweep_mode', 'line_ids')
+    def _check_line_thresholds(self):
+        self.line_ids._check_thresholds()
+
+    @api.model
+    def _get_journal_balances(self, journals, date):
+        """Saldo contable de cada diario a la fecha, con una sola consulta agrupada
+        sobre las cuentas por defecto de todos los diarios.
+
+        Se suman también las líneas no conciliadas de las cuentas de pagos/cobros
+        pendientes de cada diario: las transferencias internas publicadas mueven el
+        saldo del diario aunque el extracto todavía no se haya conciliado. Las líneas
+        de extracto importadas y aún no conciliadas se descuentan con su contrapartida
+        en la cuenta transitoria, para no contar dos veces la misma transferencia.
+        """
+        accounts = journals.default_account_id
+        if not accounts:
+            return {}
+        outstanding_accounts = {
+            journal: journal._get_journal_inbound_outstanding_payment_accounts()
+            | journal._get_journal_outbound_outstanding_payment_accounts()
+            | journal.suspense_account_id
+            for journal in journals
+        }
+        self.env['account.move.line'].flush_model()
+        totals = {
+            account: (balance, amount_currency)
+            for account, balance, amount_currency in self.env['account.move.line']._read_group(
+                [
+                    ('account_id', 'in', accounts.ids),
+                    ('parent_state', '=', 'posted'),
+                    ('date', '<=', date),
+                ],
+                ['account_id'],
+                ['balance:sum', 'amount_currency:sum'],
+            )
+        }
+        outstanding_totals = defaultdict(lambda: [0.0, 0.0])
+        for journal, account, balance, amount_currency in self.env['account.move.line']._read_group(
+            [
+                ('journal_id', 'in', journals.ids),
+                ('account_id', 'in', [account.id for accs in outstanding_accounts.values() for account in accs]),
+                ('reconciled', '=', False),
+                ('parent_state', '=', 'posted'),
+                ('date', '<=', date),
+            ],
+            ['journal_id', 'account_id'],
+            ['balance:sum', 'amount_currency:sum'],
+        ):
+            if account in outstanding_accounts[journal]:
+                outstanding_totals[journal][0] += balance
+                outstanding_totals[journal][1] += amount_currency
+        balances = {}
+        for journal in journals:
+            balance, amount_currency = totals.get(journal.default_account_id, (0.0, 0.0))
+            outstanding_balance, outstanding_amount_currency = outstanding_totals[journal]
+            foreign = journal.currency_id and journal.currency_id != journal.company_id.currency_id
+            if foreign:
+                balances[journal] = amount_currency + outstanding_amount_currency
+            else:
+                balances[journal] = balance + outstanding_balance
+        return balances
+
+    def _compute_sweep_transfers(self, date=None):
+        """Transferencias necesarias para llevar cada diario participante a su saldo objetivo.
+
+        Devuelve una lista de diccionarios, uno por diario participante (se incluyen
+        también los que no requieren transferencia, para el reporte de simulación).
+        Los saldos de todas las reglas se leen con una única consulta.
+        """
+        date = date or fields.Date.context_today(self)
+        balances = self._get_journal_balances(
+            self.line_ids.journal_id | self.concentration_journal_id, date
+        )
+        transfers = []
+        for rule in self:
+            currency = rule.currency_id
+            concentration_balance = balances.get(rule.concentration_journal_id, 0.0)
+            for line in rule.line_ids:
+                balance = balances.get(line.journal_id, 0.0)
+                difference = 0.0
+                if rule.sweep_mode == 'zero_balance' or not (line.min_balance <= balance <= line.max_balance):
+                    difference = currency.round(balance - line.target_balance)
+                concentration_balance += difference
+                transfers.append({
+                    'rule_id': rule.id,
+                    'journal_id': line.journal_id.id,
+                    'concentration_journal_id': rule.concentration_journal_id.id,
+                    'currency_id': currency.id,
+                    'balance': balance,
+                    'target_balance': line.target_balance,
+                    # Positivo: excedente hacia el concentrador. Negativo: fondeo desde el concentrador.
+                    'amount': difference,
+                    'concentration_balance': concentration_balance,
+                })
+        return transfers
+
+    @api.model
+    def _execute_sweep_transfers(self, transfers, date=None):
+        """Crear y publicar todas las transferencias internas en un solo lote"""
+        date = date or fields.Date.context_today(self)
+        rules = self.browse({transfer['rule_id'] for transfer in transfers})
+        vals_list = []
+        for transfer in transfers:
+            currency = self.env['res.currency'].browse(transfer['currency_id'])
+            if currency.is_zero(transfer['amount']):
+                continue
+            rule = rules.browse(transfer['rule_id'])
+            source, destination = transfer['journal_id'], transfer['concentration_journal_id']
+            if transfer['amount'] < 0:
+                source, destination = destination, source
+            vals_list.append({
+                'payment_type': 'outbound',
+                'journal_id': source,
+                'destination_journal_id': destination,
+                'amount': abs(transfer['amount']),
+                'currency_id': currency.id,
+                'date': date,
+                'memo': rule.memo or rule.name,
+                'is_internal_transfer': True,
+                'partner_id': False,
+            })
+        payments = self.env['account.payment'].create(vals_list)
+        payments.action_post()
+        return payments
+
+    def action_run_sweep(self, date=None):
+        """Calcular y ejecutar la concentración de las reglas"""
+        return self._execute_sweep_transfers(self._compute_sweep_transfers(date), date)
+
+    def action_preview_sweep(self):
+        """Abrir el reporte de simulación (sin generar movimientos)"""
+        wizard = self.env['treasury.sweep.wizard'].create({'rule_ids': [(6, 0, self.ids)]})
+        wizard.action_compute()
+        return {
+            'name': _('Simulación de Concentración'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'treasury.sweep.wizard',
+            'res_id': wizard.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+    @api.model
+    def _cron_run_sweeps(self):
+        """Acción planificada: ejecutar las reglas con ejecución automática, por empresa"""
+        rules = self.search([('auto_execute', '=', True)])
+        for company, company_rules in rules.grouped('company_id').items():
+            try:
+                with self.env.cr.savepoint():
+                    company_rules.with_company(company).action_run_sweep()
+            except Exception as e:
+                _logger.warning("Error en la concentración de fondos de %s: %s", company.name, e)
+
+
+class TreasurySweepRuleLine(models.Model):
+    _name = 'treasury.sweep.rule.line'
+    _description = 'Diario participante de una regla de concentración'
+
+    rule_id = fields.Many2one(
+        'treasury.sweep.rule',
+        string='Regla',
+        required=True,
+        ondelete='cascade'
+    )
+
+    journal_id = fields.Many2one(
+        'account.journal',
+        string='Diario',
+        required=True,
+        domain="[('type', 'in', ('bank', 'cash'))]"
+    )
+
+    currency_id = fields.Many2one(
+        related='rule_id.currency_id'
+    )
+
+    target_balance = fields.Monetary(
+        string='Saldo Objetivo',
+        currency_field='currency_id',
+        help="Saldo que debe quedar en el diario después de la concentración"
+    )
+
+    min_balance = fields.Monetary(
+        string='Saldo Mínimo',
+        currency_field='currency_id',
+        help="Sólo en modo por umbrales: por debajo de este saldo se fondea el diario"
+    )
+
+    max_balance = fields.Monetary(
+        string='Saldo Máximo',
+        currency_field='currency_id',
+        help="Sólo en modo por umbrales: por encima de este saldo se transfiere el excedente"
+    )
+
+    @api.constrains('target_balance', 'min_balance', 'max_balance', 'rule_id')
+    def _check_thresholds(self):
+        for line in self.filtered(lambda l: l.rule_id.sweep_mode == 'threshold'):
+            if not line.min_balance <= line.target_balance <= line.max_balance:
+                raise ValidationError(_(
+                    'El saldo objetivo de %s debe estar entre el saldo mínimo y el máximo.'
+                ) % line.journal_id.name)
@@ -0,0 +1 @@
+from . import test_treasury_sweep
@@ -0,0 +1,70 @@
+from odoo import Command, fields
+from odoo.exceptions import ValidationError
+from odoo.tests import tagged
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+
+@tagged('post_install', '-at_install')
+class TestTreasurySweep(AccountTestInvoicingCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.concentration_journal = cls.company_data['default_journal_bank']
+        cls.participant_journal = cls.env['account.journal'].create({
+            'name': 'Banco Participante',
+            'code': 'BPART',
+            'type': 'bank',
+        })
+        cls.rule = cls.env['treasury.sweep.rule'].create({
+            'name': 'Concentración',
+            'concentration_journal_id': cls.concentration_journal.id,
+            'line_ids': [Command.create({'journal_id': cls.participant_journal.id})],
+        })
+        funding = cls.env['account.move'].create({
+            'move_type': 'entry',
+            'journal_id': cls.company_data['default_journal_misc'].id,
+            'date': fields.Date.today(),
+            'line_ids': [
+                Command.create({
+                    'name': 'Fondeo',
+                    'account_id': cls.participant_journal.default_account_id.id,
+                    'debit': 1000.0,
+                }),
+                Command.create({
+                    'name': 'Fondeo',
+                    'account_id': cls.company_data['default_account_revenue'].id,
+                    'credit': 1000.0,
+                }),
+            ],
+        })
+        funding.action_post()
+
+    def test_sweep_twice_creates_no_second_transfer(self):
+        payments = self.rule.action_run_sweep()
+        self.assertEqual(len(payments), 1)
+        self.assertEqual(payments.amount, 1000.0)
+        self.assertEqual(payments.journal_id, self.participant_journal)
+
+        # Las transferencias publicadas pero no conciliadas ya cuentan en el saldo
+        self.assertFalse(self.rule.action_run_sweep())
+
+    def test_sweep_with_unreconciled_statement_line(self):
+        payment = self.rule.action_run_sweep()
+        # Extracto importado con la transferencia, todavía sin conciliar
+        self.env['account.bank.statement.line'].create({
+            'journal_id': self.participant_journal.id,
+            'date': fields.Date.today(),
+            'payment_ref': payment.name,
+            'amount': -1000.0,
+        })
+        balances = self.rule._get_journal_balances(self.participant_journal, fields.Date.today())
+        self.assertAlmostEqual(balances[self.participant_journal], 0.0)
+        self.assertFalse(self.rule.action_run_sweep())
+
+    def test_threshold_mode_checks_existing_lines(self):
+        self.rule.line_ids.write({'target_balance': 500.0, 'min_balance': 0.0, 'max_balance': 100.0})
+        with self.assertRaises(ValidationError):
+            self.rule.sweep_mode = 'threshold'
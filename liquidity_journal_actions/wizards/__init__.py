@@ -1,2 +1,3 @@
 from . import currency_exchange_wizard
-from . import internal_transfer_wizard
\ No newline at end of file
+from . import internal_transfer_wizard
+from . import treasury_sweep_wizard
\ No newline at end of file
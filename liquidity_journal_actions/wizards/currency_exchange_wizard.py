@@ -80,7 +80,7 @@ class CurrencyExchangeWizard(models.TransientModel):
         if self.journal_id and self.journal_id.currency_id:
             self.foreign_currency_id = self.journal_id.currency_id
             # Obtener tipo de cambio actual
-            rate = self.foreign_currency_id._get_conversion_rate(
+            rate = self.env['res.currency']._get_cached_conversion_rate(
                 from_currency=self.foreign_currency_id,
                 to_currency=self.company_currency_id,
                 company=self.env.company,
@@ -172,8 +172,6 @@ class InternalTransferWizard(models.TransientModel):
         """Compute available currencies for transfer"""
         for wizard in self:
             company_currency = wizard.env.company.currency_id
-            currencies = wizard.env['res.currency'].search([])
-            
             if wizard.source_journal_id and wizard.destination_journal_id:
                 source_curr = wizard.source_currency_id or company_currency
                 dest_curr = wizard.destination_currency_id or company_currency
@@ -183,7 +181,7 @@ class InternalTransferWizard(models.TransientModel):
                 
                 wizard.available_currency_ids = available_currencies
             else:
-                wizard.available_currency_ids = currencies
+                wizard.available_currency_ids = wizard.env['res.currency']._get_active_currencies()
     
     @api.depends('transfer_currency_id', 'source_journal_id', 'destination_journal_id')
     def _compute_transfer_type_description(self):
@@ -245,7 +243,7 @@ class InternalTransferWizard(models.TransientModel):
             source_curr = self.source_currency_id or company_currency
             
             if source_curr != company_currency:
-                rate = source_curr._get_conversion_rate(
+                rate = self.env['res.currency']._get_cached_conversion_rate(
                     source_curr,
                     company_currency,
                     self.env.company,
@@ -286,7 +284,7 @@ class InternalTransferWizard(models.TransientModel):
             company_currency = self.env.company.currency_id
             
             if self.transfer_currency_id != company_currency:
-                rate = self.transfer_currency_id._get_conversion_rate(
+                rate = self.env['res.currency']._get_cached_conversion_rate(
                     self.transfer_currency_id,
                     company_currency,
                     self.env.company,
@@ -388,7 +386,7 @@ class InternalTransferWizard(models.TransientModel):
                     rate = self.exchange_rate
                     _logger.info(f"Usando tipo de cambio del formulario: {rate}")
                 else:
-                    rate = source_currency._get_conversion_rate(
+                    rate = self.env['res.currency']._get_cached_conversion_rate(
                         source_currency,
                         company_currency,
                         self.env.company,
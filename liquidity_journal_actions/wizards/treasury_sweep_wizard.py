@@ -0,0 +1,128 @@
+from odoo import models, fields, _
+from odoo.exceptions import ValidationError
+
+
+class TreasurySweepWizard(models.TransientModel):
+    _name = 'treasury.sweep.wizard'
+    _description = 'Simulación y ejecución de la concentración de fondos'
+
+    rule_ids = fields.Many2many(
+        'treasury.sweep.rule',
+        string='Reglas',
+        required=True
+    )
+
+    date = fields.Date(
+        string='Fecha',
+        required=True,
+        default=fields.Date.context_today
+    )
+
+    line_ids = fields.One2many(
+        'treasury.sweep.wizard.line',
+        'wizard_id',
+        string='Transferencias Propuestas',
+        readonly=True
+    )
+
+    def action_compute(self):
+        """Simulación: calcular las transferencias sin generar movimientos"""
+        self.ensure_one()
+        self.line_ids = [(5, 0, 0)] + [
+            (0, 0, transfer) for transfer in self.rule_ids._compute_sweep_transfers(self.date)
+        ]
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+    def action_execute(self):
+        """Ejecutar las transferencias simuladas en un solo lote"""
+        self.ensure_one()
+        if all(line.currency_id.is_zero(line.amount) for line in self.line_ids):
+            raise ValidationError(_('No hay transferencias para ejecutar.'))
+        payments = self.env['treasury.sweep.rule']._execute_sweep_transfers(
+            [line._get_transfer() for line in self.line_ids], self.date
+        )
+        return {
+            'name': _('Transferencias de Concentración'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'account.payment',
+            'domain': [('id', 'in', payments.ids)],
+            'view_mode': 'list,form',
+            'target': 'current',
+        }
+
+
+class TreasurySweepWizardLine(models.TransientModel):
+    _name = 'treasury.sweep.wizard.line'
+    _description = 'Transferencia propuesta de la concentración de fondos'
+
+    wizard_id = fields.Many2one(
+        'treasury.sweep.wizard',
+        required=True,
+        ondelete='cascade'
+    )
+
+    rule_id = fields.Many2one(
+        'treasury.sweep.rule',
+        string='Regla',
+        readonly=True
+    )
+
+    journal_id = fields.Many2one(
+        'account.journal',
+        string='Diario',
+        readonly=True
+    )
+
+    concentration_journal_id = fields.Many2one(
+        'account.journal',
+        string='Diario Concentrador',
+        readonly=True
+    )
+
+    currency_id = fields.Many2one(
+        'res.currency',
+        string='Moneda',
+        readonly=True
+    )
+
+    balance = fields.Monetary(
+        string='Saldo Actual',
+        currency_field='currency_id',
+        readonly=True
+    )
+
+    target_balance = fields.Monetary(
+        string='Saldo Objetivo',
+        currency_field='currency_id',
+        readonly=True
+    )
+
+    amount = fields.Monetary(
+        string='Transferencia',
+        currency_field='currency_id',
+        readonly=True,
+        help="Positivo: excedente hacia el diario concentrador. Negativo: fondeo desde el diario concentrador."
+    )
+
+    concentration_balance = fields.Monetary(
+        string='Saldo Concentrador',
+        currency_field='currency_id',
+        readonly=True,
+        help="Saldo proyectado del diario concentrador después de esta transferencia"
+    )
+
+    def _get_transfer(self):
+        self.ensure_one()
+        return {
+            'rule_id': self.rule_id.id,
+            'journal_id': self.journal_id.id,
+            'concentration_journal_id': self.concentration_journal_id.id,
+            'currency_id': self.currency_id.id,
+            'amount': self.amount,
+        }
@@ -12,6 +12,7 @@ This module allows you to:
 * Assign one or more partners to payable/receivable accounts from the chart of accounts
 * Automatically update partner's account settings when assigned to an account
 * Manage partner-account relationships efficiently
+* Assign partners automatically with rules (tags, country, fiscal position, CUIT prefix)
 
 Features:
 ---------
@@ -28,9 +29,11 @@ Features:
     'data': [
         'security/ir.model.access.csv',
         'data/cleanup_actions.xml',
+        'data/ir_cron.xml',
         'views/account_account_views.xml',
         'views/res_partner_views.xml',
         'views/wizard_views.xml',
+        'views/account_partner_assignment_rule_views.xml',
     ],
     'demo': [],
     'post_init_hook': 'post_init_hook',
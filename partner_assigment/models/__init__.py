@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
 
 from . import account_account
+from . import account_partner_assignment_rule
 from . import res_partner
\ No newline at end of file
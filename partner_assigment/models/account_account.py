@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
 
+from collections import defaultdict
+
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
+from odoo.tools import SQL
 
 
 class AccountAccount(models.Model):
@@ -33,114 +36,140 @@ class AccountAccount(models.Model):
     def create(self, vals_list):
         """Override create to handle partner assignment"""
         accounts = super().create(vals_list)
-        for account in accounts:
-            if account.assigned_partner_ids:
-                account._update_partner_accounts()
+        accounts.filtered('assigned_partner_ids')._update_partner_accounts()
         return accounts
 
     def write(self, vals):
         """Override write to handle partner assignment changes"""
-        old_partners = {}
-        if 'assigned_partner_ids' in vals:
-            # Store old partner assignments before update
-            for account in self:
-                old_partners[account.id] = account.assigned_partner_ids.ids
+        if 'assigned_partner_ids' not in vals:
+            return super().write(vals)
+
+        # Store old partner assignments before update
+        old_partners = {account: set(account.assigned_partner_ids.ids) for account in self}
 
         result = super().write(vals)
 
-        if 'assigned_partner_ids' in vals:
-            for account in self:
-                # Skip conflict cleaning if we're in a recursive call
-                if not self.env.context.get('skip_clean_conflicts'):
-                    # Get newly assigned partners
-                    new_partner_ids = set(account.assigned_partner_ids.ids)
-                    old_partner_ids = set(old_partners.get(account.id, []))
-                    
-                    # Partners that were added
-                    added_partner_ids = new_partner_ids - old_partner_ids
-                    
-                    if added_partner_ids and account.account_type == 'liability_payable':
-                        # For payable accounts, ensure no partner is assigned to multiple payable accounts
-                        account._clean_conflicting_payable_assignments(list(added_partner_ids))
-                    
-                    if added_partner_ids:
-                        account._update_partner_accounts(partner_ids=list(added_partner_ids))
-                
+        # Partners that were added, per account
+        added_partners = {
+            account: set(account.assigned_partner_ids.ids) - old_partners[account]
+            for account in self
+        }
+        added_partners = {account: ids for account, ids in added_partners.items() if ids}
+        # Skip conflict cleaning if we're in a recursive call
+        if added_partners and not self.env.context.get('skip_clean_conflicts'):
+            # For payable accounts, ensure no partner is assigned to multiple payable accounts
+            self._unlink_payable_conflicts({
+                account: partner_ids for account, partner_ids in added_partners.items()
+                if account.account_type == 'liability_payable'
+            })
+            self._update_partner_accounts_bulk(added_partners)
+
         return result
 
+    @api.model
+    def _unlink_payable_conflicts(self, kept_partners):
+        """Remove partners from every other payable account, for all the
+        accounts at once with a single statement on the relation table.
+
+        :param kept_partners: dict {payable account: partner ids to keep on it}
+        :return: dict {account id: removed partner ids}
+        """
+        # A partner is kept on a single payable account, the last one given
+        account_by_partner = {
+            partner_id: account.id
+            for account, partner_ids in kept_partners.items()
+            for partner_id in partner_ids
+        }
+        if not account_by_partner:
+            return {}
+        self.flush_model(['assigned_partner_ids'])
+        self.env.cr.execute(SQL(
+            """
+            DELETE FROM account_partner_assignment_rel rel
+             USING account_account acc,
+                   unnest(%s::int[], %s::int[]) AS kept(account_id, partner_id)
+             WHERE acc.id = rel.account_id
+               AND acc.account_type = 'liability_payable'
+               AND rel.partner_id = kept.partner_id
+               AND rel.account_id != kept.account_id
+         RETURNING rel.account_id, rel.partner_id
+            """,
+            list(account_by_partner.values()), list(account_by_partner),
+        ))
+        removed = defaultdict(list)
+        for account_id, partner_id in self.env.cr.fetchall():
+            removed[account_id].append(partner_id)
+        if removed:
+            self.invalidate_model(['assigned_partner_ids'])
+            self.env['res.partner'].invalidate_model(['assigned_account_ids'])
+        return removed
+
     def _clean_conflicting_payable_assignments(self, partner_ids):
         """Remove partners from other payable accounts to ensure single assignment rule"""
         self.ensure_one()
-        
+
         if self.account_type != 'liability_payable':
-            return
-        
-        partners = self.env['res.partner'].browse(partner_ids)
-        
-        for partner in partners:
-            # Find other payable accounts where this partner is assigned
-            other_payable_accounts = self.env['account.account'].search([
-                ('id', '!=', self.id),
-                ('account_type', '=', 'liability_payable'),
-                ('assigned_partner_ids', 'in', [partner.id])
-            ])
-            
-            # Remove partner from other payable accounts
-            for other_account in other_payable_accounts:
-                remaining_partners = other_account.assigned_partner_ids - partner
-                other_account.with_context(skip_clean_conflicts=True).write({
-                    'assigned_partner_ids': [(6, 0, remaining_partners.ids)]
-                })
+            return {}
+
+        return self._unlink_payable_conflicts({self: set(partner_ids)})
+
+    @api.model
+    def _update_partner_accounts_bulk(self, partners_by_account):
+        """Set the receivable/payable account of the partners, with one write
+        per account for all its partners
+
+        :param partners_by_account: dict {account: partner ids}
+        """
+        for account, partner_ids in partners_by_account.items():
+            if account.account_type == 'asset_receivable':
+                fname = 'property_account_receivable_id'
+            elif account.account_type == 'liability_payable':
+                fname = 'property_account_payable_id'
+            else:
+                continue
+            self.env['res.partner'].browse(partner_ids).write({fname: account.id})
 
     def _update_partner_accounts(self, partner_ids=None):
         """Update assigned partners' default accounts"""
-        self.ensure_one()
-        
-        if not partner_ids:
-            partner_ids = self.assigned_partner_ids.ids
-        
-        partners = self.env['res.partner'].browse(partner_ids)
-        
-        for partner in partners:
-            vals = {}
-            if self.account_type == 'asset_receivable':
-                vals['property_account_receivable_id'] = self.id
-            elif self.account_type == 'liability_payable':
-                vals['property_account_payable_id'] = self.id
-            
-            if vals:
-                partner.write(vals)
+        self._update_partner_accounts_bulk({
+            account: partner_ids or account.assigned_partner_ids.ids
+            for account in self
+        })
 
     @api.model
     def clean_all_payable_conflicts(self):
         """Clean all existing conflicts where partners are assigned to multiple payable accounts"""
-        # Get all partners that are assigned to multiple payable accounts
-        partners_with_conflicts = self.env['res.partner'].search([])
-        
-        conflicts_found = []
-        for partner in partners_with_conflicts:
-            payable_accounts = partner.assigned_account_ids.filtered(
-                lambda acc: acc.account_type == 'liability_payable'
-            )
-            
-            if len(payable_accounts) > 1:
-                # Keep only the first payable account, remove from others
-                accounts_to_keep = payable_accounts[0]
-                accounts_to_remove_from = payable_accounts[1:]
-                
-                for account in accounts_to_remove_from:
-                    remaining_partners = account.assigned_partner_ids - partner
-                    account.with_context(skip_clean_conflicts=True).write({
-                        'assigned_partner_ids': [(6, 0, remaining_partners.ids)]
-                    })
-                
-                conflicts_found.append({
-                    'partner': partner.name,
-                    'kept_account': accounts_to_keep.name,
-                    'removed_from': accounts_to_remove_from.mapped('name')
-                })
-        
-        return conflicts_found
+        # Get all partners that are assigned to multiple payable accounts, with one grouped query
+        self.flush_model(['assigned_partner_ids'])
+        self.env.cr.execute(SQL(
+            """
+            SELECT rel.partner_id, array_agg(rel.account_id ORDER BY rel.account_id)
+              FROM account_partner_assignment_rel rel
+              JOIN account_account acc ON acc.id = rel.account_id
+             WHERE acc.account_type = 'liability_payable'
+          GROUP BY rel.partner_id
+            HAVING COUNT(*) > 1
+            """
+        ))
+        conflicts = self.env.cr.fetchall()
+        if not conflicts:
+            return []
+
+        # Keep only the first payable account, remove from others
+        kept_partners = defaultdict(set)
+        for partner_id, account_ids in conflicts:
+            kept_partners[self.browse(account_ids[0])].add(partner_id)
+        self._unlink_payable_conflicts(kept_partners)
+
+        partners = self.env['res.partner'].browse([partner_id for partner_id, __ in conflicts])
+        accounts = self.browse({account_id for __, account_ids in conflicts for account_id in account_ids})
+        partners.fetch(['name'])
+        accounts.fetch(['name'])
+        return [{
+            'partner': partners.browse(partner_id).name,
+            'kept_account': accounts.browse(account_ids[0]).name,
+            'removed_from': accounts.browse(account_ids[1:]).mapped('name'),
+        } for partner_id, account_ids in conflicts]
 
     def action_assign_partners(self):
         """Action to open partner assignment wizard"""
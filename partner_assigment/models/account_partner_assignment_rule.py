@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+
+import ast
+from collections import defaultdict
+
+from odoo import models, fields, api, Command, _
+from odoo.exceptions import ValidationError
+from odoo.osv import expression
+
+# Partner fields whose change may move the partner to another rule
+RULE_PARTNER_FIELDS = [
+    'is_company', 'category_id', 'country_id', 'vat', 'property_account_position_id', 'company_id',
+]
+
+
+class AccountPartnerAssignmentRule(models.Model):
+    _name = 'account.partner.assignment.rule'
+    _description = 'Partner Account Assignment Rule'
+    _order = 'sequence, id'
+
+    name = fields.Char(
+        string='Name',
+        required=True
+    )
+    sequence = fields.Integer(
+        string='Sequence',
+        default=10,
+        help="Rules are evaluated in sequence order, the first matching rule of each account type wins"
+    )
+    active = fields.Boolean(default=True)
+    company_id = fields.Many2one(
+        'res.company',
+        string='Company',
+        required=True,
+        default=lambda self: self.env.company
+    )
+    account_id = fields.Many2one(
+        'account.account',
+        string='Account',
+        required=True,
+        ondelete='cascade',
+        domain="[('account_type', 'in', ['asset_receivable', 'liability_payable']), "
+               "('company_ids', 'in', company_id)]"
+    )
+    account_type = fields.Selection(
+        related='account_id.account_type',
+        store=True
+    )
+    partner_type = fields.Selection([
+        ('company', 'Companies'),
+        ('person', 'Individuals'),
+    ], string='Partner Type', help="Leave empty to match both")
+    category_ids = fields.Many2many(
+        'res.partner.category',
+        string='Tags',
+        help="Match partners having at least one of these tags"
+    )
+    country_ids = fields.Many2many(
+        'res.country',
+        string='Countries'
+    )
+    fiscal_position_ids = fields.Many2many(
+        'account.fiscal.position',
+        string='Fiscal Positions',
+        domain="[('company_id', '=', company_id)]"
+    )
+    vat_prefixes = fields.Char(
+        string='Tax ID Prefixes',
+        help="Comma separated prefixes of the partner Tax ID (CUIT), e.g. 30,33 for companies"
+    )
+    partner_domain = fields.Char(
+        string='Additional Domain',
+        default='[]'
+    )
+    override_assignment = fields.Boolean(
+        string='Override Assignments',
+        help="Also move partners already assigned to another account of the same type. "
+             "By default only partners without assignment are processed."
+    )
+
+    @api.constrains('account_id')
+    def _check_account_type(self):
+        for rule in self:
+            if rule.account_id.account_type not in ['asset_receivable', 'liability_payable']:
+                raise ValidationError(_(
+                    "Assignment rules can only target receivable and payable accounts. "
+                    "Account '%s' is of type '%s'."
+                ) % (rule.account_id.name, rule.account_id.account_type))
+
+    @api.constrains('partner_domain')
+    def _check_partner_domain(self):
+        for rule in self:
+            try:
+                domain = ast.literal_eval(rule.partner_domain or '[]')
+                if not isinstance(domain, (list, tuple)):
+                    raise ValueError(domain)
+                # Build the query to validate fields and operators, as the rules
+                # run inside every partner create/write
+                self.env['res.partner']._search(rule._get_partner_domain())
+            except (ValueError, TypeError, SyntaxError, KeyError, AssertionError):
+                raise ValidationError(_("The additional domain of rule '%s' is not valid.") % rule.name)
+
+    def _get_partner_domain(self):
+        """Domain of the partners matched by the rule"""
+        self.ensure_one()
+        domains = [
+            [('company_id', 'in', [False, self.company_id.id])],
+            ast.literal_eval(self.partner_domain or '[]'),
+        ]
+        if self.partner_type:
+            domains.append([('is_company', '=', self.partner_type == 'company')])
+        if self.category_ids:
+            domains.append([('category_id', 'in', self.category_ids.ids)])
+        if self.country_ids:
+            domains.append([('country_id', 'in', self.country_ids.ids)])
+        if self.fiscal_position_ids:
+            domains.append([('property_account_position_id', 'in', self.fiscal_position_ids.ids)])
+        prefixes = [prefix.strip() for prefix in (self.vat_prefixes or '').split(',') if prefix.strip()]
+        if prefixes:
+            domains.append(expression.OR([[('vat', '=like', prefix + '%')] for prefix in prefixes]))
+        if not self.override_assignment:
+            domains.append([('assigned_account_ids', 'not any', [('account_type', '=', self.account_type)])])
+        return expression.AND(domains)
+
+    @api.model
+    def _apply_rules(self, partners=None, rules=None):
+        """Assign the partners matched by the rules to the rule accounts.
+
+        Each rule is evaluated as one search; the partners matched by an
+        earlier rule of the same company and account type are skipped. The
+        assignments are then written with one write per account, which also
+        updates the partners' default accounts.
+
+        :param partners: only evaluate the rules on these partners (all partners otherwise)
+        :param rules: rules to apply (all active rules otherwise)
+        :return: number of assigned partners
+        """
+        if rules is None:
+            rules = self.sudo().search([])
+        if partners is not None and not partners:
+            return 0
+        assigned = 0
+        for company, company_rules in rules.grouped('company_id').items():
+            partner_model = self.env['res.partner'].sudo().with_company(company)
+            partners_by_account = defaultdict(list)
+            matched = defaultdict(set)
+            for rule in company_rules.sorted(lambda r: (r.sequence, r.id)):
+                domain = rule._get_partner_domain()
+                if partners is not None:
+                    domain = expression.AND([domain, [('id', 'in', partners.ids)]])
+                partner_ids = [
+                    partner_id for partner_id in partner_model.search(domain).ids
+                    if partner_id not in matched[rule.account_type]
+                ]
+                matched[rule.account_type].update(partner_ids)
+                partners_by_account[rule.account_id] += partner_ids
+            for account, partner_ids in partners_by_account.items():
+                partner_ids = set(partner_ids) - set(account.assigned_partner_ids.ids)
+                if partner_ids:
+                    account.with_company(company).write({
+                        'assigned_partner_ids': [Command.link(partner_id) for partner_id in partner_ids],
+                    })
+                    assigned += len(partner_ids)
+        return assigned
+
+    @api.model
+    def _cron_apply_rules(self):
+        """Periodic full pass of the assignment rules"""
+        self._apply_rules()
+
+    def action_apply_rules(self):
+        """Apply the selected rules on all the partners"""
+        assigned = self._apply_rules(rules=self)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Assignment Rules'),
+                'message': _("%d partner(s) assigned to accounts") % assigned,
+                'type': 'success',
+                'sticky': False,
+            }
+        }
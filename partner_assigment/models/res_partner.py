@@ -2,6 +2,8 @@
 
 from odoo import models, fields, api, _
 
+from .account_partner_assignment_rule import RULE_PARTNER_FIELDS
+
 
 class ResPartner(models.Model):
     _inherit = 'res.partner'
@@ -16,11 +18,12 @@ class ResPartner(models.Model):
         readonly=True
     )
 
-    @api.model
-    def create(self, vals):
-        """Override create to handle account assignment notifications"""
-        partner = super().create(vals)
-        return partner
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Override create to assign the new partners with the assignment rules"""
+        partners = super().create(vals_list)
+        self.env['account.partner.assignment.rule']._apply_rules(partners)
+        return partners
 
     def write(self, vals):
         """Override write to log account changes"""
@@ -31,6 +34,10 @@ class ResPartner(models.Model):
             for partner in self:
                 partner._log_account_change(vals)
         
+        # Re-evaluate the assignment rules when a matched field changes
+        if any(fname in vals for fname in RULE_PARTNER_FIELDS):
+            self.env['account.partner.assignment.rule']._apply_rules(self)
+        
         return result
 
     def _log_account_change(self, vals):
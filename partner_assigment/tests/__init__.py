@@ -1,3 +1,4 @@
 # -*- coding: utf-8 -*-
 
-from . import test_account_partner_assignment
\ No newline at end of file
+from . import test_account_partner_assignment
+from . import test_account_partner_assignment_rule
\ No newline at end of file
@@ -163,4 +163,47 @@ class TestAccountPartnerAssignment(TransactionCase):
         # Check only partner_2 remains assigned
         self.assertEqual(len(self.account_receivable.assigned_partner_ids), 1)
         self.assertNotIn(self.partner_1, self.account_receivable.assigned_partner_ids)
-        self.assertIn(self.partner_2, self.account_receivable.assigned_partner_ids)
\ No newline at end of file
+        self.assertIn(self.partner_2, self.account_receivable.assigned_partner_ids)
+
+    def test_move_partners_between_payable_accounts(self):
+        """Test that partners moved to another payable account are removed from the previous one"""
+        other_payable = self.env['account.account'].create({
+            'name': 'Test Payable Account 2',
+            'code': 'TEST_PAY_002',
+            'account_type': 'liability_payable',
+        })
+        self.account_payable.assigned_partner_ids = [
+            (4, self.partner_1.id),
+            (4, self.partner_2.id)
+        ]
+        
+        # Move both partners at once
+        other_payable.assigned_partner_ids = [
+            (4, self.partner_1.id),
+            (4, self.partner_2.id)
+        ]
+        
+        self.assertFalse(self.account_payable.assigned_partner_ids)
+        self.assertEqual(other_payable.assigned_partner_ids, self.partner_1 | self.partner_2)
+        self.assertEqual(self.partner_1.property_account_payable_id, other_payable)
+        self.assertEqual(self.partner_2.property_account_payable_id, other_payable)
+
+    def test_clean_all_payable_conflicts(self):
+        """Test cleaning partners assigned to several payable accounts"""
+        other_payable = self.env['account.account'].create({
+            'name': 'Test Payable Account 2',
+            'code': 'TEST_PAY_002',
+            'account_type': 'liability_payable',
+        })
+        self.account_payable.assigned_partner_ids = [(4, self.partner_1.id)]
+        other_payable.with_context(skip_clean_conflicts=True).assigned_partner_ids = [(4, self.partner_1.id)]
+        
+        conflicts = self.env['account.account'].clean_all_payable_conflicts()
+        
+        self.assertEqual(conflicts, [{
+            'partner': self.partner_1.name,
+            'kept_account': self.account_payable.name,
+            'removed_from': [other_payable.name],
+        }])
+        self.assertIn(self.partner_1, self.account_payable.assigned_partner_ids)
+        self.assertNotIn(self.partner_1, other_payable.assigned_partner_ids)
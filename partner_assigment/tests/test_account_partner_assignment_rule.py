@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import TransactionCase
+from odoo.exceptions import ValidationError
+
+
+class TestAccountPartnerAssignmentRule(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        
+        self.account_payable = self.env['account.account'].create({
+            'name': 'Test Payable Account',
+            'code': 'TEST_PAY_001',
+            'account_type': 'liability_payable',
+        })
+        
+        self.account_payable_foreign = self.env['account.account'].create({
+            'name': 'Test Foreign Payable Account',
+            'code': 'TEST_PAY_002',
+            'account_type': 'liability_payable',
+        })
+        
+        self.country = self.env['res.country'].create({
+            'name': 'Test Country',
+            'code': 'ZZ',
+        })
+        
+        self.rule_vat = self.env['account.partner.assignment.rule'].create({
+            'name': 'Companies',
+            'sequence': 1,
+            'account_id': self.account_payable.id,
+            'vat_prefixes': '30, 33',
+        })
+        
+        self.rule_country = self.env['account.partner.assignment.rule'].create({
+            'name': 'Foreign',
+            'sequence': 2,
+            'account_id': self.account_payable_foreign.id,
+            'country_ids': [(4, self.country.id)],
+        })
+
+    def test_new_partner_assigned_by_rule(self):
+        """Test that a new partner is assigned by the first matching rule"""
+        partner = self.env['res.partner'].create({
+            'name': 'Test Partner',
+            'vat': '30-71234567-1',
+            'country_id': self.country.id,
+        })
+        
+        self.assertIn(partner, self.account_payable.assigned_partner_ids)
+        self.assertNotIn(partner, self.account_payable_foreign.assigned_partner_ids)
+        self.assertEqual(partner.property_account_payable_id, self.account_payable)
+
+    def test_changed_partner_assigned_by_rule(self):
+        """Test that the rules are evaluated when a matched field changes"""
+        partner = self.env['res.partner'].create({'name': 'Test Partner'})
+        self.assertFalse(partner.assigned_account_ids)
+        
+        partner.country_id = self.country
+        
+        self.assertIn(partner, self.account_payable_foreign.assigned_partner_ids)
+        self.assertEqual(partner.property_account_payable_id, self.account_payable_foreign)
+
+    def test_manual_assignment_kept(self):
+        """Test that rules do not move manually assigned partners unless overriding"""
+        partner = self.env['res.partner'].create({'name': 'Test Partner'})
+        self.account_payable.assigned_partner_ids = [(4, partner.id)]
+        
+        partner.country_id = self.country
+        self.assertEqual(partner.assigned_account_ids, self.account_payable)
+        
+        self.rule_country.override_assignment = True
+        self.rule_country.action_apply_rules()
+        self.assertEqual(partner.assigned_account_ids, self.account_payable_foreign)
+
+    def test_invalid_partner_domain(self):
+        """Test that rules with an unknown field or a non-list domain are rejected"""
+        with self.assertRaises(ValidationError):
+            self.rule_vat.partner_domain = "[('foo', '=', 1)]"
+        with self.assertRaises(ValidationError):
+            self.rule_vat.partner_domain = "42"
@@ -77,26 +77,15 @@ class AccountPartnerAssignmentWizard(models.TransientModel):
 
     def _handle_payable_account_assignment(self):
         """Handle automatic removal from other payable accounts"""
-        partners_to_move = self.partner_ids
-        
-        # Find other payable accounts that have these partners assigned
-        other_payable_accounts = self.env['account.account'].search([
-            ('id', '!=', self.account_id.id),
-            ('account_type', '=', 'liability_payable'),
-            ('assigned_partner_ids', 'in', partners_to_move.ids)
-        ])
+        # Remove the partners from the other payable accounts with a single statement
+        removed = self.account_id._clean_conflicting_payable_assignments(self.partner_ids.ids)
         
         removed_info = []
-        for other_account in other_payable_accounts:
-            partners_to_remove = other_account.assigned_partner_ids & partners_to_move
-            if partners_to_remove:
-                # Remove partners from other account
-                remaining_partners = other_account.assigned_partner_ids - partners_to_remove
-                other_account.assigned_partner_ids = [(6, 0, remaining_partners.ids)]
-                removed_info.append({
-                    'account': other_account.name,
-                    'partners': partners_to_remove.mapped('name')
-                })
+        for other_account in self.env['account.account'].browse(sorted(removed)):
+            removed_info.append({
+                'account': other_account.name,
+                'partners': self.env['res.partner'].browse(removed[other_account.id]).mapped('name')
+            })
         
         # Show information about automatic removals
         if removed_info: